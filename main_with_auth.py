@@ -114,6 +114,11 @@ from src.payment_analyzer import PaymentAnalyzer
 from src.report_generator import ReportGenerator
 from src.client_file_converter import ClientFileConverter
 
+# Motor vetorizado dos dados do calendário
+from src.logic.calendar_data import montar_registros, obter_indice_diario, preparar_dados_calendario
+from src.logic.calendar_provider import obter_provedor_calendario
+from src.logic.business_days import obter_calendario_padrao
+
 # Importar interface de validação de contas pagas
 from src.contas_pagas_interface import mostrar_interface_validacao_contas_pagas
 
@@ -544,7 +549,8 @@ def processar_arquivo_padrao(uploaded_file, processor):
     finally:
         remover_arquivo_temporario(temp_path)
 
-def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame, mes: int = None, ano: int = None):
+def criar_calendario_financeiro(df_a_pagar: pd.DataFrame = None, df_pagas: pd.DataFrame = None,
+                                mes: int = None, ano: int = None, provedor=None):
     """
     Cria um calendário visual com informações financeiras com opção de visualização mensal ou semanal.
     
@@ -553,6 +559,8 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
         df_pagas: DataFrame com contas pagas
         mes: Mês para exibir (padrão: mês atual)
         ano: Ano para exibir (padrão: ano atual)
+        provedor: ProvedorCalendario; se informado, os DataFrames são buscados
+            por mês no banco em vez de recebidos prontos
     """
     # Usar mês e ano atuais se não especificados
     hoje = datetime.now()
@@ -561,17 +569,6 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
     if not ano:
         ano = hoje.year
     
-    # Preparar dados
-    if not df_a_pagar.empty:
-        df_a_pagar = df_a_pagar.copy()
-        df_a_pagar['data_vencimento'] = pd.to_datetime(df_a_pagar['data_vencimento'], errors='coerce')
-        df_a_pagar = df_a_pagar.dropna(subset=['data_vencimento'])
-    
-    if not df_pagas.empty:
-        df_pagas = df_pagas.copy()
-        df_pagas['data_pagamento'] = pd.to_datetime(df_pagas['data_pagamento'], errors='coerce')
-        df_pagas = df_pagas.dropna(subset=['data_pagamento'])
-    
     nome_mes = obter_mes_nome_brasileiro(mes)
     
     # Criar título e seletores
@@ -605,6 +602,16 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
         ano = novo_ano
         nome_mes = obter_mes_nome_brasileiro(mes)
     
+    if provedor is not None:
+        # Apenas os lançamentos que podem cair no mês selecionado, com o índice
+        # diário do mês (pré-calculado em segundo plano se o mês for vizinho do anterior)
+        df_a_pagar, df_pagas, indice = provedor.obter_mes(mes, ano)
+        provedor.pre_carregar_vizinhos(mes, ano)
+    else:
+        df_a_pagar, df_pagas = preparar_dados_calendario(df_a_pagar, df_pagas)
+        # Índice diário dos lançamentos, remontado só quando os dados mudam
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    
     # Mostrar calendário baseado no modo selecionado
     if modo_visualizacao == "📅 Semanal":
         # Calcular semanas do mês
@@ -631,19 +638,24 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
         
         # Mostrar calendário semanal
         mostrar_calendario_semanal(
-            semana_selecionada, df_a_pagar, df_pagas, mes, ano
+            semana_selecionada, df_a_pagar, df_pagas, mes, ano, indice
         )
         
     else:  # Modo Mensal
         st.markdown("---")
         st.markdown("### 🗓️ Visualização Mensal")
-        mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano)
+        mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano, indice)
     
     # Mostrar detalhes do dia selecionado
     if 'dia_selecionado' in st.session_state:
-        mostrar_detalhes_dia(st.session_state['dia_selecionado'], df_a_pagar, df_pagas)
+        dia_info = st.session_state['dia_selecionado']
+        if provedor is not None and (dia_info['mes'], dia_info['ano']) != (mes, ano):
+            # Dia de outro mês: os dados carregados são apenas do mês selecionado
+            mostrar_detalhes_dia(dia_info, *provedor.obter_mes(dia_info['mes'], dia_info['ano']))
+        else:
+            mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas, indice)
 
-def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas):
+def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas, indice=None):
     """
     Mostra os detalhes de um dia específico com tabela de fornecedores.
     
@@ -651,6 +663,7 @@ def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas):
         dia_info: Informações do dia selecionado
         df_a_pagar: DataFrame com contas a pagar
         df_pagas: DataFrame com contas pagas
+        indice: Índice diário dos lançamentos (obtido da sessão se None)
     """
     dia = dia_info['dia']
     mes = dia_info['mes']
@@ -662,46 +675,17 @@ def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas):
     # Criar data para filtrar
     data_filtro = datetime(ano, mes, dia).date()
     
-    # Buscar dados do dia específico
-    contas_a_pagar_dia = []
-    contas_pagas_dia = []
-    
-    # Processar contas a pagar
-    if not df_a_pagar.empty:
-        for _, row in df_a_pagar.iterrows():
-            data_vencimento = pd.to_datetime(row['data_vencimento'], errors='coerce')
-            if pd.notna(data_vencimento):
-                # Aplicar regra de fim de semana
-                data_ajustada = ajustar_para_dia_util(data_vencimento)
-                if data_ajustada.date() == data_filtro:
-                    conta_info = {
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': row['valor'],
-                        'descricao': row['descricao'],
-                        'categoria': row.get('categoria', 'N/A'),
-                        'data_original': data_vencimento.strftime('%d/%m/%Y'),
-                        'transferida': data_vencimento.date() != data_filtro
-                    }
-                    contas_a_pagar_dia.append(conta_info)
-    
-    # Processar contas pagas
-    if not df_pagas.empty:
-        for _, row in df_pagas.iterrows():
-            data_pagamento = pd.to_datetime(row['data_pagamento'], errors='coerce')
-            if pd.notna(data_pagamento):
-                # Aplicar regra de fim de semana
-                data_ajustada = ajustar_para_dia_util(data_pagamento)
-                if data_ajustada.date() == data_filtro:
-                    conta_info = {
-                        'conta_corrente': row.get('conta_corrente', 'N/A'),
-                        'valor': row['valor'],
-                        'descricao': row['descricao'],
-                        'categoria': row.get('categoria', 'N/A'),
-                        'data_original': data_pagamento.strftime('%d/%m/%Y'),
-                        'transferida': data_pagamento.date() != data_filtro
-                    }
-                    contas_pagas_dia.append(conta_info)
+    # Buscar dados do dia específico no índice diário
+    if indice is None:
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    contas_a_pagar_dia = montar_registros(
+        indice.lancamentos_do_dia('contas_a_pagar', data_filtro),
+        ['empresa', 'fornecedor', 'valor', 'descricao', 'categoria']
+    )
+    contas_pagas_dia = montar_registros(
+        indice.lancamentos_do_dia('contas_pagas', data_filtro),
+        ['conta_corrente', 'valor', 'descricao', 'categoria']
+    )
     
     # Mostrar as tabelas
     col1, col2 = st.columns(2)
@@ -1489,7 +1473,7 @@ def calcular_semanas_do_mes(ano, mes):
     
     return semanas
 
-def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
+def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano, indice=None):
     """
     Mostra o calendário da semana selecionada com informações financeiras detalhadas.
     """
@@ -1534,7 +1518,7 @@ def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
     st.markdown(f"### 📅 Semana {semana_info['numero']} - {semana_info['inicio'].strftime('%d/%m')} a {semana_info['fim'].strftime('%d/%m')}")
     
     # Calcular dados da semana
-    dados_semana = calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano)
+    dados_semana = calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano, indice)
     
     # Mostrar legenda
     st.markdown("#### 📋 Legenda:")
@@ -1548,7 +1532,7 @@ def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
     with col4:
         st.markdown("📅 **Hoje** - Dia atual (destaque azul)")
     
-    st.info("💡 **Regra de Negócio**: Valores de sábados e domingos são automaticamente transferidos para a próxima segunda-feira.")
+    st.info("💡 **Regra de Negócio**: Valores de sábados, domingos e feriados são automaticamente transferidos para o próximo dia útil.")
     
     # Criar grid da semana
     dias_semana = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
@@ -1615,7 +1599,7 @@ def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
     # Resumo da semana
     mostrar_resumo_semana(dados_semana, semana_info)
 
-def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
+def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano, indice=None):
     """
     Mostra o calendário mensal completo com informações financeiras compactas.
     """
@@ -1639,7 +1623,9 @@ def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
     """, unsafe_allow_html=True)
     
     # Calcular dados do mês inteiro
-    dados_mes = calcular_dados_mes_completo(df_a_pagar, df_pagas, mes, ano)
+    if indice is None:
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    dados_mes = indice.dados_mes(mes, ano)
     
     # Configurar calendário para começar no domingo
     calendar.setfirstweekday(calendar.SUNDAY)
@@ -1657,7 +1643,7 @@ def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
     with col4:
         st.markdown("📅 **Hoje** - Dia atual (destaque azul)")
     
-    st.info("💡 **Regra de Negócio**: Valores de sábados e domingos são automaticamente transferidos para a próxima segunda-feira.")
+    st.info("💡 **Regra de Negócio**: Valores de sábados, domingos e feriados são automaticamente transferidos para o próximo dia útil.")
     
     # Cabeçalho dos dias da semana
     dias_semana = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
@@ -1718,74 +1704,6 @@ def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
     st.markdown("### 📊 Resumo do Mês")
     mostrar_resumo_mes(dados_mes)
 
-def calcular_dados_mes_completo(df_a_pagar, df_pagas, mes, ano):
-    """
-    Calcula os dados financeiros para todos os dias do mês.
-    """
-    # Obter número de dias no mês
-    _, dias_no_mes = calendar.monthrange(ano, mes)
-    
-    dados_mes = {}
-    
-    # Inicializar todos os dias do mês
-    for dia in range(1, dias_no_mes + 1):
-        dados_mes[dia] = {
-            'a_pagar': 0,
-            'pagas': 0,
-            'qtd_a_pagar': 0,
-            'qtd_pagas': 0,
-            'contas_a_pagar': [],
-            'contas_pagas': []
-        }
-    
-    # Processar contas a pagar
-    if not df_a_pagar.empty:
-        for _, row in df_a_pagar.iterrows():
-            data_original = pd.to_datetime(row['data_vencimento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está no mês/ano atual
-                if data_ajustada.month == mes and data_ajustada.year == ano:
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_mes[dia]['a_pagar'] += valor
-                    dados_mes[dia]['qtd_a_pagar'] += 1
-                    dados_mes[dia]['contas_a_pagar'].append({
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-
-    # Processar contas pagas
-    if not df_pagas.empty:
-        for _, row in df_pagas.iterrows():
-            data_original = pd.to_datetime(row['data_pagamento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está no mês/ano atual
-                if data_ajustada.month == mes and data_ajustada.year == ano:
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_mes[dia]['pagas'] += valor
-                    dados_mes[dia]['qtd_pagas'] += 1
-                    dados_mes[dia]['contas_pagas'].append({
-                        'conta_corrente': row.get('conta_corrente', 'N/A'),
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-    
-    return dados_mes
-
 def mostrar_dia_mensal(dia, dados_dia, mes, ano):
     """
     Mostra um dia específico na visualização mensal - versão ultra compacta.
@@ -1951,75 +1869,13 @@ def mostrar_resumo_mes(dados_mes):
         </div>
         """, unsafe_allow_html=True)
 
-def calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano):
+def calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano, indice=None):
     """
     Calcula os dados financeiros para cada dia da semana.
     """
-    dados_semana = {}
-    
-    for dia in semana_info['dias']:
-        dados_semana[dia] = {
-            'a_pagar': 0,
-            'pagas': 0,
-            'qtd_a_pagar': 0,
-            'qtd_pagas': 0,
-            'contas_a_pagar': [],
-            'contas_pagas': []
-        }
-    
-    # Processar contas a pagar
-    if not df_a_pagar.empty:
-        for _, row in df_a_pagar.iterrows():
-            data_original = pd.to_datetime(row['data_vencimento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está na semana atual
-                if (data_ajustada.month == mes and 
-                    data_ajustada.year == ano and 
-                    data_ajustada.day in semana_info['dias']):
-                    
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_semana[dia]['a_pagar'] += valor
-                    dados_semana[dia]['qtd_a_pagar'] += 1
-                    dados_semana[dia]['contas_a_pagar'].append({
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-    
-    # Processar contas pagas
-    if not df_pagas.empty:
-        for _, row in df_pagas.iterrows():
-            data_original = pd.to_datetime(row['data_pagamento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está na semana atual
-                if (data_ajustada.month == mes and 
-                    data_ajustada.year == ano and 
-                    data_ajustada.day in semana_info['dias']):
-                    
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_semana[dia]['pagas'] += valor
-                    dados_semana[dia]['qtd_pagas'] += 1
-                    dados_semana[dia]['contas_pagas'].append({
-                        'conta_corrente': row.get('conta_corrente', 'N/A'),
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-    
-    return dados_semana
+    if indice is None:
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    return indice.dados_dias(semana_info['dias'], mes, ano)
 
 def mostrar_dia_semana(dia, dados_dia, mes, ano):
     """
@@ -2254,20 +2110,10 @@ def mostrar_resumo_semana(dados_semana, semana_info):
 
 def ajustar_para_dia_util(data_original):
     """
-    Ajusta datas de fim de semana para a próxima segunda-feira.
-    Sábado (5) e Domingo (6) -> Segunda-feira
+    Ajusta datas de fim de semana ou feriado para o próximo dia útil bancário.
+    Sábado, domingo e feriados (calendário em src/logic/business_days.py) -> próximo dia útil
     """
-    dia_semana = data_original.weekday()  # 0=segunda, 6=domingo
-    
-    if dia_semana == 5:  # Sábado
-        # Mover para segunda (2 dias à frente)
-        return data_original + timedelta(days=2)
-    elif dia_semana == 6:  # Domingo
-        # Mover para segunda (1 dia à frente)
-        return data_original + timedelta(days=1)
-    else:
-        # Dia útil, manter como está
-        return data_original
+    return obter_calendario_padrao().ajustar_data(data_original)
 
 def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
     """Mostra dados carregados do banco."""
@@ -2276,40 +2122,35 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
     admin_user_id = "bde0a328-7d9f-4c91-a005-a1ee285c16fb"
     is_admin = supabase_client.user_id == admin_user_id
     
-    # Tabs para diferentes visões
+    # Visões: só a selecionada é executada a cada rerun, então o calendário
+    # busca apenas o mês exibido e as demais buscam os dados completos sob demanda
+    visoes = [
+        "🗓️ Calendário", 
+        "📊 Dados Atuais", 
+        "🏢 Por Empresa", 
+        "📋 Exportar", 
+        "🔍 Validação Contas Pagas"
+    ]
     if is_admin:
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-            "🗓️ Calendário", 
-            "📊 Dados Atuais", 
-            "🏢 Por Empresa", 
-            "📋 Exportar", 
-            "🔍 Validação Contas Pagas",
-            "👥 Compartilhamento"
-        ])
-    else:
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "🗓️ Calendário", 
-            "📊 Dados Atuais", 
-            "🏢 Por Empresa", 
-            "📋 Exportar", 
-            "🔍 Validação Contas Pagas"
-        ])
-    
-    # Buscar dados uma vez para usar em todas as abas
-    # Se for admin, busca dados de todas as empresas
-    if is_admin:
-        df_a_pagar = supabase_client.buscar_todas_contas_a_pagar()
-        df_pagas = supabase_client.buscar_todas_contas_pagas()
-    else:
-        df_a_pagar = supabase_client.buscar_contas_a_pagar()
-        df_pagas = supabase_client.buscar_contas_pagas()
+        visoes.append("👥 Compartilhamento")
+    visao = st.radio("Visão", visoes, horizontal=True, label_visibility="collapsed", key="visao_dados_banco")
+    
+    def buscar_dados_completos():
+        """Todas as contas a pagar e pagas (se for admin, de todas as empresas)."""
+        if is_admin:
+            return supabase_client.buscar_todas_contas_a_pagar(), supabase_client.buscar_todas_contas_pagas()
+        return supabase_client.buscar_contas_a_pagar(), supabase_client.buscar_contas_pagas()
     
-    with tab1:
+    # Com todas as contas do próprio usuário, a conciliação gravada é reaproveitada
+    usar_conciliacao_gravada = not is_admin
+    
+    if visao == "🗓️ Calendário":
         #st.header("📅 Calendário Financeiro")
-        criar_calendario_financeiro(df_a_pagar, df_pagas)
+        criar_calendario_financeiro(provedor=obter_provedor_calendario(st.session_state, supabase_client, is_admin))
     
-    with tab2:
+    elif visao == "📊 Dados Atuais":
         st.header("📊 Dados do Banco")
+        df_a_pagar, df_pagas = buscar_dados_completos()
         
         col1, col2 = st.columns(2)
         
@@ -2349,7 +2190,7 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
             else:
                 st.info("Nenhuma conta paga encontrada.")
     
-    with tab3:
+    elif visao == "🏢 Por Empresa":
         st.header("🏢 Análise por Empresa")
         
         # Admin vê todas as empresas do sistema, usuários normais veem apenas suas empresas
@@ -2363,12 +2204,7 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
             empresa_selecionada = st.selectbox("Selecione uma empresa:", ["Todas"] + empresas)
             
             if empresa_selecionada == "Todas":
-                if is_admin:
-                    df_a_pagar = supabase_client.buscar_todas_contas_a_pagar()
-                    df_pagas = supabase_client.buscar_todas_contas_pagas()
-                else:
-                    df_a_pagar = supabase_client.buscar_contas_a_pagar()
-                    df_pagas = supabase_client.buscar_contas_pagas()
+                df_a_pagar, df_pagas = buscar_dados_completos()
             else:
                 if is_admin:
                     df_a_pagar = supabase_client.buscar_todas_contas_a_pagar(empresa=empresa_selecionada)
@@ -2379,10 +2215,16 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
                 # Filtrar pagas por conta_corrente se necessário (já que empresa não existe mais)
                 if not df_pagas.empty and 'conta_corrente' in df_pagas.columns:
                     df_pagas = df_pagas[df_pagas['conta_corrente'].str.contains(empresa_selecionada, na=False, case=False)]
+                usar_conciliacao_gravada = False
             
             if not df_a_pagar.empty or not df_pagas.empty:
-                # Usar analyzer para gerar correspondências
-                correspondencias = analyzer.encontrar_correspondencias(df_a_pagar, df_pagas)
+                # Usar analyzer para gerar correspondências (admin: empresas em paralelo)
+                if usar_conciliacao_gravada:
+                    correspondencias = supabase_client.conciliar_incremental(analyzer)
+                else:
+                    correspondencias = analyzer.encontrar_correspondencias(
+                        df_a_pagar, df_pagas, paralelo=is_admin and empresa_selecionada == "Todas"
+                    )
                 resumo_empresa = analyzer.gerar_relatorio_por_empresa(correspondencias)
                 
                 if not resumo_empresa.empty:
@@ -2398,15 +2240,19 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
         else:
             st.info("Nenhuma empresa encontrada. Faça upload de arquivos primeiro.")
     
-    with tab4:
+    elif visao == "📋 Exportar":
         st.header("📋 Exportar Relatórios")
         
         if st.button("📄 Gerar Relatório Excel Completo", type="primary"):
             with st.spinner("Gerando relatório..."):
                 try:                    
+                    df_a_pagar, df_pagas = buscar_dados_completos()
                     if not df_a_pagar.empty or not df_pagas.empty:
                         # Gerar análise
-                        correspondencias = analyzer.encontrar_correspondencias(df_a_pagar, df_pagas)
+                        if usar_conciliacao_gravada:
+                            correspondencias = supabase_client.conciliar_incremental(analyzer)
+                        else:
+                            correspondencias = analyzer.encontrar_correspondencias(df_a_pagar, df_pagas)
                         resumo = analyzer.calcular_resumo_financeiro(correspondencias)
                         resumo_empresa = analyzer.gerar_relatorio_por_empresa(correspondencias)
                         
@@ -2434,14 +2280,13 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
                 except Exception as e:
                     st.error(f"Erro ao gerar relatório: {str(e)}")
     
-    with tab5:
+    elif visao == "🔍 Validação Contas Pagas":
         # Interface de validação de contas pagas
         mostrar_interface_validacao_contas_pagas(supabase_client)
     
-    # Aba de compartilhamento (somente para admin)
-    if is_admin:
-        with tab6:
-            mostrar_interface_compartilhamento(supabase_client)
+    # Visão de compartilhamento (somente para admin)
+    elif visao == "👥 Compartilhamento" and is_admin:
+        mostrar_interface_compartilhamento(supabase_client)
 
 def mostrar_interface_compartilhamento(supabase_client: SupabaseClient):
     """Interface para gerenciar licenças de acesso entre usuários."""
@@ -0,0 +1,200 @@
+"""
+Cache dos resultados de comparação entre contas a pagar e contas pagas.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+
+def hash_dataset(df: pd.DataFrame) -> str:
+    """
+    Impressão digital do conteúdo de um DataFrame (colunas e valores, sem o índice).
+
+    Dois DataFrames com o mesmo conteúdo têm o mesmo hash, independentemente de
+    terem sido lidos em momentos diferentes.
+    """
+    digest = hashlib.sha1()
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(str(len(df)).encode('utf-8'))
+    try:
+        valores = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        # Colunas com valores não hasheáveis (listas, dicts)
+        valores = pd.util.hash_pandas_object(df.astype(str), index=False)
+    digest.update(valores.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class CacheComparacoes:
+    """
+    Cache LRU dos resultados de `ComparadorContasAPagarVsPagas.comparar_datasets`.
+
+    A chave é (usuário, hash das contas a pagar, hash das contas pagas,
+    tolerâncias): trocar de aba reaproveita o resultado, e só uma mudança real
+    nos dados ou nas tolerâncias provoca nova comparação. A memória é limitada
+    por quantidade de resultados e por tamanho estimado; com `diretorio_spill`,
+    os resultados descartados da memória são gravados em Parquet e relidos
+    quando voltarem a ser pedidos.
+    """
+
+    def __init__(self, max_itens: int = 8, max_bytes: int = 256 * 1024 * 1024,
+                 diretorio_spill: Optional[str] = None, max_itens_disco: int = 64):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_itens: Quantidade máxima de resultados em memória (LRU)
+            max_bytes: Tamanho máximo estimado dos resultados em memória
+            diretorio_spill: Diretório para gravar em Parquet os resultados
+                descartados da memória; se None, eles são apenas descartados
+            max_itens_disco: Quantidade máxima de resultados gravados em disco
+        """
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.diretorio_spill = diretorio_spill
+        self.max_itens_disco = max_itens_disco
+        self._itens: "OrderedDict[Tuple, Tuple[int, Dict]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def chave(self, user_id: Optional[str], df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+              comparador: Any) -> Tuple:
+        """Monta a chave de um resultado a partir dos dados e das tolerâncias do comparador."""
+        return (
+            user_id,
+            hash_dataset(df_a_pagar),
+            hash_dataset(df_pagas),
+            comparador.tolerancia_valor,
+            comparador.tolerancia_dias
+        )
+
+    def obter(self, chave: Tuple) -> Optional[Dict]:
+        """Retorna uma cópia do resultado em cache (memória ou disco) ou None se ausente."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                return self._copiar(item[1])
+
+        resultado = self._ler_spill(chave)
+        if resultado is not None:
+            self.guardar(chave, resultado)
+            return self._copiar(resultado)
+        return None
+
+    def guardar(self, chave: Tuple, resultado: Dict):
+        """Armazena um resultado, descartando (ou gravando em disco) os menos usados."""
+        resultado = self._copiar(resultado)
+        tamanho = self._tamanho(resultado)
+        descartados = []
+
+        with self._lock:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[0]
+            self._itens[chave] = (tamanho, resultado)
+            self._bytes += tamanho
+
+            while len(self._itens) > 1 and (len(self._itens) > self.max_itens or self._bytes > self.max_bytes):
+                chave_antiga, (tamanho_antigo, resultado_antigo) = self._itens.popitem(last=False)
+                self._bytes -= tamanho_antigo
+                descartados.append((chave_antiga, resultado_antigo))
+
+        for chave_antiga, resultado_antigo in descartados:
+            self._gravar_spill(chave_antiga, resultado_antigo)
+
+    def obter_ou_calcular(self, chave: Tuple, calcular: Callable[[], Dict]) -> Dict:
+        """Retorna o resultado em cache ou calcula, guarda e retorna."""
+        resultado = self.obter(chave)
+        if resultado is None:
+            resultado = calcular()
+            self.guardar(chave, resultado)
+        return resultado
+
+    def limpar(self):
+        """Remove os resultados em memória e em disco."""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+        if self.diretorio_spill and os.path.isdir(self.diretorio_spill):
+            shutil.rmtree(self.diretorio_spill, ignore_errors=True)
+
+    # ============================================
+    # AUXILIARES
+    # ============================================
+
+    @staticmethod
+    def _copiar(resultado: Dict) -> Dict:
+        """Cópia do resultado: quem chama pode alterar os DataFrames retornados."""
+        return {
+            nome: valor.copy() if isinstance(valor, (pd.DataFrame, dict)) else valor
+            for nome, valor in resultado.items()
+        }
+
+    @staticmethod
+    def _tamanho(resultado: Dict) -> int:
+        """Tamanho estimado do resultado em bytes."""
+        return int(sum(
+            valor.memory_usage(index=True, deep=True).sum()
+            for valor in resultado.values() if isinstance(valor, pd.DataFrame)
+        ))
+
+    def _caminho_spill(self, chave: Tuple) -> str:
+        nome = hashlib.sha1(repr(chave).encode('utf-8')).hexdigest()
+        return os.path.join(self.diretorio_spill, nome)
+
+    def _gravar_spill(self, chave: Tuple, resultado: Dict):
+        """Grava um resultado em Parquet (um arquivo por DataFrame, demais valores em JSON)."""
+        if not self.diretorio_spill:
+            return
+
+        caminho = self._caminho_spill(chave)
+        try:
+            os.makedirs(caminho, exist_ok=True)
+            outros = {}
+            for nome, valor in resultado.items():
+                if isinstance(valor, pd.DataFrame):
+                    valor.to_parquet(os.path.join(caminho, f'{nome}.parquet'))
+                else:
+                    outros[nome] = valor
+            with open(os.path.join(caminho, 'outros.json'), 'w', encoding='utf-8') as arquivo:
+                json.dump(outros, arquivo, default=lambda v: v.item() if hasattr(v, 'item') else str(v))
+            self._podar_spill()
+        except Exception as e:
+            print(f"⚠️ Não foi possível gravar a comparação em disco: {e}")
+            shutil.rmtree(caminho, ignore_errors=True)
+
+    def _ler_spill(self, chave: Tuple) -> Optional[Dict]:
+        """Relê um resultado gravado em disco, se existir."""
+        if not self.diretorio_spill:
+            return None
+
+        caminho = self._caminho_spill(chave)
+        arquivo_outros = os.path.join(caminho, 'outros.json')
+        if not os.path.exists(arquivo_outros):
+            return None
+
+        try:
+            with open(arquivo_outros, encoding='utf-8') as arquivo:
+                resultado = json.load(arquivo)
+            for nome_arquivo in os.listdir(caminho):
+                if nome_arquivo.endswith('.parquet'):
+                    resultado[nome_arquivo[:-len('.parquet')]] = pd.read_parquet(os.path.join(caminho, nome_arquivo))
+            os.utime(caminho)
+            return resultado
+        except Exception as e:
+            print(f"⚠️ Não foi possível ler a comparação gravada em disco: {e}")
+            return None
+
+    def _podar_spill(self):
+        """Remove os resultados mais antigos do disco além de `max_itens_disco`."""
+        entradas = [os.path.join(self.diretorio_spill, nome) for nome in os.listdir(self.diretorio_spill)]
+        entradas = sorted((e for e in entradas if os.path.isdir(e)), key=os.path.getmtime)
+        for entrada in entradas[:max(0, len(entradas) - self.max_itens_disco)]:
+            shutil.rmtree(entrada, ignore_errors=True)
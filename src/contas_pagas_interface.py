@@ -8,11 +8,29 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime
+from typing import Dict
 import io
+import os
 
+from cache_comparacoes import CacheComparacoes
 from contas_pagas_validator import ContasPagasValidator, ComparadorContasAPagarVsPagas
 from utils import formatar_moeda_brasileira, formatar_data_brasileira
 
+# Resultados de comparação reaproveitados entre reruns do Streamlit (a chave inclui o usuário)
+_cache_comparacoes = CacheComparacoes(diretorio_spill=os.getenv('CACHE_COMPARACOES_DIR'))
+
+
+def _comparar_com_cache(supabase_client, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame) -> Dict:
+    """
+    Compara os datasets reaproveitando o último resultado para os mesmos dados.
+    
+    Só recalcula quando o conteúdo de um dos datasets (ou as tolerâncias do
+    comparador) muda; trocar de aba ou interagir com a página não refaz a análise.
+    """
+    comparador = ComparadorContasAPagarVsPagas()
+    chave = _cache_comparacoes.chave(getattr(supabase_client, 'user_id', None), df_a_pagar, df_pagas, comparador)
+    return _cache_comparacoes.obter_ou_calcular(chave, lambda: comparador.comparar_datasets(df_a_pagar, df_pagas))
+
 
 def mostrar_interface_validacao_contas_pagas(supabase_client):
     """
@@ -300,10 +318,8 @@ def mostrar_comparacao_datasets(supabase_client):
     
     if not df_a_pagar.empty and not df_pagas.empty:
         # Executar comparação
-        comparador = ComparadorContasAPagarVsPagas()
-        
         with st.spinner("Analisando correspondências..."):
-            resultado_comparacao = comparador.comparar_datasets(df_a_pagar, df_pagas)
+            resultado_comparacao = _comparar_com_cache(supabase_client, df_a_pagar, df_pagas)
         
         # Mostrar resumo da comparação
         st.divider()
@@ -467,8 +483,7 @@ def mostrar_relatorios_diferencas(supabase_client):
         return
     
     # Executar análise completa
-    comparador = ComparadorContasAPagarVsPagas()
-    resultado = comparador.comparar_datasets(df_a_pagar, df_pagas)
+    resultado = _comparar_com_cache(supabase_client, df_a_pagar, df_pagas)
     
     # Relatório de diferenças de valor
     st.subheader("💰 Diferenças de Valor")
@@ -2,9 +2,10 @@
 Módulo para validação e processamento de modelos de contas pagas.
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-from typing import Dict
+from typing import Dict, Tuple
 import uuid
 
 
@@ -257,24 +258,26 @@ class ComparadorContasAPagarVsPagas:
         if 'chave_comparacao' not in df_pagas_prep.columns:
             print("⚠️ Chave de comparação não foi criada para contas pagas. Usando comparação simples.")
         
-        # Encontrar correspondências exatas
-        resultado['correspondencias_exatas'] = self._encontrar_correspondencias_exatas(
+        # Encontrar correspondências exatas (um a um; as linhas livres seguem para as próximas etapas)
+        resultado['correspondencias_exatas'], livres_a_pagar, livres_pagas = self._casar_exatas_por_etapas(
             df_a_pagar_prep, df_pagas_prep
         )
+        df_a_pagar_livres = df_a_pagar_prep[livres_a_pagar]
+        df_pagas_livres = df_pagas_prep[livres_pagas]
         
         # Encontrar correspondências aproximadas
         resultado['correspondencias_aproximadas'] = self._encontrar_correspondencias_aproximadas(
-            df_a_pagar_prep, df_pagas_prep, resultado['correspondencias_exatas']
+            df_a_pagar_livres, df_pagas_livres, resultado['correspondencias_exatas']
         )
         
         # Identificar contas não pagas
         resultado['contas_nao_pagas'] = self._identificar_contas_nao_pagas(
-            df_a_pagar_prep, resultado['correspondencias_exatas'], resultado['correspondencias_aproximadas']
+            df_a_pagar_livres, resultado['correspondencias_aproximadas']
         )
         
         # Identificar pagamentos sem conta correspondente
         resultado['pagamentos_sem_conta'] = self._identificar_pagamentos_sem_conta(
-            df_pagas_prep, resultado['correspondencias_exatas'], resultado['correspondencias_aproximadas']
+            df_pagas_livres, resultado['correspondencias_aproximadas']
         )
         
         # Analisar diferenças de valor
@@ -318,40 +321,15 @@ class ComparadorContasAPagarVsPagas:
     def _extrair_correspondencias_por_tipo(self, correspondencias: pd.DataFrame, tipo: str) -> pd.DataFrame:
         """
         Extrai correspondências de um tipo específico do DataFrame de correspondências.
+        
+        O tipo é a chave da etapa que casou o par ('id_movimento',
+        'chave_comparacao' ou 'historico_norm'), gravada na coluna `etapa`.
         """
-        if correspondencias.empty:
+        if correspondencias.empty or 'etapa' not in correspondencias.columns:
             return pd.DataFrame()
         
-        if tipo == 'id_movimento':
-            # Correspondências que têm ID válido em ambos os lados
-            mask = (correspondencias.get('id_movimento_a_pagar', pd.Series()).notna() & 
-                   correspondencias.get('id_movimento_pagas', pd.Series()).notna())
-            return correspondencias[mask] if mask.any() else pd.DataFrame()
-            
-        elif tipo == 'chave_comparacao':
-            # Correspondências que têm chave válida mas não vieram por ID nem por histórico
-            mask = correspondencias.get('chave_comparacao', pd.Series()).notna()
-            
-            # Excluir as que já foram por ID
-            if 'id_movimento_a_pagar' in correspondencias.columns and 'id_movimento_pagas' in correspondencias.columns:
-                mask_tem_id = (correspondencias['id_movimento_a_pagar'].notna() & 
-                              correspondencias['id_movimento_pagas'].notna())
-                mask = mask & ~mask_tem_id
-            
-            # Excluir as que foram por histórico (verificando se existe a coluna historico_norm da correspondência)
-            if 'historico_norm' in correspondencias.columns:
-                mask_tem_historico = correspondencias['historico_norm'].notna()
-                mask = mask & ~mask_tem_historico
-            
-            return correspondencias[mask] if mask.any() else pd.DataFrame()
-            
-        elif tipo == 'historico_norm':
-            # Correspondências que têm histórico válido
-            # A coluna 'historico_norm' existe quando a correspondência foi feita por histórico
-            mask = correspondencias.get('historico_norm', pd.Series()).notna()
-            return correspondencias[mask] if mask.any() else pd.DataFrame()
-        
-        return pd.DataFrame()
+        mask = correspondencias['etapa'] == tipo
+        return correspondencias[mask] if mask.any() else pd.DataFrame()
     
     def _preparar_dataset_comparacao(self, df: pd.DataFrame, tipo: str) -> pd.DataFrame:
         """
@@ -432,103 +410,121 @@ class ComparadorContasAPagarVsPagas:
         """
         Encontra correspondências exatas entre os datasets usando múltiplas estratégias.
         """
-        correspondencias_totais = pd.DataFrame()
+        correspondencias, _, _ = self._casar_exatas_por_etapas(df_a_pagar, df_pagas)
+        return correspondencias
+    
+    def _casar_exatas_por_etapas(self, df_a_pagar: pd.DataFrame,
+                                 df_pagas: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """
+        Casa as contas em etapas (ID, chave de comparação, histórico exato), um a um.
+        
+        Cada lado mantém um único vetor de linhas ainda livres: cada etapa só
+        considera linhas livres e consome as que casar. Dentro de uma chave, a
+        k-ésima linha livre de um lado casa com a k-ésima do outro, na ordem
+        original, então a memória fica linear mesmo com centenas de linhas
+        repetindo a mesma chave.
+        
+        Returns:
+            Tupla (correspondências no formato de `pd.merge` com sufixos
+            `_a_pagar`/`_pagas` e a coluna `etapa` com a chave que casou cada
+            par, linhas livres das contas a pagar, linhas livres das contas pagas)
+        """
+        livres_a_pagar = np.ones(len(df_a_pagar), dtype=bool)
+        livres_pagas = np.ones(len(df_pagas), dtype=bool)
+        etapas = []
         
         # Estratégia 1: Correspondência por ID (mais confiável)
         if 'id_movimento' in df_a_pagar.columns and 'id_movimento' in df_pagas.columns:
-            print("🔍 Buscando correspondências por ID...")
-            correspondencias_id = pd.merge(
-                df_a_pagar, df_pagas,
-                on='id_movimento',
-                suffixes=('_a_pagar', '_pagas'),
-                how='inner'
-            )
-            if not correspondencias_id.empty:
-                print(f"✅ Encontradas {len(correspondencias_id)} correspondências por ID")
-                correspondencias_totais = pd.concat([correspondencias_totais, correspondencias_id], ignore_index=True)
+            etapas.append(('id_movimento', 'ID', df_a_pagar['id_movimento'], df_pagas['id_movimento']))
         
         # Estratégia 2: Correspondência por chave (descrição + valor)
         if 'chave_comparacao' in df_a_pagar.columns and 'chave_comparacao' in df_pagas.columns:
-            print("🔍 Buscando correspondências por chave de comparação...")
-            
-            # Remover IDs já correspondidos
-            ids_ja_correspondidos = set()
-            if not correspondencias_totais.empty and 'id_movimento_a_pagar' in correspondencias_totais.columns:
-                ids_ja_correspondidos.update(correspondencias_totais['id_movimento_a_pagar'].dropna())
-            
-            df_a_pagar_restante = df_a_pagar[~df_a_pagar['id_movimento'].isin(ids_ja_correspondidos)] if ids_ja_correspondidos else df_a_pagar
-            
-            ids_pagas_correspondidos = set()
-            if not correspondencias_totais.empty and 'id_movimento_pagas' in correspondencias_totais.columns:
-                ids_pagas_correspondidos.update(correspondencias_totais['id_movimento_pagas'].dropna())
-            
-            df_pagas_restante = df_pagas[~df_pagas['id_movimento'].isin(ids_pagas_correspondidos)] if ids_pagas_correspondidos else df_pagas
-            
-            correspondencias_chave = pd.merge(
-                df_a_pagar_restante, df_pagas_restante,
-                on='chave_comparacao',
-                suffixes=('_a_pagar', '_pagas'),
-                how='inner'
-            )
-            
-            if not correspondencias_chave.empty:
-                print(f"✅ Encontradas {len(correspondencias_chave)} correspondências por chave")
-                correspondencias_totais = pd.concat([correspondencias_totais, correspondencias_chave], ignore_index=True)
+            etapas.append(('chave_comparacao', 'chave', df_a_pagar['chave_comparacao'], df_pagas['chave_comparacao']))
         
         # Estratégia 3: Correspondência por histórico 100% exato
         if 'historico' in df_a_pagar.columns and 'historico' in df_pagas.columns:
-            print("🔍 Buscando correspondências por histórico exato...")
-            
-            # Remover registros já correspondidos
-            ids_ja_correspondidos_a_pagar = set()
-            ids_ja_correspondidos_pagas = set()
-            
-            if not correspondencias_totais.empty:
-                if 'id_movimento_a_pagar' in correspondencias_totais.columns:
-                    ids_ja_correspondidos_a_pagar.update(correspondencias_totais['id_movimento_a_pagar'].dropna())
-                if 'id_movimento_pagas' in correspondencias_totais.columns:
-                    ids_ja_correspondidos_pagas.update(correspondencias_totais['id_movimento_pagas'].dropna())
-            
-            df_a_pagar_historico = df_a_pagar.copy()
-            df_pagas_historico = df_pagas.copy()
-            
-            if ids_ja_correspondidos_a_pagar:
-                df_a_pagar_historico = df_a_pagar_historico[~df_a_pagar_historico['id_movimento'].isin(ids_ja_correspondidos_a_pagar)]
-            if ids_ja_correspondidos_pagas:
-                df_pagas_historico = df_pagas_historico[~df_pagas_historico['id_movimento'].isin(ids_ja_correspondidos_pagas)]
-            
-            # Normalizar históricos para comparação
-            df_a_pagar_historico['historico_norm'] = df_a_pagar_historico['historico'].astype(str).str.upper().str.strip()
-            df_pagas_historico['historico_norm'] = df_pagas_historico['historico'].astype(str).str.upper().str.strip()
-            
-            # Filtrar históricos válidos (não vazios, não "NAN")
-            mask_a_pagar = (df_a_pagar_historico['historico_norm'] != '') & (df_a_pagar_historico['historico_norm'] != 'NAN') & (df_a_pagar_historico['historico_norm'].str.len() > 3)
-            mask_pagas = (df_pagas_historico['historico_norm'] != '') & (df_pagas_historico['historico_norm'] != 'NAN') & (df_pagas_historico['historico_norm'].str.len() > 3)
-            
-            df_a_pagar_historico = df_a_pagar_historico[mask_a_pagar]
-            df_pagas_historico = df_pagas_historico[mask_pagas]
+            etapas.append(('historico_norm', 'histórico exato',
+                           self._normalizar_historico(df_a_pagar['historico']),
+                           self._normalizar_historico(df_pagas['historico'])))
+        
+        partes = []
+        for coluna, rotulo, chaves_a_pagar, chaves_pagas in etapas:
+            print(f"🔍 Buscando correspondências por {rotulo}...")
+            pos_a_pagar, pos_pagas = self._casar_por_chave(chaves_a_pagar, chaves_pagas, livres_a_pagar, livres_pagas)
+            if len(pos_a_pagar) == 0:
+                continue
             
-            if not df_a_pagar_historico.empty and not df_pagas_historico.empty:
-                correspondencias_historico = pd.merge(
-                    df_a_pagar_historico, df_pagas_historico,
-                    on='historico_norm',
-                    suffixes=('_a_pagar', '_pagas'),
-                    how='inner'
-                )
-                
-                if not correspondencias_historico.empty:
-                    print(f"✅ Encontradas {len(correspondencias_historico)} correspondências por histórico exato")
-                    correspondencias_totais = pd.concat([correspondencias_totais, correspondencias_historico], ignore_index=True)
-        
-        return correspondencias_totais
+            livres_a_pagar[pos_a_pagar] = False
+            livres_pagas[pos_pagas] = False
+            print(f"✅ Encontradas {len(pos_a_pagar)} correspondências por {rotulo}")
+            parte = self._montar_correspondencias(
+                df_a_pagar, df_pagas, pos_a_pagar, pos_pagas, coluna, chaves_a_pagar
+            )
+            parte['etapa'] = coluna
+            partes.append(parte)
+        
+        correspondencias = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+        return correspondencias, livres_a_pagar, livres_pagas
+    
+    def _normalizar_historico(self, historicos: pd.Series) -> pd.Series:
+        """Histórico normalizado para comparação; NaN quando vazio, "NAN" ou curto demais."""
+        historico_norm = historicos.astype(str).str.upper().str.strip()
+        return historico_norm.where((historico_norm != 'NAN') & (historico_norm.str.len() > 3))
+    
+    def _casar_por_chave(self, chaves_a_pagar: pd.Series, chaves_pagas: pd.Series,
+                         livres_a_pagar: np.ndarray, livres_pagas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares um a um entre linhas livres com a mesma chave (chaves nulas não casam).
+        
+        Returns:
+            Posições (iloc) dos pares nas contas a pagar e nas pagas, ordenadas
+            pela conta a pagar
+        """
+        validas_a_pagar = livres_a_pagar & chaves_a_pagar.notna().to_numpy()
+        validas_pagas = livres_pagas & chaves_pagas.notna().to_numpy()
+        if not validas_a_pagar.any() or not validas_pagas.any():
+            return np.array([], dtype=int), np.array([], dtype=int)
+        
+        lado_a_pagar = pd.DataFrame({
+            'chave': chaves_a_pagar.to_numpy()[validas_a_pagar],
+            'posicao': np.flatnonzero(validas_a_pagar)
+        })
+        lado_pagas = pd.DataFrame({
+            'chave': chaves_pagas.to_numpy()[validas_pagas],
+            'posicao': np.flatnonzero(validas_pagas)
+        })
+        lado_a_pagar['ordem'] = lado_a_pagar.groupby('chave', sort=False).cumcount()
+        lado_pagas['ordem'] = lado_pagas.groupby('chave', sort=False).cumcount()
+        
+        pares = lado_a_pagar.merge(lado_pagas, on=['chave', 'ordem'], suffixes=('_a_pagar', '_pagas'))
+        pares = pares.sort_values('posicao_a_pagar', kind='stable')
+        return pares['posicao_a_pagar'].to_numpy(), pares['posicao_pagas'].to_numpy()
+    
+    def _montar_correspondencias(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                                 pos_a_pagar: np.ndarray, pos_pagas: np.ndarray,
+                                 coluna_chave: str, chaves_a_pagar: pd.Series) -> pd.DataFrame:
+        """
+        Monta as linhas dos pares com as mesmas colunas de um `pd.merge` na chave.
+        
+        A coluna da chave aparece uma vez, sem sufixo; as demais colunas presentes
+        nos dois lados recebem os sufixos `_a_pagar` e `_pagas`.
+        """
+        lado_a_pagar = df_a_pagar.iloc[pos_a_pagar].reset_index(drop=True)
+        lado_pagas = df_pagas.iloc[pos_pagas].reset_index(drop=True)
+        lado_a_pagar[coluna_chave] = chaves_a_pagar.iloc[pos_a_pagar].to_numpy()
+        
+        lado_pagas = lado_pagas.drop(columns=[coluna_chave], errors='ignore')
+        comuns = [coluna for coluna in lado_pagas.columns if coluna in lado_a_pagar.columns]
+        lado_a_pagar = lado_a_pagar.rename(columns={coluna: f'{coluna}_a_pagar' for coluna in comuns})
+        lado_pagas = lado_pagas.rename(columns={coluna: f'{coluna}_pagas' for coluna in comuns})
+        
+        return pd.concat([lado_a_pagar, lado_pagas], axis=1)
     
     def _encontrar_correspondencias_aproximadas(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame, 
                                               correspondencias_exatas: pd.DataFrame) -> pd.DataFrame:
         """
         Encontra correspondências aproximadas usando diferentes critérios.
         """
-        correspondencias_aprox = []
-        
         # Identificar registros já correspondidos exatamente
         ids_ja_correspondidos_a_pagar = set()
         ids_ja_correspondidos_pagas = set()
@@ -560,89 +556,152 @@ class ComparadorContasAPagarVsPagas:
         
         print(f"🔍 Buscando correspondências aproximadas em {len(df_a_pagar_restante)} contas a pagar restantes...")
         
-        for idx, conta_pagar in df_a_pagar_restante.iterrows():
-            if 'valor' not in conta_pagar or pd.isna(conta_pagar['valor']):
-                continue
-                
-            # Critério 1: Valor exato + descrição similar (mais de 5 caracteres em comum)
-            candidatos_valor_exato = df_pagas_restante[df_pagas_restante['valor'] == conta_pagar['valor']]
-            if not candidatos_valor_exato.empty and 'descricao_norm' in conta_pagar:
-                desc_conta = str(conta_pagar['descricao_norm'])
-                for _, candidato in candidatos_valor_exato.iterrows():
-                    desc_candidato = str(candidato['descricao_norm'])
-                    if len(desc_conta) >= 5 and len(desc_candidato) >= 5:
-                        # Verificar se pelo menos 5 caracteres consecutivos coincidem
-                        if any(desc_conta[i:i+5] in desc_candidato for i in range(len(desc_conta)-4)):
-                            correspondencias_aprox.append({
-                                'tipo': 'valor_exato_desc_similar',
-                                'conta_a_pagar_idx': idx,
-                                'conta_paga_idx': candidato.name,
-                                'diferenca_valor': 0,
-                                'similaridade_desc': 'alta'
-                            })
-                            continue
-            
-            # Critério 2: Valor aproximado (tolerância de R$ 1,00) + mesma descrição
-            candidatos_valor_aprox = df_pagas_restante[
-                (abs(df_pagas_restante['valor'] - conta_pagar['valor']) <= self.tolerancia_valor)
-            ]
-            
-            if not candidatos_valor_aprox.empty:
-                for _, candidato in candidatos_valor_aprox.iterrows():
-                    if 'descricao_norm' in conta_pagar and candidato['descricao_norm'] == conta_pagar['descricao_norm']:
-                        diferenca = abs(candidato['valor'] - conta_pagar['valor'])
-                        correspondencias_aprox.append({
-                            'tipo': 'valor_aprox_desc_exata',
-                            'conta_a_pagar_idx': idx,
-                            'conta_paga_idx': candidato.name,
-                            'diferenca_valor': diferenca,
-                            'similaridade_desc': 'exata'
-                        })
+        if df_a_pagar_restante.empty or df_pagas_restante.empty or 'valor' not in df_a_pagar_restante.columns \
+                or 'descricao_norm' not in df_a_pagar_restante.columns:
+            return pd.DataFrame()
         
-        # Converter para DataFrame
-        if correspondencias_aprox:
-            df_correspondencias_aprox = pd.DataFrame(correspondencias_aprox)
-            
-            # Adicionar dados das contas
-            result_data = []
-            for _, corresp in df_correspondencias_aprox.iterrows():
-                conta_pagar = df_a_pagar_restante.loc[corresp['conta_a_pagar_idx']]
-                conta_paga = df_pagas_restante.loc[corresp['conta_paga_idx']]
-                
-                row_data = {}
-                # Adicionar dados da conta a pagar
-                for col in conta_pagar.index:
-                    row_data[f'{col}_a_pagar'] = conta_pagar[col]
-                
-                # Adicionar dados da conta paga
-                for col in conta_paga.index:
-                    row_data[f'{col}_pagas'] = conta_paga[col]
-                
-                # Adicionar metadados da correspondência
-                row_data.update({
-                    'tipo_correspondencia': corresp['tipo'],
-                    'diferenca_valor': corresp['diferenca_valor'],
-                    'similaridade_desc': corresp['similaridade_desc']
-                })
-                
-                result_data.append(row_data)
-            
-            return pd.DataFrame(result_data)
+        # Critério 1: Valor exato + descrição similar (5 caracteres consecutivos em comum)
+        pares_similar = self._pares_valor_exato_desc_similar(df_a_pagar_restante, df_pagas_restante)
+        pares_similar['criterio'] = 0
+        pares_similar['tipo_correspondencia'] = 'valor_exato_desc_similar'
+        pares_similar['diferenca_valor'] = 0.0
+        pares_similar['similaridade_desc'] = 'alta'
+        
+        # Critério 2: Valor aproximado (dentro da tolerância) + mesma descrição
+        pares_exata = self._pares_valor_aprox_desc_exata(df_a_pagar_restante, df_pagas_restante)
+        pares_exata['criterio'] = 1
+        pares_exata['tipo_correspondencia'] = 'valor_aprox_desc_exata'
+        pares_exata['similaridade_desc'] = 'exata'
+        
+        pares = pd.concat([pares_similar, pares_exata], ignore_index=True)
+        if pares.empty:
+            return pd.DataFrame()
         
-        return pd.DataFrame()
+        # Mesma ordem da busca linha a linha: conta a pagar, critério, pagamento
+        pares = pares.sort_values(['pos_a_pagar', 'criterio', 'pos_pagas'], kind='stable').reset_index(drop=True)
+        
+        return pd.concat([
+            df_a_pagar_restante.iloc[pares['pos_a_pagar'].to_numpy()].add_suffix('_a_pagar').reset_index(drop=True),
+            df_pagas_restante.iloc[pares['pos_pagas'].to_numpy()].add_suffix('_pagas').reset_index(drop=True),
+            pares[['tipo_correspondencia', 'diferenca_valor', 'similaridade_desc']]
+        ], axis=1)
+    
+    def _pares_valor_exato_desc_similar(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                                        tamanho: int = 5) -> pd.DataFrame:
+        """
+        Pares com o mesmo valor cuja descrição compartilha `tamanho` caracteres consecutivos.
+        
+        Monta um índice invertido (valor, n-grama) -> descrições das contas pagas.
+        Cada descrição distinta das contas a pagar é consultada uma vez por valor:
+        as candidatas são a união dos conjuntos dos seus n-gramas. Depois os pares
+        de descrições são expandidos para pares de linhas com merges.
+        
+        Returns:
+            DataFrame com as posições (iloc) `pos_a_pagar` e `pos_pagas`
+        """
+        vazio = pd.DataFrame({'pos_a_pagar': pd.Series(dtype=int), 'pos_pagas': pd.Series(dtype=int)})
+        if 'valor' not in df_pagas.columns or 'descricao_norm' not in df_pagas.columns:
+            return vazio
+        
+        lado_a_pagar = self._linhas_por_descricao(df_a_pagar, tamanho)
+        lado_pagas = self._linhas_por_descricao(df_pagas, tamanho)
+        if lado_a_pagar.empty or lado_pagas.empty:
+            return vazio
+        
+        # Índice invertido (valor, n-grama) -> ids das descrições das contas pagas
+        grupos_pagas = lado_pagas[['valor', 'descricao_norm', 'grupo']].drop_duplicates('grupo')
+        indice: Dict[tuple, set] = {}
+        for valor, descricao, grupo in grupos_pagas.itertuples(index=False):
+            for i in range(len(descricao) - tamanho + 1):
+                indice.setdefault((valor, descricao[i:i + tamanho]), set()).add(grupo)
+        
+        grupos_a_pagar = lado_a_pagar[['valor', 'descricao_norm', 'grupo']].drop_duplicates('grupo')
+        pares_grupos = []
+        for valor, descricao, grupo in grupos_a_pagar.itertuples(index=False):
+            candidatos = set().union(*(
+                indice.get((valor, descricao[i:i + tamanho]), ())
+                for i in range(len(descricao) - tamanho + 1)
+            ))
+            pares_grupos.extend((grupo, candidato) for candidato in candidatos)
+        
+        if not pares_grupos:
+            return vazio
+        
+        pares_grupos = pd.DataFrame(pares_grupos, columns=['grupo_a_pagar', 'grupo_pagas'])
+        pares = (pares_grupos
+                 .merge(lado_a_pagar[['grupo', 'posicao']].rename(columns={'grupo': 'grupo_a_pagar', 'posicao': 'pos_a_pagar'}),
+                        on='grupo_a_pagar')
+                 .merge(lado_pagas[['grupo', 'posicao']].rename(columns={'grupo': 'grupo_pagas', 'posicao': 'pos_pagas'}),
+                        on='grupo_pagas'))
+        return pares[['pos_a_pagar', 'pos_pagas']]
+    
+    def _linhas_por_descricao(self, df: pd.DataFrame, tamanho: int) -> pd.DataFrame:
+        """
+        Linhas com valor e descrição de pelo menos `tamanho` caracteres, com o id
+        (`grupo`) do par (valor, descrição) a que pertencem.
+        """
+        linhas = pd.DataFrame({
+            'valor': df['valor'].to_numpy(),
+            'descricao_norm': df['descricao_norm'].astype(str).to_numpy(),
+            'posicao': np.arange(len(df))
+        })
+        linhas = linhas[linhas['valor'].notna() & (linhas['descricao_norm'].str.len() >= tamanho)]
+        linhas['grupo'] = linhas.groupby(['valor', 'descricao_norm'], sort=False).ngroup()
+        return linhas
+    
+    def _pares_valor_aprox_desc_exata(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame) -> pd.DataFrame:
+        """
+        Pares com a mesma descrição e diferença de valor dentro de `tolerancia_valor`.
+        
+        Os valores são agrupados em faixas da largura da tolerância: só as faixas
+        vizinhas podem conter candidatos, então o merge é feito por (descrição,
+        faixa) em vez de cruzar todas as linhas com a mesma descrição.
+        
+        Returns:
+            DataFrame com `pos_a_pagar`, `pos_pagas` e `diferenca_valor` (absoluta)
+        """
+        vazio = pd.DataFrame({'pos_a_pagar': pd.Series(dtype=int), 'pos_pagas': pd.Series(dtype=int),
+                              'diferenca_valor': pd.Series(dtype=float)})
+        if 'valor' not in df_pagas.columns or 'descricao_norm' not in df_pagas.columns:
+            return vazio
+        
+        largura = max(float(self.tolerancia_valor), 0.01)
+        
+        def preparar(df: pd.DataFrame, lado: str) -> pd.DataFrame:
+            linhas = pd.DataFrame({
+                'descricao_norm': df['descricao_norm'].to_numpy(),
+                f'valor_{lado}': pd.to_numeric(df['valor'], errors='coerce').to_numpy(),
+                f'pos_{lado}': np.arange(len(df))
+            })
+            linhas = linhas[linhas[f'valor_{lado}'].notna() & linhas['descricao_norm'].notna()]
+            linhas['faixa'] = np.floor(linhas[f'valor_{lado}'] / largura).astype(np.int64)
+            return linhas
+        
+        lado_a_pagar = preparar(df_a_pagar, 'a_pagar')
+        lado_pagas = preparar(df_pagas, 'pagas')
+        if lado_a_pagar.empty or lado_pagas.empty:
+            return vazio
+        
+        partes = []
+        for deslocamento in (-1, 0, 1):
+            vizinhos = lado_pagas.assign(faixa=lado_pagas['faixa'] - deslocamento)
+            partes.append(lado_a_pagar.merge(vizinhos, on=['descricao_norm', 'faixa']))
+        pares = pd.concat(partes, ignore_index=True)
+        
+        pares['diferenca_valor'] = (pares['valor_pagas'] - pares['valor_a_pagar']).abs()
+        pares = pares[pares['diferenca_valor'] <= self.tolerancia_valor]
+        return pares[['pos_a_pagar', 'pos_pagas', 'diferenca_valor']]
     
     def _identificar_contas_nao_pagas(self, df_a_pagar: pd.DataFrame, 
-                                    correspondencias_exatas: pd.DataFrame,
                                     correspondencias_aproximadas: pd.DataFrame) -> pd.DataFrame:
         """
         Identifica contas a pagar que não têm correspondência nas contas pagas.
+        
+        Recebe apenas as contas que sobraram das correspondências exatas.
         """
-        # Chaves das contas que já têm correspondência
+        # Chaves das contas que já têm correspondência aproximada
         chaves_correspondidas = set()
         
-        if not correspondencias_exatas.empty and 'chave_comparacao' in correspondencias_exatas.columns:
-            chaves_correspondidas.update(correspondencias_exatas['chave_comparacao'].dropna())
-        
         if not correspondencias_aproximadas.empty and 'chave_comparacao' in correspondencias_aproximadas.columns:
             chaves_correspondidas.update(correspondencias_aproximadas['chave_comparacao'].dropna())
         
@@ -656,17 +715,15 @@ class ComparadorContasAPagarVsPagas:
         return contas_nao_pagas
     
     def _identificar_pagamentos_sem_conta(self, df_pagas: pd.DataFrame,
-                                        correspondencias_exatas: pd.DataFrame,
                                         correspondencias_aproximadas: pd.DataFrame) -> pd.DataFrame:
         """
         Identifica pagamentos que não têm correspondência nas contas a pagar.
+        
+        Recebe apenas os pagamentos que sobraram das correspondências exatas.
         """
-        # Chaves dos pagamentos que já têm correspondência
+        # Chaves dos pagamentos que já têm correspondência aproximada
         chaves_correspondidas = set()
         
-        if not correspondencias_exatas.empty and 'chave_comparacao' in correspondencias_exatas.columns:
-            chaves_correspondidas.update(correspondencias_exatas['chave_comparacao'].dropna())
-        
         if not correspondencias_aproximadas.empty and 'chave_comparacao' in correspondencias_aproximadas.columns:
             chaves_correspondidas.update(correspondencias_aproximadas['chave_comparacao'].dropna())
         
@@ -0,0 +1,188 @@
+"""
+Modelo colunar para o resultado da conciliação entre contas a pagar e contas pagas.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class Correspondencias(Mapping):
+    """
+    Resultado de `PaymentAnalyzer.encontrar_correspondencias` em formato colunar.
+
+    Guarda os DataFrames de origem e as posições (iloc) dos pares casados, com as
+    diferenças de dias e de valor em arrays. Continua acessível como o dicionário
+    de antes (`correspondencias['exatas']`, ...): as listas de dicts só são
+    montadas quando a chave é lida, e ficam guardadas para as próximas leituras.
+    Relatórios e resumos devem preferir `pares()` e `contas()`.
+    """
+
+    TIPOS_PARES = ('exatas', 'aproximadas')
+    TIPOS_CONTAS = ('nao_encontradas', 'pagamentos_extras')
+    CHAVES = TIPOS_PARES + TIPOS_CONTAS
+
+    def __init__(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                 pares: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+                 motivos: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            df_a_pagar: Contas a pagar (já preparadas para comparação)
+            df_pagas: Contas pagas (já preparadas para comparação)
+            pares: Para 'exatas' e 'aproximadas', posições (contas a pagar, pagas)
+            motivos: Motivo registrado em cada par de um tipo (ex.: aproximadas)
+        """
+        self.df_a_pagar = df_a_pagar.reset_index(drop=True)
+        self.df_pagas = df_pagas.reset_index(drop=True)
+        self._motivos = motivos or {}
+        self._materializado: Dict[str, List[Dict]] = {}
+
+        pares = pares or {}
+        vazio = np.array([], dtype=int)
+        self._pares = {
+            tipo: tuple(np.asarray(posicoes, dtype=int) for posicoes in pares.get(tipo, (vazio, vazio)))
+            for tipo in self.TIPOS_PARES
+        }
+
+        a_pagar_casadas = np.zeros(len(self.df_a_pagar), dtype=bool)
+        pagas_casadas = np.zeros(len(self.df_pagas), dtype=bool)
+        for pos_a_pagar, pos_pagas in self._pares.values():
+            a_pagar_casadas[pos_a_pagar] = True
+            pagas_casadas[pos_pagas] = True
+        self._sobras = {
+            'nao_encontradas': np.flatnonzero(~a_pagar_casadas),
+            'pagamentos_extras': np.flatnonzero(~pagas_casadas)
+        }
+
+        self._diferencas = {tipo: self._calcular_diferencas(*self._pares[tipo]) for tipo in self.TIPOS_PARES}
+
+    def _coluna(self, df: pd.DataFrame, coluna: str, posicoes: np.ndarray) -> pd.Series:
+        """Coluna nas posições indicadas (NaN quando a coluna não existe)."""
+        if coluna in df.columns:
+            return df[coluna].iloc[posicoes].reset_index(drop=True)
+        return pd.Series([None] * len(posicoes), dtype=object)
+
+    def _calcular_diferencas(self, pos_a_pagar: np.ndarray, pos_pagas: np.ndarray) -> Dict[str, np.ndarray]:
+        """Diferenças (pago - a pagar) de dias e valor de cada par."""
+        datas_pagamento = pd.to_datetime(self._coluna(self.df_pagas, 'data_pagamento', pos_pagas), errors='coerce')
+        datas_vencimento = pd.to_datetime(self._coluna(self.df_a_pagar, 'data_vencimento', pos_a_pagar), errors='coerce')
+        valores_pagos = pd.to_numeric(self._coluna(self.df_pagas, 'valor', pos_pagas), errors='coerce')
+        valores_a_pagar = pd.to_numeric(self._coluna(self.df_a_pagar, 'valor', pos_a_pagar), errors='coerce')
+
+        return {
+            'diferenca_dias': (datas_pagamento - datas_vencimento).dt.days.to_numpy(dtype=float),
+            'diferenca_valor': (valores_pagos - valores_a_pagar).to_numpy(dtype=float)
+        }
+
+    # ============================================
+    # ACESSO COLUNAR
+    # ============================================
+
+    def quantidade(self, chave: str) -> int:
+        """Número de itens de uma chave, sem materializar a lista."""
+        if chave in self.TIPOS_PARES:
+            return len(self._pares[chave][0])
+        if chave in self.TIPOS_CONTAS:
+            return len(self._sobras[chave])
+        raise KeyError(chave)
+
+    def posicoes(self, chave: str):
+        """Posições (iloc) de uma chave: tupla (a pagar, pagas) para pares, array para contas."""
+        if chave in self.TIPOS_PARES:
+            return self._pares[chave]
+        if chave in self.TIPOS_CONTAS:
+            return self._sobras[chave]
+        raise KeyError(chave)
+
+    def pares(self, chave: str, colunas_a_pagar: Optional[Sequence[str]] = None,
+              colunas_pagas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Tabela dos pares de um tipo ('exatas' ou 'aproximadas').
+
+        As colunas das contas a pagar recebem o sufixo `_a_pagar` e as das contas
+        pagas o sufixo `_pago`; seguem `diferenca_dias`, `diferenca_valor` e, quando
+        houver, `motivo_aproximacao`. Colunas pedidas e inexistentes vêm vazias.
+
+        Args:
+            chave: 'exatas' ou 'aproximadas'
+            colunas_a_pagar: Colunas das contas a pagar (padrão: todas)
+            colunas_pagas: Colunas das contas pagas (padrão: todas)
+        """
+        if chave not in self.TIPOS_PARES:
+            raise KeyError(chave)
+
+        pos_a_pagar, pos_pagas = self._pares[chave]
+        colunas_a_pagar = self.df_a_pagar.columns if colunas_a_pagar is None else colunas_a_pagar
+        colunas_pagas = self.df_pagas.columns if colunas_pagas is None else colunas_pagas
+
+        dados = {}
+        for coluna in colunas_a_pagar:
+            dados[f'{coluna}_a_pagar'] = self._coluna(self.df_a_pagar, coluna, pos_a_pagar)
+        for coluna in colunas_pagas:
+            dados[f'{coluna}_pago'] = self._coluna(self.df_pagas, coluna, pos_pagas)
+        dados['diferenca_dias'] = self._diferencas[chave]['diferenca_dias']
+        dados['diferenca_valor'] = self._diferencas[chave]['diferenca_valor']
+        if chave in self._motivos:
+            dados['motivo_aproximacao'] = self._motivos[chave]
+
+        return pd.DataFrame(dados, index=pd.RangeIndex(len(pos_a_pagar)))
+
+    def contas(self, chave: str, colunas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Contas sem correspondência ('nao_encontradas' ou 'pagamentos_extras')."""
+        if chave not in self.TIPOS_CONTAS:
+            raise KeyError(chave)
+
+        df = self.df_a_pagar if chave == 'nao_encontradas' else self.df_pagas
+        if colunas is not None:
+            df = df.reindex(columns=list(colunas))
+        return df.iloc[self._sobras[chave]].reset_index(drop=True)
+
+    # ============================================
+    # COMPATIBILIDADE COM O FORMATO DE DICIONÁRIO
+    # ============================================
+
+    def _materializar(self, chave: str) -> List[Dict]:
+        """Monta a lista de dicts no formato antigo para uma chave."""
+        if chave in self.TIPOS_CONTAS:
+            return self.contas(chave).to_dict('records')
+
+        pos_a_pagar, pos_pagas = self._pares[chave]
+        contas_a_pagar = self.df_a_pagar.iloc[pos_a_pagar].to_dict('records')
+        contas_pagas = self.df_pagas.iloc[pos_pagas].to_dict('records')
+        diferencas = self._diferencas[chave]
+        motivo = self._motivos.get(chave)
+
+        lista = []
+        for conta_pagar, conta_paga, dias, valor in zip(
+            contas_a_pagar, contas_pagas,
+            diferencas['diferenca_dias'].tolist(), diferencas['diferenca_valor'].tolist()
+        ):
+            par = {
+                'conta_a_pagar': conta_pagar,
+                'conta_paga': conta_paga,
+                'diferenca_dias': None if np.isnan(dias) else int(dias),
+                'diferenca_valor': valor
+            }
+            if motivo:
+                par['motivo_aproximacao'] = motivo
+            lista.append(par)
+        return lista
+
+    def __getitem__(self, chave: str) -> List[Dict]:
+        if chave not in self.CHAVES:
+            raise KeyError(chave)
+        if chave not in self._materializado:
+            self._materializado[chave] = self._materializar(chave)
+        return self._materializado[chave]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.CHAVES)
+
+    def __len__(self) -> int:
+        return len(self.CHAVES)
+
+    def __repr__(self) -> str:
+        contagens = ', '.join(f'{chave}={self.quantidade(chave)}' for chave in self.CHAVES)
+        return f'Correspondencias({contagens})'
@@ -0,0 +1,96 @@
+"""
+Cache em memória para consultas ao Supabase.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+
+class CacheConsultas:
+    """
+    Cache LRU com expiração (TTL) para resultados de consultas por usuário.
+
+    As chaves começam por (user_id, tabela) e incluem a versão do conjunto de
+    dados daquele usuário/tabela. Cada escrita incrementa a versão, de modo que
+    resultados antigos nunca são reaproveitados mesmo antes de expirarem.
+    """
+
+    def __init__(self, max_itens: int = 32, ttl_segundos: float = 120):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_itens: Quantidade máxima de resultados mantidos (LRU)
+            ttl_segundos: Tempo de vida de cada resultado em segundos
+        """
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self._itens: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._versoes: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def versao(self, user_id: str, tabela: str) -> int:
+        """Retorna a versão atual do conjunto de dados do usuário na tabela."""
+        with self._lock:
+            return self._versoes.get((user_id, tabela), 0)
+
+    def chave(self, user_id: str, tabela: str, *filtros: Any) -> Tuple:
+        """Monta a chave de cache para uma consulta, já com a versão dos dados."""
+        return (user_id, tabela, self.versao(user_id, tabela)) + tuple(filtros)
+
+    def obter(self, chave: Tuple) -> Optional[Any]:
+        """Retorna o valor em cache (cópia, se for DataFrame) ou None se ausente/expirado."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return None
+
+            self._itens.move_to_end(chave)
+
+        # Chamadores alteram colunas do DataFrame retornado
+        return valor.copy() if isinstance(valor, pd.DataFrame) else valor
+
+    def guardar(self, chave: Tuple, valor: Any):
+        """Armazena um valor, descartando os menos usados se o limite for atingido."""
+        if isinstance(valor, pd.DataFrame):
+            valor = valor.copy()
+
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, user_id: str, tabela: Optional[str] = None):
+        """
+        Invalida os resultados de um usuário.
+
+        Args:
+            user_id: Usuário cujos dados foram alterados
+            tabela: Tabela alterada; se None, todas as tabelas do usuário
+        """
+        with self._lock:
+            tabelas = {t for (u, t) in self._versoes if u == user_id}
+            tabelas.update(t for (u, t, *_resto) in self._itens if u == user_id)
+            if tabela is not None:
+                tabelas = {tabela}
+
+            for t in tabelas:
+                self._versoes[(user_id, t)] = self._versoes.get((user_id, t), 0) + 1
+
+            for chave in [c for c in self._itens if c[0] == user_id and c[1] in tabelas]:
+                del self._itens[chave]
+
+    def limpar(self):
+        """Remove todos os resultados em cache."""
+        with self._lock:
+            self._itens.clear()
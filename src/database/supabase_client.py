@@ -3,13 +3,21 @@ Cliente Supabase para o Calendário Financeiro.
 """
 
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import pandas as pd
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timedelta
 import uuid
+import hashlib
+import threading
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import time
+
+from .cache import CacheConsultas
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -34,6 +42,20 @@ class SupabaseClient(CompartilhamentoMixin):
         
         self.supabase: Client = create_client(self.url, self.key)
         self.user_id: Optional[str] = None
+        
+        # Desativado automaticamente se as tabelas ainda não tiverem a coluna fingerprint
+        self._fingerprint_disponivel = True
+        # Protege a desativação feita pelas threads de inserção em lotes
+        self._lock_fingerprint = threading.Lock()
+        
+        # Cache das leituras, invalidado a cada escrita do usuário
+        self._cache = CacheConsultas()
+        
+        # Funções RPC que não existem no banco (evita repetir chamadas que falham)
+        self._rpcs_indisponiveis = set()
+        
+        # Desativado apenas se a tabela correspondencias não existir
+        self._conciliacao_disponivel = True
     
     def set_user_id(self, user_id: str):
         """Define o ID do usuário atual para as operações."""
@@ -223,6 +245,205 @@ class SupabaseClient(CompartilhamentoMixin):
         except (AttributeError, ValueError):
             return None
     
+    # ==================== ERROS ====================
+    
+    def _codigo_erro(self, erro: Exception) -> str:
+        """Código do erro do PostgREST/Postgres (ex.: '42703', 'PGRST202'), ou '' se não houver."""
+        return str(getattr(erro, 'code', None) or '')
+    
+    def _eh_coluna_inexistente(self, erro: Exception, coluna: str) -> bool:
+        """Indica se o erro é de coluna inexistente (42703 no Postgres, PGRST204 no PostgREST)."""
+        return self._codigo_erro(erro) in ('42703', 'PGRST204') and coluna in str(erro)
+    
+    def _eh_funcao_inexistente(self, erro: Exception) -> bool:
+        """Indica se o erro é de função RPC inexistente (PGRST202 no PostgREST, 42883 no Postgres)."""
+        return self._codigo_erro(erro) in ('PGRST202', '42883')
+    
+    def _eh_tabela_inexistente(self, erro: Exception) -> bool:
+        """Indica se o erro é de tabela inexistente (42P01 no Postgres, PGRST205 no PostgREST)."""
+        return self._codigo_erro(erro) in ('42P01', 'PGRST205')
+    
+    # ==================== CACHE ====================
+    
+    def _invalidar_cache(self, tabela: str = None):
+        """Descarta as leituras em cache do usuário atual após uma escrita."""
+        if self.user_id:
+            self._cache.invalidar(self.user_id, tabela)
+    
+    def _chamar_rpc(self, nome: str, parametros: Dict[str, Any]) -> Optional[Any]:
+        """
+        Chama uma função RPC do banco.
+        
+        Retorna None em caso de erro, para que quem chama use o cálculo local.
+        Só a falta da função é lembrada (as próximas chamadas vão direto ao
+        cálculo local); erros transitórios afetam apenas esta chamada.
+        """
+        if nome in self._rpcs_indisponiveis:
+            return None
+        
+        try:
+            return self.supabase.rpc(nome, parametros).execute().data
+        except Exception as e:
+            if self._eh_funcao_inexistente(e):
+                print(f"Aviso: RPC {nome} não instalada, usando cálculo local: {e}")
+                self._rpcs_indisponiveis.add(nome)
+            else:
+                print(f"Aviso: erro na RPC {nome}, usando cálculo local nesta chamada: {e}")
+            return None
+    
+    # ==================== PAGINAÇÃO ====================
+    
+    def _iterar_paginas(self, tabela: str, coluna_data: str, filtros: Dict[str, Any],
+                        data_inicio: str = None, data_fim: str = None,
+                        page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Percorre uma tabela por keyset (coluna_data, id), uma página por vez.
+        
+        Cada página continua a partir da última linha da anterior, sem OFFSET,
+        então o custo por página é constante mesmo em tabelas grandes. O fim é
+        detectado por uma página vazia, e não por uma página menor que
+        `page_size`: se o max-rows do PostgREST for menor que `page_size`, todas
+        as páginas vêm cortadas e nenhuma linha é perdida.
+        
+        Linhas com `coluna_data` nula não entram no cursor por data: sem filtro
+        de período, elas são percorridas ao final, ordenadas apenas por id.
+        """
+        cursor = None
+        
+        while True:
+            query = self._consulta_paginada(tabela, filtros).not_.is_(coluna_data, "null")
+            if data_inicio:
+                query = query.gte(coluna_data, data_inicio)
+            if data_fim:
+                query = query.lte(coluna_data, data_fim)
+            if cursor:
+                ultima_data, ultimo_id = cursor
+                query = query.or_(
+                    f"{coluna_data}.gt.{ultima_data},and({coluna_data}.eq.{ultima_data},id.gt.{ultimo_id})"
+                )
+            
+            response = query.order(coluna_data, desc=False).order("id", desc=False).limit(page_size).execute()
+            pagina = response.data or []
+            
+            if not pagina:
+                break
+            yield pagina
+            
+            cursor = (pagina[-1][coluna_data], pagina[-1]['id'])
+        
+        if not data_inicio and not data_fim:
+            yield from self._iterar_paginas_sem_data(tabela, coluna_data, filtros, page_size)
+    
+    def _iterar_paginas_sem_data(self, tabela: str, coluna_data: str, filtros: Dict[str, Any],
+                                 page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """Percorre por keyset de id as linhas com `coluna_data` nula."""
+        ultimo_id = None
+        
+        while True:
+            query = self._consulta_paginada(tabela, filtros).is_(coluna_data, "null")
+            if ultimo_id is not None:
+                query = query.gt("id", ultimo_id)
+            
+            response = query.order("id", desc=False).limit(page_size).execute()
+            pagina = response.data or []
+            
+            if not pagina:
+                break
+            yield pagina
+            
+            ultimo_id = pagina[-1]['id']
+    
+    def _consulta_paginada(self, tabela: str, filtros: Dict[str, Any]):
+        """Monta o select de `tabela` com os filtros de igualdade da paginação."""
+        query = self.supabase.table(tabela).select("*")
+        for coluna, valor in filtros.items():
+            query = query.eq(coluna, valor)
+        return query
+    
+    def _limites_datas(self, tabela: str, coluna_data: str, filtros: Dict[str, Any]) -> tuple:
+        """Retorna a menor e a maior data não nula da tabela para os filtros informados."""
+        limites = []
+        for desc in (False, True):
+            query = self.supabase.table(tabela).select(coluna_data).not_.is_(coluna_data, "null")
+            for coluna, valor in filtros.items():
+                query = query.eq(coluna, valor)
+            response = query.order(coluna_data, desc=desc).limit(1).execute()
+            limites.append(str(response.data[0][coluna_data])[:10] if response.data else None)
+        return tuple(limites)
+    
+    def _particionar_datas(self, data_inicio: str, data_fim: str, particoes: int) -> List[tuple]:
+        """Divide o intervalo [data_inicio, data_fim] em até `particoes` faixas contíguas de dias."""
+        inicio = datetime.strptime(data_inicio[:10], '%Y-%m-%d')
+        fim = datetime.strptime(data_fim[:10], '%Y-%m-%d')
+        total_dias = (fim - inicio).days + 1
+        particoes = max(1, min(particoes, total_dias))
+        
+        faixas = []
+        for i in range(particoes):
+            faixa_inicio = inicio + timedelta(days=(total_dias * i) // particoes)
+            faixa_fim = inicio + timedelta(days=(total_dias * (i + 1)) // particoes - 1)
+            faixas.append((faixa_inicio.strftime('%Y-%m-%d'), faixa_fim.strftime('%Y-%m-%d')))
+        return faixas
+    
+    def _buscar_paginado(self, tabela: str, coluna_data: str, filtros: Dict[str, Any],
+                         data_inicio: str = None, data_fim: str = None,
+                         page_size: int = 1000, particoes: int = 1) -> pd.DataFrame:
+        """
+        Busca todas as linhas que atendem aos filtros, sem o limite fixo de 10.000.
+        
+        Com `particoes` > 1 o intervalo de datas é dividido em faixas buscadas em
+        paralelo. As páginas são acumuladas como registros e o DataFrame é montado
+        uma única vez, na ordem (coluna_data, id).
+        
+        O resultado fica em cache por usuário, tabela e filtros até expirar ou até
+        a próxima escrita do usuário nessa tabela.
+        """
+        chave_cache = self._cache.chave(
+            self.user_id, tabela, tuple(sorted(filtros.items())), data_inicio, data_fim
+        )
+        df_cache = self._cache.obter(chave_cache)
+        if df_cache is not None:
+            return df_cache
+        
+        # As faixas derivadas dos limites da tabela não cobrem as datas nulas
+        buscar_sem_data = particoes > 1 and not data_inicio and not data_fim
+        
+        if particoes > 1:
+            if not data_inicio or not data_fim:
+                menor, maior = self._limites_datas(tabela, coluna_data, filtros)
+                if menor is None:
+                    faixas = []
+                else:
+                    faixas = self._particionar_datas(data_inicio or menor, data_fim or maior, particoes)
+            else:
+                faixas = self._particionar_datas(data_inicio, data_fim, particoes)
+        else:
+            faixas = [(data_inicio, data_fim)]
+        
+        def buscar_faixa(faixa: tuple) -> List[Dict[str, Any]]:
+            registros = []
+            for pagina in self._iterar_paginas(tabela, coluna_data, filtros, faixa[0], faixa[1], page_size):
+                registros.extend(pagina)
+            return registros
+        
+        if len(faixas) == 1:
+            registros = buscar_faixa(faixas[0])
+        elif faixas:
+            with ThreadPoolExecutor(max_workers=len(faixas)) as executor:
+                registros = []
+                for parte in executor.map(buscar_faixa, faixas):
+                    registros.extend(parte)
+        else:
+            registros = []
+        
+        if buscar_sem_data:
+            for pagina in self._iterar_paginas_sem_data(tabela, coluna_data, filtros, page_size):
+                registros.extend(pagina)
+        
+        df = pd.DataFrame(registros) if registros else pd.DataFrame()
+        self._cache.guardar(chave_cache, df)
+        return df
+    
     # ==================== CONTAS A PAGAR ====================
     
     def inserir_contas_a_pagar(self, df: pd.DataFrame, arquivo_origem: str = None, processamento_id: str = None, verificar_duplicatas: bool = True) -> Dict[str, Any]:
@@ -230,6 +451,7 @@ class SupabaseClient(CompartilhamentoMixin):
         if not self.user_id:
             return {"success": False, "error": "Usuário não autenticado"}
         
+        gravacao_iniciada = False
         try:
             # Verificar se o usuário existe na tabela usuarios
             self._garantir_usuario_existe()
@@ -243,10 +465,18 @@ class SupabaseClient(CompartilhamentoMixin):
             else:
                 processamento_id = str(uuid.uuid4())
             
-            # Verificar duplicatas se solicitado
+            # Verificar duplicatas se solicitado; sem verificação a inserção é forçada,
+            # sem fingerprint e portanto sem o upsert que descartaria reimportações
             duplicatas_info = {"duplicatas": 0, "novos": len(df), "df_novos": df}
             if verificar_duplicatas:
-                duplicatas_info = self.verificar_duplicatas_contas_a_pagar(df)
+                # Impressão digital de cada linha para importações idempotentes
+                df = self._aplicar_fingerprints(df, 'data_vencimento')
+                
+                # Reimportações exatas são resolvidas pela fingerprint; a similaridade
+                # só roda para as linhas ainda desconhecidas
+                df, duplicatas_exatas = self._separar_fingerprints_existentes("contas_a_pagar", df)
+                duplicatas_info = self.verificar_duplicatas_contas_a_pagar(df) if len(df) > 0 else {"duplicatas": 0, "novos": 0, "df_novos": df}
+                duplicatas_info["duplicatas"] += duplicatas_exatas
                 df = duplicatas_info["df_novos"]
                 
                 # Se não há registros novos, retornar
@@ -259,71 +489,17 @@ class SupabaseClient(CompartilhamentoMixin):
                     }
             
             # Preparar dados para inserção
-            registros = []
-            for _, row in df.iterrows():
-                try:
-                    # Tratar valor
-                    valor = row.get('valor', 0)
-                    if pd.isna(valor):
-                        valor = 0
-                    valor = float(valor)
-                    
-                    # Tratar data
-                    data_vencimento = row.get('data_vencimento', '')
-                    if pd.isna(data_vencimento):
-                        data_vencimento = '2025-01-01'
-                    else:
-                        # Converter para string se for datetime
-                        if hasattr(data_vencimento, 'strftime'):
-                            data_vencimento = data_vencimento.strftime('%Y-%m-%d')
-                        else:
-                            data_vencimento = str(data_vencimento)
-                    
-                    # Tratar strings
-                    empresa = str(row.get('empresa', '')).strip() if not pd.isna(row.get('empresa', '')) else ''
-                    descricao = str(row.get('descricao', '')).strip() if not pd.isna(row.get('descricao', '')) else ''
-                    categoria = str(row.get('categoria', '')).strip() if not pd.isna(row.get('categoria', '')) else ''
-                    fornecedor = str(row.get('fornecedor', '')).strip() if not pd.isna(row.get('fornecedor', '')) else ''
-                    
-                    registro = {
-                        "usuario_id": self.user_id,
-                        "empresa": empresa,
-                        "valor": valor,
-                        "data_vencimento": data_vencimento,
-                        "descricao": descricao,
-                        "categoria": categoria,
-                        "fornecedor": fornecedor,
-                        "arquivo_origem": arquivo_origem,
-                        "processamento_id": processamento_id
-                    }
-                    registros.append(registro)
-                    
-                except Exception as row_error:
-                    print(f"Erro ao processar linha: {row_error}")
-                    continue
-            
-            # Inserir no banco em lotes menores para evitar timeout
-            batch_size = 100
-            total_inseridos = 0
-            
-            for i in range(0, len(registros), batch_size):
-                batch = registros[i:i + batch_size]
-                
-                try:
-                    response = self.supabase.table("contas_a_pagar").insert(batch).execute()
-                    total_inseridos += len(batch)
-                    print(f"Lote {i//batch_size + 1}: {len(batch)} registros inseridos")
-                    
-                except Exception as batch_error:
-                    print(f"Erro no lote {i//batch_size + 1}: {batch_error}")
-                    # Tentar inserir um por um se der erro no lote
-                    for registro in batch:
-                        try:
-                            self.supabase.table("contas_a_pagar").insert(registro).execute()
-                            total_inseridos += 1
-                        except Exception as single_error:
-                            print(f"Erro ao inserir registro individual: {single_error}")
-                            continue
+            registros = self._preparar_registros(
+                df,
+                coluna_data="data_vencimento",
+                colunas_texto=["empresa", "descricao", "categoria", "fornecedor"],
+                fixos={"arquivo_origem": arquivo_origem, "processamento_id": processamento_id}
+            )
+            
+            # Inserir no banco em lotes paralelos com tamanho adaptativo
+            gravacao_iniciada = True
+            resultado_insercao = self._inserir_em_lotes("contas_a_pagar", registros, rotulo="Lote")
+            total_inseridos = resultado_insercao["registros_inseridos"]
             
             # Preparar mensagem final
             mensagem = f"{total_inseridos} contas a pagar inseridas com sucesso!"
@@ -334,6 +510,8 @@ class SupabaseClient(CompartilhamentoMixin):
                 "success": True,
                 "registros_inseridos": total_inseridos,
                 "duplicatas_ignoradas": duplicatas_info["duplicatas"] if verificar_duplicatas else 0,
+                "registros_com_erro": resultado_insercao["registros_com_erro"],
+                "lotes": resultado_insercao["lotes"],
                 "message": mensagem
             }
             
@@ -343,34 +521,43 @@ class SupabaseClient(CompartilhamentoMixin):
                 "error": str(e),
                 "message": f"Erro ao inserir contas a pagar: {str(e)}"
             }
+        finally:
+            # Mesmo com erro no meio, lotes anteriores podem ter sido gravados
+            if gravacao_iniciada:
+                self._invalidar_cache("contas_a_pagar")
     
-    def buscar_contas_a_pagar(self, empresa: str = None, data_inicio: str = None, data_fim: str = None) -> pd.DataFrame:
+    def buscar_contas_a_pagar(self, empresa: str = None, data_inicio: str = None, data_fim: str = None,
+                              page_size: int = 1000, particoes: int = 1) -> pd.DataFrame:
         """Busca contas a pagar do usuário."""
         if not self.user_id:
             return pd.DataFrame()
         
         try:
-            query = self.supabase.table("contas_a_pagar").select("*").eq("usuario_id", self.user_id).order("data_vencimento", desc=False).order("id", desc=False).limit(10000)
-            
-            # Filtros opcionais
+            filtros = {"usuario_id": self.user_id}
             if empresa:
-                query = query.eq("empresa", empresa)
-            if data_inicio:
-                query = query.gte("data_vencimento", data_inicio)
-            if data_fim:
-                query = query.lte("data_vencimento", data_fim)
-            
-            response = query.execute()
+                filtros["empresa"] = empresa
             
-            if response.data:
-                return pd.DataFrame(response.data)
-            else:
-                return pd.DataFrame()
+            return self._buscar_paginado("contas_a_pagar", "data_vencimento", filtros,
+                                         data_inicio, data_fim, page_size, particoes)
                 
         except Exception as e:
             print(f"Erro ao buscar contas a pagar: {e}")
             return pd.DataFrame()
     
+    def iterar_contas_a_pagar(self, empresa: str = None, data_inicio: str = None, data_fim: str = None,
+                              page_size: int = 1000) -> Iterator[pd.DataFrame]:
+        """Percorre as contas a pagar do usuário em DataFrames do tamanho de uma página."""
+        if not self.user_id:
+            return
+        
+        filtros = {"usuario_id": self.user_id}
+        if empresa:
+            filtros["empresa"] = empresa
+        
+        for pagina in self._iterar_paginas("contas_a_pagar", "data_vencimento", filtros,
+                                           data_inicio, data_fim, page_size):
+            yield pd.DataFrame(pagina)
+    
     # ==================== CONTAS PAGAS ====================
     
     def inserir_contas_pagas(self, df: pd.DataFrame, arquivo_origem: str = None, processamento_id: str = None, verificar_duplicatas: bool = True) -> Dict[str, Any]:
@@ -378,6 +565,7 @@ class SupabaseClient(CompartilhamentoMixin):
         if not self.user_id:
             return {"success": False, "error": "Usuário não autenticado"}
         
+        gravacao_iniciada = False
         try:
             # Verificar se o usuário existe na tabela usuarios
             self._garantir_usuario_existe()
@@ -391,10 +579,18 @@ class SupabaseClient(CompartilhamentoMixin):
             else:
                 processamento_id = str(uuid.uuid4())
             
-            # Verificar duplicatas se solicitado
+            # Verificar duplicatas se solicitado; sem verificação a inserção é forçada,
+            # sem fingerprint e portanto sem o upsert que descartaria reimportações
             duplicatas_info = {"duplicatas": 0, "novos": len(df), "df_novos": df}
             if verificar_duplicatas:
-                duplicatas_info = self.verificar_duplicatas_contas_pagas(df)
+                # Impressão digital de cada linha para importações idempotentes
+                df = self._aplicar_fingerprints(df, 'data_pagamento')
+                
+                # Reimportações exatas são resolvidas pela fingerprint; a similaridade
+                # só roda para as linhas ainda desconhecidas
+                df, duplicatas_exatas = self._separar_fingerprints_existentes("contas_pagas", df)
+                duplicatas_info = self.verificar_duplicatas_contas_pagas(df) if len(df) > 0 else {"duplicatas": 0, "novos": 0, "df_novos": df}
+                duplicatas_info["duplicatas"] += duplicatas_exatas
                 df = duplicatas_info["df_novos"]
                 
                 # Se não há registros novos, retornar
@@ -407,69 +603,18 @@ class SupabaseClient(CompartilhamentoMixin):
                     }
             
             # Preparar dados para inserção
-            registros = []
-            for _, row in df.iterrows():
-                try:
-                    # Tratar valor
-                    valor = row.get('valor', 0)
-                    if pd.isna(valor):
-                        valor = 0
-                    valor = float(valor)
-                    
-                    # Tratar data de pagamento
-                    data_pagamento = row.get('data_pagamento', row.get('data_vencimento', ''))
-                    if pd.isna(data_pagamento):
-                        data_pagamento = '2025-01-01'
-                    else:
-                        # Converter para string se for datetime
-                        if hasattr(data_pagamento, 'strftime'):
-                            data_pagamento = data_pagamento.strftime('%Y-%m-%d')
-                        else:
-                            data_pagamento = str(data_pagamento)
-                    
-                    # Tratar strings
-                    conta_corrente = str(row.get('conta_corrente', '')).strip() if not pd.isna(row.get('conta_corrente', '')) else ''
-                    descricao = str(row.get('descricao', '')).strip() if not pd.isna(row.get('descricao', '')) else ''
-                    categoria = str(row.get('categoria', '')).strip() if not pd.isna(row.get('categoria', '')) else ''
-                    
-                    registro = {
-                        "usuario_id": self.user_id,
-                        "conta_corrente": conta_corrente,
-                        "valor": valor,
-                        "data_pagamento": data_pagamento,
-                        "descricao": descricao,
-                        "categoria": categoria,
-                        "arquivo_origem": arquivo_origem,
-                        "processamento_id": processamento_id
-                    }
-                    registros.append(registro)
-                    
-                except Exception as row_error:
-                    print(f"Erro ao processar linha de conta paga: {row_error}")
-                    continue
-            
-            # Inserir no banco em lotes menores para evitar timeout
-            batch_size = 100
-            total_inseridos = 0
-            
-            for i in range(0, len(registros), batch_size):
-                batch = registros[i:i + batch_size]
-                
-                try:
-                    response = self.supabase.table("contas_pagas").insert(batch).execute()
-                    total_inseridos += len(batch)
-                    print(f"Lote contas pagas {i//batch_size + 1}: {len(batch)} registros inseridos")
-                    
-                except Exception as batch_error:
-                    print(f"Erro no lote contas pagas {i//batch_size + 1}: {batch_error}")
-                    # Tentar inserir um por um se der erro no lote
-                    for registro in batch:
-                        try:
-                            self.supabase.table("contas_pagas").insert(registro).execute()
-                            total_inseridos += 1
-                        except Exception as single_error:
-                            print(f"Erro ao inserir conta paga individual: {single_error}")
-                            continue
+            registros = self._preparar_registros(
+                df,
+                coluna_data="data_pagamento",
+                colunas_texto=["conta_corrente", "descricao", "categoria"],
+                fixos={"arquivo_origem": arquivo_origem, "processamento_id": processamento_id},
+                coluna_data_alternativa="data_vencimento"
+            )
+            
+            # Inserir no banco em lotes paralelos com tamanho adaptativo
+            gravacao_iniciada = True
+            resultado_insercao = self._inserir_em_lotes("contas_pagas", registros, rotulo="Lote contas pagas")
+            total_inseridos = resultado_insercao["registros_inseridos"]
             
             # Preparar mensagem final
             mensagem = f"{total_inseridos} contas pagas inseridas com sucesso!"
@@ -480,6 +625,8 @@ class SupabaseClient(CompartilhamentoMixin):
                 "success": True,
                 "registros_inseridos": total_inseridos,
                 "duplicatas_ignoradas": duplicatas_info["duplicatas"] if verificar_duplicatas else 0,
+                "registros_com_erro": resultado_insercao["registros_com_erro"],
+                "lotes": resultado_insercao["lotes"],
                 "message": mensagem
             }
             
@@ -489,32 +636,35 @@ class SupabaseClient(CompartilhamentoMixin):
                 "error": str(e),
                 "message": f"Erro ao inserir contas pagas: {str(e)}"
             }
+        finally:
+            # Mesmo com erro no meio, lotes anteriores podem ter sido gravados
+            if gravacao_iniciada:
+                self._invalidar_cache("contas_pagas")
     
-    def buscar_contas_pagas(self, data_inicio: str = None, data_fim: str = None) -> pd.DataFrame:
+    def buscar_contas_pagas(self, data_inicio: str = None, data_fim: str = None,
+                            page_size: int = 1000, particoes: int = 1) -> pd.DataFrame:
         """Busca contas pagas do usuário."""
         if not self.user_id:
             return pd.DataFrame()
         
         try:
-            query = self.supabase.table("contas_pagas").select("*").eq("usuario_id", self.user_id).limit(10000)
-            
-            # Filtros opcionais
-            if data_inicio:
-                query = query.gte("data_pagamento", data_inicio)
-            if data_fim:
-                query = query.lte("data_pagamento", data_fim)
-            
-            response = query.execute()
-            
-            if response.data:
-                return pd.DataFrame(response.data)
-            else:
-                return pd.DataFrame()
+            return self._buscar_paginado("contas_pagas", "data_pagamento", {"usuario_id": self.user_id},
+                                         data_inicio, data_fim, page_size, particoes)
                 
         except Exception as e:
             print(f"Erro ao buscar contas pagas: {e}")
             return pd.DataFrame()
     
+    def iterar_contas_pagas(self, data_inicio: str = None, data_fim: str = None,
+                            page_size: int = 1000) -> Iterator[pd.DataFrame]:
+        """Percorre as contas pagas do usuário em DataFrames do tamanho de uma página."""
+        if not self.user_id:
+            return
+        
+        for pagina in self._iterar_paginas("contas_pagas", "data_pagamento", {"usuario_id": self.user_id},
+                                           data_inicio, data_fim, page_size):
+            yield pd.DataFrame(pagina)
+    
     def inserir_conta_paga(self, dados: Dict[str, Any]) -> Dict[str, Any]:
         """
         Insere uma nova conta paga no banco.
@@ -547,19 +697,21 @@ class SupabaseClient(CompartilhamentoMixin):
                 # Está vazio, gerar um novo
                 processamento_id = str(uuid.uuid4())
             
-            dados_conta = {
-                "usuario_id": self.user_id,
-                "conta_corrente": str(dados.get("conta_corrente", "")),
-                "valor": float(dados.get("valor", 0)),
-                "data_pagamento": dados.get("data_pagamento"),
-                "descricao": str(dados.get("descricao", "")),
-                "categoria": str(dados.get("categoria", "OUTROS")),
-                "arquivo_origem": str(dados.get("arquivo_origem", "")),
-                "processamento_id": processamento_id
-            }
+            registros = self._preparar_registros(
+                pd.DataFrame([dados]),
+                coluna_data="data_pagamento",
+                colunas_texto=["conta_corrente", "descricao", "categoria", "arquivo_origem"],
+                fixos={"processamento_id": processamento_id},
+                padroes_texto={"categoria": "OUTROS"},
+                data_padrao=None
+            )
+            if not registros:
+                return {"success": False, "message": "Erro ao inserir conta paga: valor inválido"}
+            dados_conta = registros[0]
             
             # Inserir no banco
             response = self.supabase.table("contas_pagas").insert(dados_conta).execute()
+            self._invalidar_cache("contas_pagas")
             
             if response.data:
                 return {
@@ -573,42 +725,347 @@ class SupabaseClient(CompartilhamentoMixin):
         except Exception as e:
             return {"success": False, "message": f"Erro ao inserir conta paga: {str(e)}"}
     
+    # ==================== FINGERPRINT ====================
+    
+    def _aplicar_fingerprints(self, df: pd.DataFrame, coluna_data: str) -> pd.DataFrame:
+        """
+        Adiciona a coluna `fingerprint` com o hash determinístico de cada linha.
+        
+        O hash cobre usuario_id, empresa, fornecedor, valor em centavos, data e
+        descrição normalizados, mais a ocorrência da linha dentro do arquivo, para
+        que lançamentos idênticos legítimos de um mesmo upload não se anulem.
+        """
+        if df.empty:
+            return df.assign(fingerprint=pd.Series(dtype=object))
+        
+        campos = self._normalizar_campos_duplicata(df, coluna_data)
+        centavos = (campos['valor'] * 100).round().astype('int64').astype(str)
+        
+        chave = (
+            str(self.user_id) + '|' + campos['empresa'] + '|' + campos['fornecedor'] + '|' +
+            centavos + '|' + campos['data'] + '|' + campos['descricao']
+        )
+        ocorrencia = chave.groupby(chave.values).cumcount().astype(str)
+        chave = chave + '|' + ocorrencia
+        
+        return df.assign(fingerprint=[hashlib.sha1(k.encode('utf-8')).hexdigest() for k in chave])
+    
+    def _separar_fingerprints_existentes(self, tabela: str, df: pd.DataFrame, chunk_size: int = 100) -> tuple:
+        """
+        Remove do DataFrame as linhas cuja fingerprint já está gravada no banco.
+        
+        Returns:
+            Tupla (DataFrame com as linhas restantes, quantidade de linhas removidas)
+        """
+        if df.empty or not self._fingerprint_disponivel:
+            return df, 0
+        
+        fingerprints = df['fingerprint'].unique().tolist()
+        existentes = set()
+        
+        try:
+            for i in range(0, len(fingerprints), chunk_size):
+                response = self.supabase.table(tabela)\
+                    .select("fingerprint")\
+                    .eq("usuario_id", self.user_id)\
+                    .in_("fingerprint", fingerprints[i:i + chunk_size])\
+                    .execute()
+                existentes.update(item['fingerprint'] for item in (response.data or []))
+        except Exception as e:
+            # Só a falta da coluna desativa o recurso; erros transitórios sobem para a importação
+            if not self._eh_coluna_inexistente(e, 'fingerprint'):
+                raise
+            print(f"Aviso: coluna fingerprint indisponível em {tabela}: {e}")
+            self._fingerprint_disponivel = False
+            return df, 0
+        
+        mascara = df['fingerprint'].isin(existentes).to_numpy()
+        return df[~mascara], int(mascara.sum())
+    
+    def _inserir_lote(self, tabela: str, lote: List[Dict[str, Any]]) -> int:
+        """
+        Grava um lote de registros e retorna quantos foram efetivamente inseridos.
+        
+        Com a coluna fingerprint disponível usa upsert ignorando conflitos, de modo
+        que reimportações exatas não geram linhas novas nem erros.
+        """
+        if self._fingerprint_disponivel and 'fingerprint' in lote[0]:
+            try:
+                response = self.supabase.table(tabela)\
+                    .upsert(lote, on_conflict="usuario_id,fingerprint", ignore_duplicates=True)\
+                    .execute()
+                return len(response.data) if response.data is not None else len(lote)
+            except Exception as e:
+                # Sem a coluna ou sem o índice único (42P10) o upsert não é possível;
+                # qualquer outro erro é do lote e segue para o tratamento de lotes
+                if not (self._eh_coluna_inexistente(e, 'fingerprint') or self._codigo_erro(e) == '42P10'):
+                    raise
+                print(f"Aviso: upsert por fingerprint indisponível em {tabela}, usando insert: {e}")
+                with self._lock_fingerprint:
+                    self._fingerprint_disponivel = False
+        
+        lote = [{k: v for k, v in registro.items() if k != 'fingerprint'} for registro in lote]
+        self.supabase.table(tabela).insert(lote).execute()
+        return len(lote)
+    
+    # ==================== PREPARAÇÃO DE REGISTROS ====================
+    
+    def _formatar_datas(self, serie: pd.Series, padrao: Optional[str] = '2025-01-01',
+                        truncar: bool = False) -> pd.Series:
+        """
+        Converte uma coluna de datas para texto YYYY-MM-DD de uma só vez.
+        
+        Colunas datetime usam `dt.strftime` direto. Em colunas de objetos, apenas
+        os valores que já são datas são formatados; textos são mantidos como estão
+        (cortados em 10 caracteres se `truncar`) e nulos viram `padrao`.
+        """
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            resultado = serie.dt.strftime('%Y-%m-%d').astype(object)
+        else:
+            resultado = serie.astype(object)
+            nulos = serie.isna().to_numpy()
+            eh_data = np.fromiter((hasattr(v, 'strftime') for v in serie), dtype=bool, count=len(serie)) & ~nulos
+            eh_texto = ~eh_data & ~nulos
+            
+            if eh_data.any():
+                resultado[eh_data] = pd.to_datetime(serie[eh_data]).dt.strftime('%Y-%m-%d').to_numpy()
+            if eh_texto.any():
+                textos = serie[eh_texto].astype(str)
+                resultado[eh_texto] = (textos.str[:10] if truncar else textos).to_numpy()
+        
+        return resultado.where(resultado.notna(), padrao)
+    
+    def _preparar_registros(self, df: pd.DataFrame, coluna_data: str, colunas_texto: List[str],
+                            fixos: Dict[str, Any], coluna_data_alternativa: str = None,
+                            padroes_texto: Dict[str, str] = None,
+                            data_padrao: Optional[str] = '2025-01-01') -> List[Dict[str, Any]]:
+        """
+        Converte o DataFrame nos registros enviados ao banco, coluna a coluna.
+        
+        Args:
+            df: Dados a inserir
+            coluna_data: Coluna de data gravada (data_vencimento ou data_pagamento)
+            colunas_texto: Colunas de texto, gravadas sem espaços nas pontas e com nulos como ''
+            fixos: Valores iguais para todas as linhas (arquivo_origem, processamento_id...)
+            coluna_data_alternativa: Coluna usada quando `coluna_data` não existe no DataFrame
+            padroes_texto: Valor usado para colunas de texto ausentes (padrão '')
+            data_padrao: Valor para datas nulas
+            
+        Returns:
+            Lista de dicts prontos para insert, sem as linhas com valor não numérico
+        """
+        if df.empty:
+            return []
+        
+        padroes_texto = padroes_texto or {}
+        
+        # Linhas com valor não numérico são descartadas, como antes
+        if 'valor' in df.columns:
+            valor = pd.to_numeric(df['valor'], errors='coerce')
+            invalidos = valor.isna() & df['valor'].notna()
+            if invalidos.any():
+                print(f"Erro ao processar linha: {int(invalidos.sum())} linha(s) com valor inválido ignoradas")
+                df = df[~invalidos.to_numpy()]
+                valor = valor[~invalidos.to_numpy()]
+            valor = valor.fillna(0).astype(float)
+        else:
+            valor = pd.Series(0.0, index=df.index)
+        
+        origem_data = coluna_data if coluna_data in df.columns else coluna_data_alternativa
+        if origem_data in df.columns:
+            datas = self._formatar_datas(df[origem_data], data_padrao)
+        else:
+            datas = pd.Series(data_padrao, index=df.index, dtype=object)
+        
+        saida = pd.DataFrame({"usuario_id": self.user_id}, index=df.index)
+        for coluna in colunas_texto:
+            if coluna in df.columns:
+                saida[coluna] = df[coluna].fillna('').astype(str).str.strip().astype(object)
+            else:
+                saida[coluna] = padroes_texto.get(coluna, '')
+        saida["valor"] = valor
+        saida[coluna_data] = datas
+        for coluna, valor_fixo in fixos.items():
+            saida[coluna] = valor_fixo
+        if 'fingerprint' in df.columns:
+            saida["fingerprint"] = df['fingerprint']
+        
+        return saida.to_dict('records')
+    
+    # ==================== INSERÇÃO EM LOTES ====================
+    
+    def _eh_timeout(self, erro: Exception) -> bool:
+        """Indica se o erro de um lote foi timeout (do cliente HTTP ou statement_timeout do Postgres)."""
+        texto = f"{type(erro).__name__} {erro}".lower()
+        return 'timeout' in texto or 'timed out' in texto or '57014' in texto
+    
+    def _inserir_em_lotes(self, tabela: str, registros: List[Dict[str, Any]], rotulo: str = "Lote",
+                          batch_size: int = 100, batch_min: int = 10, batch_max: int = 1000,
+                          max_workers: int = 4, latencia_alvo: float = 1.0) -> Dict[str, Any]:
+        """
+        Insere registros em lotes enviados em paralelo, ajustando o tamanho do lote.
+        
+        A cada rodada até `max_workers` lotes são enviados ao mesmo tempo. Se todos
+        forem gravados abaixo de `latencia_alvo` segundos o lote dobra (até `batch_max`);
+        em caso de timeout ele cai pela metade (até `batch_min`), e com outros erros
+        ele se mantém. Um lote com erro é
+        dividido ao meio e reenviado, isolando as linhas problemáticas sem voltar
+        à inserção linha a linha. Lotes com timeout só são reenviados quando
+        gravados por upsert de fingerprint; com insert simples o servidor pode já
+        ter gravado o lote, que é contado como erro.
+        
+        Returns:
+            Dict com registros_inseridos, registros_com_erro e os tempos de cada lote
+        """
+        def enviar(lote: List[Dict[str, Any]]) -> tuple:
+            inicio = time.perf_counter()
+            try:
+                return lote, self._inserir_lote(tabela, lote), time.perf_counter() - inicio, None, True
+            except Exception as erro:
+                # Lido após a falha: se o lote caiu para insert simples, reenviar não é seguro
+                idempotente = self._fingerprint_disponivel and 'fingerprint' in lote[0]
+                return lote, 0, time.perf_counter() - inicio, erro, idempotente
+        
+        pendentes = deque()
+        posicao = 0
+        tamanho = batch_size
+        total_inseridos = 0
+        registros_com_erro = 0
+        lotes = []
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while posicao < len(registros) or pendentes:
+                # Reenvios (metades de lotes com erro) têm prioridade sobre lotes novos
+                rodada = []
+                while len(rodada) < max_workers and pendentes:
+                    rodada.append(pendentes.popleft())
+                while len(rodada) < max_workers and posicao < len(registros):
+                    rodada.append(registros[posicao:posicao + tamanho])
+                    posicao += tamanho
+                
+                houve_timeout = False
+                houve_erro = False
+                maior_latencia = 0.0
+                
+                for lote, inseridos, segundos, erro, idempotente in executor.map(enviar, rodada):
+                    numero = len(lotes) + 1
+                    lotes.append({
+                        "lote": numero,
+                        "registros": len(lote),
+                        "segundos": round(segundos, 3),
+                        "sucesso": erro is None
+                    })
+                    
+                    if erro is None:
+                        total_inseridos += inseridos
+                        maior_latencia = max(maior_latencia, segundos)
+                        print(f"{rotulo} {numero}: {inseridos} registros inseridos em {segundos:.2f}s")
+                        continue
+                    
+                    print(f"Erro no {rotulo.lower()} {numero} ({len(lote)} registros, {segundos:.2f}s): {erro}")
+                    houve_erro = True
+                    timeout = self._eh_timeout(erro)
+                    houve_timeout = houve_timeout or timeout
+                    
+                    if timeout and not idempotente:
+                        # Um insert simples pode ter sido gravado apesar do timeout
+                        print(f"{rotulo} {numero} não reenviado: sem fingerprint, o reenvio poderia duplicar linhas")
+                        registros_com_erro += len(lote)
+                    elif len(lote) > 1:
+                        meio = len(lote) // 2
+                        pendentes.append(lote[:meio])
+                        pendentes.append(lote[meio:])
+                    else:
+                        registros_com_erro += 1
+                
+                if houve_timeout:
+                    tamanho = max(batch_min, tamanho // 2)
+                elif not houve_erro and rodada and maior_latencia < latencia_alvo:
+                    # Só cresce após uma rodada toda gravada e rápida
+                    tamanho = min(batch_max, tamanho * 2)
+        
+        return {
+            "registros_inseridos": total_inseridos,
+            "registros_com_erro": registros_com_erro,
+            "lotes": lotes
+        }
+    
     # ==================== EMPRESAS ====================
     
     def listar_empresas(self) -> List[str]:
-        """Lista todas as empresas do usuário."""
+        """
+        Lista todas as empresas do usuário.
+        
+        Usa a função `listar_empresas_distintas` do banco (DISTINCT no servidor) e
+        guarda o resultado até a próxima escrita do usuário.
+        """
         if not self.user_id:
             return []
         
         try:
-            # Buscar empresas únicas das contas a pagar
-            response_a_pagar = self.supabase.table("contas_a_pagar")\
-                .select("empresa")\
-                .eq("usuario_id", self.user_id)\
-                .limit(10000)\
-                .execute()
-            
-            # Buscar empresas únicas das contas pagas
-            response_pagas = self.supabase.table("contas_pagas")\
-                .select("empresa")\
-                .eq("usuario_id", self.user_id)\
-                .limit(10000)\
-                .execute()
-            
-            empresas = set()
-            
-            if response_a_pagar.data:
-                empresas.update([item['empresa'] for item in response_a_pagar.data])
-            
-            if response_pagas.data:
-                empresas.update([item['empresa'] for item in response_pagas.data])
-            
-            return sorted(list(empresas))
+            return self._listar_empresas_distintas(self.user_id, self._listar_empresas_local)
             
         except Exception as e:
             print(f"Erro ao listar empresas: {e}")
             return []
     
+    def _listar_empresas_distintas(self, usuario_id: Optional[str], carregar_local,
+                                   incluir_pagas: bool = True) -> List[str]:
+        """
+        Lista empresas distintas via RPC (None = todos os usuários), com cache e fallback local.
+        
+        Com `incluir_pagas` False, apenas as empresas de contas a pagar; `carregar_local`
+        deve retornar o mesmo conjunto que a RPC.
+        
+        O cache é invalidado pelas escritas do próprio usuário logado; na listagem
+        de todos os usuários, inclusões feitas por outros usuários só aparecem
+        quando o resultado expira (TTL do cache).
+        """
+        chave_cache = self._cache.chave(
+            self.user_id, "empresas", usuario_id, incluir_pagas,
+            self._cache.versao(self.user_id, "contas_a_pagar"),
+            self._cache.versao(self.user_id, "contas_pagas")
+        )
+        empresas = self._cache.obter(chave_cache)
+        if empresas is not None:
+            return list(empresas)
+        
+        dados = self._chamar_rpc("listar_empresas_distintas",
+                                 {"p_usuario_id": usuario_id, "p_incluir_pagas": incluir_pagas})
+        if dados is not None:
+            empresas = sorted({item['empresa'] for item in dados if item.get('empresa')})
+        else:
+            empresas = carregar_local()
+        
+        self._cache.guardar(chave_cache, tuple(empresas))
+        return list(empresas)
+    
+    def _listar_empresas_local(self) -> List[str]:
+        """Lista empresas do usuário lendo a coluna empresa das duas tabelas."""
+        # Buscar empresas únicas das contas a pagar
+        response_a_pagar = self.supabase.table("contas_a_pagar")\
+            .select("empresa")\
+            .eq("usuario_id", self.user_id)\
+            .limit(10000)\
+            .execute()
+        
+        # Buscar empresas únicas das contas pagas
+        response_pagas = self.supabase.table("contas_pagas")\
+            .select("empresa")\
+            .eq("usuario_id", self.user_id)\
+            .limit(10000)\
+            .execute()
+        
+        empresas = set()
+        
+        if response_a_pagar.data:
+            empresas.update([item['empresa'] for item in response_a_pagar.data])
+        
+        if response_pagas.data:
+            empresas.update([item['empresa'] for item in response_pagas.data])
+        
+        return sorted(list(empresas))
+    
     # ==================== PROCESSAMENTOS ====================
     
     def registrar_processamento(self, tipo: str, status: str, detalhes: Dict[str, Any], arquivos: List[str] = None) -> str:
@@ -643,33 +1100,207 @@ class SupabaseClient(CompartilhamentoMixin):
     # ==================== DASHBOARD ====================
     
     def get_resumo_financeiro(self) -> Dict[str, Any]:
-        """Retorna resumo financeiro do usuário."""
+        """
+        Retorna resumo financeiro do usuário.
+        
+        Os totais vêm da função `resumo_financeiro` do banco, em tempo constante
+        para o app. Sem a função instalada, o resumo é calculado localmente.
+        """
         if not self.user_id:
             return {}
         
         try:
-            # Buscar dados das contas a pagar
-            contas_a_pagar = self.buscar_contas_a_pagar()
-            contas_pagas = self.buscar_contas_pagas()
-            
-            # Calcular métricas
-            total_a_pagar = contas_a_pagar['valor'].sum() if not contas_a_pagar.empty else 0
-            total_pago = contas_pagas['valor'].sum() if not contas_pagas.empty else 0
-            quantidade_a_pagar = len(contas_a_pagar) if not contas_a_pagar.empty else 0
-            quantidade_pagas = len(contas_pagas) if not contas_pagas.empty else 0
+            chave_cache = self._cache.chave(
+                self.user_id, "resumo_financeiro",
+                self._cache.versao(self.user_id, "contas_a_pagar"),
+                self._cache.versao(self.user_id, "contas_pagas")
+            )
+            resumo = self._cache.obter(chave_cache)
+            if resumo is not None:
+                return dict(resumo)
+            
+            dados = self._chamar_rpc("resumo_financeiro", {"p_usuario_id": self.user_id})
+            if dados:
+                linha = dados[0] if isinstance(dados, list) else dados
+                resumo = {
+                    "total_a_pagar": float(linha.get("total_a_pagar") or 0),
+                    "total_pago": float(linha.get("total_pago") or 0),
+                    "quantidade_a_pagar": int(linha.get("quantidade_a_pagar") or 0),
+                    "quantidade_pagas": int(linha.get("quantidade_pagas") or 0),
+                    "empresas_total": int(linha.get("empresas_total") or 0)
+                }
+            else:
+                resumo = self._calcular_resumo_financeiro_local()
             
-            return {
-                "total_a_pagar": float(total_a_pagar),
-                "total_pago": float(total_pago),
-                "quantidade_a_pagar": quantidade_a_pagar,
-                "quantidade_pagas": quantidade_pagas,
-                "empresas_total": len(self.listar_empresas())
-            }
+            self._cache.guardar(chave_cache, resumo)
+            return dict(resumo)
             
         except Exception as e:
             print(f"Erro ao calcular resumo financeiro: {e}")
             return {}
     
+    def _calcular_resumo_financeiro_local(self) -> Dict[str, Any]:
+        """Calcula o resumo financeiro em pandas a partir das tabelas completas."""
+        # Buscar dados das contas a pagar
+        contas_a_pagar = self.buscar_contas_a_pagar()
+        contas_pagas = self.buscar_contas_pagas()
+        
+        # Calcular métricas
+        total_a_pagar = contas_a_pagar['valor'].sum() if not contas_a_pagar.empty else 0
+        total_pago = contas_pagas['valor'].sum() if not contas_pagas.empty else 0
+        quantidade_a_pagar = len(contas_a_pagar) if not contas_a_pagar.empty else 0
+        quantidade_pagas = len(contas_pagas) if not contas_pagas.empty else 0
+        
+        return {
+            "total_a_pagar": float(total_a_pagar),
+            "total_pago": float(total_pago),
+            "quantidade_a_pagar": quantidade_a_pagar,
+            "quantidade_pagas": quantidade_pagas,
+            "empresas_total": len(self.listar_empresas())
+        }
+    
+    # ==================== CONCILIAÇÃO ====================
+    
+    def buscar_correspondencias_salvas(self, page_size: int = 1000) -> pd.DataFrame:
+        """Busca os pares conta a pagar x conta paga gravados para o usuário."""
+        colunas = ["id", "conta_a_pagar_id", "conta_paga_id", "tipo"]
+        if not self.user_id:
+            return pd.DataFrame(columns=colunas)
+        
+        chave = self._cache.chave(self.user_id, "correspondencias")
+        em_cache = self._cache.obter(chave)
+        if em_cache is not None:
+            return em_cache
+        
+        registros = []
+        inicio = 0
+        while True:
+            pagina = self.supabase.table("correspondencias")\
+                .select(", ".join(colunas))\
+                .eq("usuario_id", self.user_id)\
+                .order("id")\
+                .range(inicio, inicio + page_size - 1)\
+                .execute().data or []
+            if not pagina:
+                break
+            registros.extend(pagina)
+            inicio += len(pagina)
+        
+        df = pd.DataFrame(registros, columns=colunas)
+        self._cache.guardar(chave, df)
+        return df
+    
+    def _remover_correspondencias(self, ids: List[Any], chunk_size: int = 100):
+        """Remove pares gravados pelo id."""
+        for inicio in range(0, len(ids), chunk_size):
+            self.supabase.table("correspondencias")\
+                .delete()\
+                .eq("usuario_id", self.user_id)\
+                .in_("id", ids[inicio:inicio + chunk_size])\
+                .execute()
+    
+    def _limpar_correspondencias(self):
+        """Remove todos os pares gravados do usuário (se a tabela existir)."""
+        try:
+            self.supabase.table("correspondencias").delete().eq("usuario_id", self.user_id).execute()
+        except Exception as e:
+            print(f"Aviso: não foi possível limpar correspondências: {e}")
+        self._invalidar_cache("correspondencias")
+    
+    def conciliar_incremental(self, analyzer, modo: str = None):
+        """
+        Concilia as contas do usuário reaproveitando os pares gravados em correspondencias.
+        
+        Só contas e pagamentos ainda sem par (novos, ou cujo par foi excluído) passam
+        pelo casamento; os novos pares são gravados e os órfãos removidos. Sem
+        alterações nas tabelas desde a última chamada, o resultado vem do cache.
+        Se a tabela correspondencias não existir, recalcula tudo sem gravar (e não
+        tenta mais nesta sessão); outros erros de leitura valem só para a chamada.
+        
+        Args:
+            analyzer: PaymentAnalyzer usado no casamento
+            modo: Estratégia das correspondências aproximadas
+            
+        Returns:
+            Correspondencias com todas as contas do usuário
+        """
+        df_a_pagar = self.buscar_contas_a_pagar()
+        df_pagas = self.buscar_contas_pagas()
+        
+        if not self.user_id or not self._conciliacao_disponivel:
+            return analyzer.encontrar_correspondencias(df_a_pagar, df_pagas, modo=modo)
+        
+        def chave_resultado():
+            return self._cache.chave(
+                self.user_id, "correspondencias", "conciliacao", modo,
+                self._cache.versao(self.user_id, "contas_a_pagar"),
+                self._cache.versao(self.user_id, "contas_pagas")
+            )
+        
+        em_cache = self._cache.obter(chave_resultado())
+        if em_cache is not None:
+            return em_cache
+        
+        try:
+            pares_salvos = self.buscar_correspondencias_salvas()
+        except Exception as e:
+            if self._eh_tabela_inexistente(e):
+                print(f"Aviso: tabela correspondencias indisponível, conciliando sem gravar: {e}")
+                self._conciliacao_disponivel = False
+            else:
+                print(f"Aviso: erro ao ler correspondências, conciliando sem gravar nesta chamada: {e}")
+            return analyzer.encontrar_correspondencias(df_a_pagar, df_pagas, modo=modo)
+        
+        correspondencias, novos_pares, ids_orfaos = analyzer.conciliar_incremental(
+            df_a_pagar, df_pagas, pares_salvos, modo=modo
+        )
+        
+        try:
+            if ids_orfaos:
+                self._remover_correspondencias(ids_orfaos)
+                print(f"Conciliação: {len(ids_orfaos)} pares órfãos removidos")
+            
+            if not novos_pares.empty:
+                novos_pares = novos_pares.astype(object).where(novos_pares.notna(), None)
+                registros = [
+                    {"usuario_id": self.user_id, **registro}
+                    for registro in novos_pares.to_dict('records')
+                ]
+                resultado = self._inserir_em_lotes("correspondencias", registros, rotulo="Correspondências")
+                print(f"Conciliação: {resultado['registros_inseridos']} pares novos gravados")
+        except Exception as e:
+            print(f"Aviso: erro ao gravar correspondências: {e}")
+        finally:
+            if ids_orfaos or not novos_pares.empty:
+                self._invalidar_cache("correspondencias")
+        
+        self._cache.guardar(chave_resultado(), correspondencias)
+        return correspondencias
+    
+    def conciliar_em_janelas(self, analyzer, folga_dias: int = None, modo: str = None,
+                             page_size: int = 1000) -> Iterator[tuple]:
+        """
+        Concilia o histórico do usuário mês a mês, lendo as tabelas página a página.
+        
+        Para históricos grandes demais para `conciliar_incremental`: nada é
+        carregado inteiro nem guardado em cache; cada janela é emitida assim que
+        fica pronta (ver PaymentAnalyzer.conciliar_em_janelas).
+        
+        Nenhuma tela chama este método: as correspondências exatas ficam
+        restritas à janela do mês, então quem usa precisa optar por ele.
+        
+        Yields:
+            Tuplas (período, Correspondencias)
+        """
+        if not self.user_id:
+            return
+        
+        yield from analyzer.conciliar_em_janelas(
+            self.iterar_contas_a_pagar(page_size=page_size),
+            self.iterar_contas_pagas(page_size=page_size),
+            folga_dias=folga_dias, modo=modo
+        )
+    
     # ==================== LIMPEZA DE DADOS ====================
     
     def limpar_contas_a_pagar(self) -> Dict[str, Any]:
@@ -682,8 +1313,12 @@ class SupabaseClient(CompartilhamentoMixin):
             response = self.supabase.table("contas_a_pagar").select("id", count="exact").eq("usuario_id", self.user_id).execute()
             total_antes = response.count if response.count else 0
             
+            # Pares da conciliação referenciam as contas removidas
+            self._limpar_correspondencias()
+            
             # Limpar contas a pagar
             self.supabase.table("contas_a_pagar").delete().eq("usuario_id", self.user_id).execute()
+            self._invalidar_cache("contas_a_pagar")
             
             return {
                 "success": True,
@@ -708,8 +1343,12 @@ class SupabaseClient(CompartilhamentoMixin):
             response = self.supabase.table("contas_pagas").select("id", count="exact").eq("usuario_id", self.user_id).execute()
             total_antes = response.count if response.count else 0
             
+            # Pares da conciliação referenciam as contas removidas
+            self._limpar_correspondencias()
+            
             # Limpar contas pagas
             self.supabase.table("contas_pagas").delete().eq("usuario_id", self.user_id).execute()
+            self._invalidar_cache("contas_pagas")
             
             return {
                 "success": True,
@@ -743,6 +1382,7 @@ class SupabaseClient(CompartilhamentoMixin):
             self.supabase.table("contas_pagas").delete().eq("usuario_id", self.user_id).execute()
             self.supabase.table("contas_a_pagar").delete().eq("usuario_id", self.user_id).execute()
             self.supabase.table("empresas").delete().eq("usuario_id", self.user_id).execute()
+            self._invalidar_cache()
             
             return {
                 "success": True,
@@ -767,97 +1407,20 @@ class SupabaseClient(CompartilhamentoMixin):
         Critérios de duplicata:
         1. Mesmo usuário, empresa, fornecedor, valor, data_vencimento E descrição
         2. OU mesmo usuário, empresa, valor, data_vencimento com descrições muito similares
+        
+        Os candidatos são buscados em lote (uma janela de datas para todas as
+        empresas do upload) e comparados em memória, em vez de uma consulta por linha.
         """
         if not self.user_id:
             return {"duplicatas": 0, "novos": len(df), "df_novos": df}
         
         try:
-            duplicatas = 0
-            novos_registros = []
-            registros_duplicados = []
-            
             print(f"🔍 Verificando duplicatas para {len(df)} registros de contas a pagar...")
             
-            for _, row in df.iterrows():
-                # Extrair e normalizar campos principais
-                empresa = str(row.get('empresa', '')).strip().upper()
-                fornecedor = str(row.get('fornecedor', '')).strip().upper()
-                valor = float(row.get('valor', 0)) if not pd.isna(row.get('valor', 0)) else 0
-                descricao = str(row.get('descricao', '')).strip().upper()
-                
-                # Tratar data de vencimento
-                data_vencimento = row.get('data_vencimento', '')
-                if pd.isna(data_vencimento):
-                    data_vencimento = '2025-01-01'
-                else:
-                    if hasattr(data_vencimento, 'strftime'):
-                        data_vencimento = data_vencimento.strftime('%Y-%m-%d')
-                    else:
-                        data_vencimento = str(data_vencimento)[:10]  # Garantir formato YYYY-MM-DD
-                
-                # Verificar duplicatas no banco
-                response = self.supabase.table("contas_a_pagar")\
-                    .select("id,empresa,fornecedor,valor,data_vencimento,descricao")\
-                    .eq("usuario_id", self.user_id)\
-                    .eq("empresa", empresa)\
-                    .eq("valor", valor)\
-                    .eq("data_vencimento", data_vencimento)\
-                    .limit(10)\
-                    .execute()
-                
-                eh_duplicata = False
-                
-                if response.data and len(response.data) > 0:
-                    # Verificar se algum registro existente é muito similar
-                    for registro_existente in response.data:
-                        fornecedor_existente = str(registro_existente.get('fornecedor', '')).strip().upper()
-                        descricao_existente = str(registro_existente.get('descricao', '')).strip().upper()
-                        
-                        # Critério 1: Fornecedor e descrição exatos
-                        if (fornecedor == fornecedor_existente and 
-                            descricao == descricao_existente):
-                            eh_duplicata = True
-                            break
-                        
-                        # Critério 2: Mesmo fornecedor e descrições muito similares
-                        if fornecedor == fornecedor_existente:
-                            similaridade = self._calcular_similaridade_texto(descricao, descricao_existente)
-                            if similaridade > 0.8:
-                                eh_duplicata = True
-                                break
-                        
-                        # Critério 3: Descrições idênticas (mesmo sem fornecedor)
-                        if descricao and len(descricao) > 10 and descricao == descricao_existente:
-                            eh_duplicata = True
-                            break
-                
-                if eh_duplicata:
-                    duplicatas += 1
-                    registros_duplicados.append({
-                        'empresa': row.get('empresa', ''),
-                        'fornecedor': row.get('fornecedor', ''),
-                        'valor': valor,
-                        'data_vencimento': data_vencimento,
-                        'descricao': row.get('descricao', ''),
-                        'motivo': 'Registro similar já existe no banco'
-                    })
-                    print(f"📋 Duplicata encontrada: {empresa} - {fornecedor} - R${valor}")
-                else:
-                    novos_registros.append(row)
-            
-            resultado = {
-                "duplicatas": duplicatas,
-                "novos": len(novos_registros),
-                "df_novos": pd.DataFrame(novos_registros) if novos_registros else pd.DataFrame(),
-                "registros_duplicados": registros_duplicados
-            }
-            
-            if duplicatas > 0:
-                print(f"⚠️ {duplicatas} duplicatas encontradas e serão ignoradas")
-            if len(novos_registros) > 0:
-                print(f"✅ {len(novos_registros)} registros novos serão inseridos")
+            campos = self._normalizar_campos_duplicata(df, 'data_vencimento')
+            indice = self._indexar_candidatos_duplicata("contas_a_pagar", "data_vencimento", df, campos)
             
-            return resultado
+            return self._classificar_duplicatas(df, campos, indice, 'data_vencimento')
             
         except Exception as e:
             print(f"❌ Erro ao verificar duplicatas contas a pagar: {e}")
@@ -871,103 +1434,226 @@ class SupabaseClient(CompartilhamentoMixin):
         Critérios de duplicata:
         1. Mesmo usuário, empresa, fornecedor, valor, data_pagamento E descrição
         2. OU mesmo usuário, empresa, valor, data_pagamento com diferença mínima na descrição
+        
+        Os registros existentes são buscados por janelas de datas do upload e
+        indexados por (empresa, valor em centavos, data_pagamento).
         """
         if not self.user_id:
             return {"duplicatas": 0, "novos": len(df), "df_novos": df}
         
         try:
-            duplicatas = 0
-            novos_registros = []
-            registros_duplicados = []
-            
             print(f"🔍 Verificando duplicatas para {len(df)} registros de contas pagas...")
             
-            for _, row in df.iterrows():
-                # Extrair e normalizar campos principais
-                empresa = str(row.get('empresa', '')).strip().upper()
-                fornecedor = str(row.get('fornecedor', '')).strip().upper()
-                valor = float(row.get('valor', 0)) if not pd.isna(row.get('valor', 0)) else 0
-                descricao = str(row.get('descricao', '')).strip().upper()
-                
-                # Tratar data de pagamento
-                data_pagamento = row.get('data_pagamento', '')
-                if pd.isna(data_pagamento):
-                    data_pagamento = '2025-01-01'
-                else:
-                    if hasattr(data_pagamento, 'strftime'):
-                        data_pagamento = data_pagamento.strftime('%Y-%m-%d')
-                    else:
-                        data_pagamento = str(data_pagamento)[:10]  # Garantir formato YYYY-MM-DD
-                
-                # Primeiro: verificação exata (incluindo fornecedor)
-                response = self.supabase.table("contas_pagas")\
-                    .select("id,empresa,fornecedor,valor,data_pagamento,descricao")\
-                    .eq("usuario_id", self.user_id)\
-                    .eq("empresa", empresa)\
-                    .eq("valor", valor)\
-                    .eq("data_pagamento", data_pagamento)\
-                    .limit(10)\
-                    .execute()
-                
-                eh_duplicata = False
-                
-                if response.data and len(response.data) > 0:
-                    # Verificar se algum registro existente é muito similar
-                    for registro_existente in response.data:
-                        fornecedor_existente = str(registro_existente.get('fornecedor', '')).strip().upper()
-                        descricao_existente = str(registro_existente.get('descricao', '')).strip().upper()
-                        
-                        # Critério 1: Fornecedor e descrição exatos
-                        if (fornecedor == fornecedor_existente and 
-                            descricao == descricao_existente):
-                            eh_duplicata = True
-                            break
-                        
-                        # Critério 2: Mesmo fornecedor e descrições muito similares (>80% similaridade)
-                        if fornecedor == fornecedor_existente:
-                            similaridade = self._calcular_similaridade_texto(descricao, descricao_existente)
-                            if similaridade > 0.8:
-                                eh_duplicata = True
-                                break
-                        
-                        # Critério 3: Descrições idênticas (mesmo sem fornecedor)
-                        if descricao and len(descricao) > 10 and descricao == descricao_existente:
-                            eh_duplicata = True
-                            break
-                
-                if eh_duplicata:
-                    duplicatas += 1
-                    registros_duplicados.append({
-                        'empresa': row.get('empresa', ''),
-                        'fornecedor': row.get('fornecedor', ''),
-                        'valor': valor,
-                        'data_pagamento': data_pagamento,
-                        'descricao': row.get('descricao', ''),
-                        'motivo': 'Registro similar já existe no banco'
-                    })
-                    print(f"📋 Duplicata encontrada: {empresa} - {fornecedor} - R${valor}")
-                else:
-                    novos_registros.append(row)
-            
-            resultado = {
-                "duplicatas": duplicatas,
-                "novos": len(novos_registros),
-                "df_novos": pd.DataFrame(novos_registros) if novos_registros else pd.DataFrame(),
-                "registros_duplicados": registros_duplicados
-            }
-            
-            if duplicatas > 0:
-                print(f"⚠️ {duplicatas} duplicatas encontradas e serão ignoradas")
-            if len(novos_registros) > 0:
-                print(f"✅ {len(novos_registros)} registros novos serão inseridos")
+            campos = self._normalizar_campos_duplicata(df, 'data_pagamento')
+            indice = self._indexar_candidatos_duplicata("contas_pagas", "data_pagamento", df, campos)
             
-            return resultado
+            return self._classificar_duplicatas(df, campos, indice, 'data_pagamento')
             
         except Exception as e:
             print(f"❌ Erro ao verificar duplicatas: {e}")
             # Em caso de erro, considerar todos como novos para não bloquear
             return {"duplicatas": 0, "novos": len(df), "df_novos": df}
     
+    def _normalizar_campos_duplicata(self, df: pd.DataFrame, coluna_data: str) -> pd.DataFrame:
+        """
+        Normaliza, de forma vetorizada, os campos usados na verificação de duplicatas.
+        
+        Retorna um DataFrame com empresa, fornecedor e descrição em maiúsculas,
+        valor arredondado em centavos e data no formato YYYY-MM-DD.
+        """
+        def texto(coluna: str) -> pd.Series:
+            if coluna not in df.columns:
+                return pd.Series('', index=df.index, dtype=object)
+            return df[coluna].fillna('').astype(str).str.strip().str.upper()
+        
+        if 'valor' in df.columns:
+            valor = pd.to_numeric(df['valor'], errors='coerce').fillna(0).astype(float).round(2)
+        else:
+            valor = pd.Series(0.0, index=df.index)
+        
+        if coluna_data not in df.columns:
+            data = pd.Series('2025-01-01', index=df.index, dtype=object)
+        else:
+            data = self._formatar_datas(df[coluna_data], truncar=True)
+        
+        return pd.DataFrame({
+            'empresa': texto('empresa'),
+            'fornecedor': texto('fornecedor'),
+            'valor': valor,
+            'data': data,
+            'descricao': texto('descricao')
+        }, index=df.index)
+    
+    def _separar_datas_normalizadas(self, datas: pd.Series) -> tuple:
+        """
+        Separa as chaves de data distintas em normalizadas (YYYY-MM-DD válidas) e as demais.
+        
+        As chaves vêm de `_formatar_datas(truncar=True)`, que mantém textos em
+        outros formatos como foram importados.
+        """
+        distintas = pd.Series(datas.unique(), dtype=object).astype(str)
+        eh_iso = distintas.str.fullmatch(r'\d{4}-\d{2}-\d{2}') & \
+            pd.to_datetime(distintas, format='%Y-%m-%d', errors='coerce').notna()
+        return sorted(distintas[eh_iso]), sorted(distintas[~eh_iso])
+    
+    def _janelas_de_datas(self, datas: List[str], intervalo_max_dias: int = 7) -> List[tuple]:
+        """
+        Agrupa as datas distintas (YYYY-MM-DD) em janelas contínuas.
+        
+        Datas separadas por mais de `intervalo_max_dias` abrem uma nova janela,
+        evitando baixar meses inteiros sem lançamentos entre dois extratos.
+        """
+        distintas = pd.to_datetime(pd.Series(datas, dtype=object), format='%Y-%m-%d').sort_values()
+        if distintas.empty:
+            return []
+        
+        nova_janela = distintas.diff().dt.days.fillna(0) > intervalo_max_dias
+        grupos = nova_janela.cumsum()
+        return [
+            (grupo.min().strftime('%Y-%m-%d'), grupo.max().strftime('%Y-%m-%d'))
+            for _, grupo in distintas.groupby(grupos.values)
+        ]
+    
+    def _indexar_candidatos_duplicata(self, tabela: str, coluna_data: str, df: pd.DataFrame,
+                                      campos: pd.DataFrame, page_size: int = 1000) -> Dict[tuple, List[tuple]]:
+        """
+        Busca de uma só vez os registros existentes que podem ser duplicatas do upload.
+        
+        A consulta cobre as janelas de datas e as empresas presentes no DataFrame,
+        paginada em blocos de `page_size`. O resultado é indexado por
+        (empresa, valor em centavos, data) com a lista de (fornecedor, descrição) existentes.
+        
+        Datas que não estão em YYYY-MM-DD são buscadas por igualdade exata, como
+        vieram do arquivo, e os registros encontrados são indexados por essa mesma
+        chave (o banco as devolve normalizadas).
+        """
+        indice: Dict[tuple, List[tuple]] = {}
+        if campos.empty:
+            return indice
+        
+        # O banco guarda a empresa como foi importada; filtrar pelas duas grafias
+        empresas = set(campos['empresa'])
+        if 'empresa' in df.columns:
+            empresas.update(df['empresa'].fillna('').astype(str).str.strip())
+        
+        datas_iso, datas_outras = self._separar_datas_normalizadas(campos['data'])
+        
+        for data_inicio, data_fim in self._janelas_de_datas(datas_iso):
+            self._carregar_candidatos_duplicata(
+                indice, tabela, coluna_data, empresas,
+                lambda query: query.gte(coluna_data, data_inicio).lte(coluna_data, data_fim),
+                page_size=page_size
+            )
+        
+        for data in datas_outras:
+            try:
+                self._carregar_candidatos_duplicata(
+                    indice, tabela, coluna_data, empresas,
+                    lambda query: query.in_(coluna_data, [data]),
+                    chave_data=data, page_size=page_size
+                )
+            except Exception as e:
+                # Data que o banco não consegue interpretar: nenhum registro pode coincidir
+                print(f"Aviso: data '{data}' ignorada na verificação de duplicatas: {e}")
+        
+        return indice
+    
+    def _carregar_candidatos_duplicata(self, indice: Dict[tuple, List[tuple]], tabela: str,
+                                       coluna_data: str, empresas: set, filtrar_datas,
+                                       chave_data: str = None, page_size: int = 1000):
+        """
+        Pagina os registros de `tabela` que passam por `filtrar_datas` e os acrescenta ao índice.
+        
+        Com `chave_data`, os registros são indexados por ela em vez da data devolvida pelo banco.
+        """
+        inicio = 0
+        while True:
+            query = self.supabase.table(tabela)\
+                .select(f"id,empresa,fornecedor,valor,{coluna_data},descricao")\
+                .eq("usuario_id", self.user_id)\
+                .in_("empresa", sorted(empresas))
+            response = filtrar_datas(query)\
+                .order("id", desc=False)\
+                .range(inicio, inicio + page_size - 1)\
+                .execute()
+            
+            registros = response.data or []
+            for registro in registros:
+                chave = (
+                    str(registro.get('empresa') or '').strip().upper(),
+                    round(float(registro.get('valor') or 0), 2),
+                    chave_data if chave_data is not None else str(registro.get(coluna_data) or '')[:10]
+                )
+                indice.setdefault(chave, []).append((
+                    str(registro.get('fornecedor') or '').strip().upper(),
+                    str(registro.get('descricao') or '').strip().upper()
+                ))
+            
+            # O servidor pode limitar o tamanho da página abaixo de page_size
+            if not registros:
+                break
+            inicio += len(registros)
+    
+    def _eh_duplicata(self, fornecedor: str, descricao: str, candidatos: List[tuple]) -> bool:
+        """Aplica os critérios de duplicata contra os registros existentes de mesma chave."""
+        for fornecedor_existente, descricao_existente in candidatos:
+            # Critério 1: Fornecedor e descrição exatos
+            if fornecedor == fornecedor_existente and descricao == descricao_existente:
+                return True
+            
+            # Critério 2: Mesmo fornecedor e descrições muito similares (>80% similaridade)
+            if fornecedor == fornecedor_existente:
+                if self._calcular_similaridade_texto(descricao, descricao_existente) > 0.8:
+                    return True
+            
+            # Critério 3: Descrições idênticas (mesmo sem fornecedor)
+            if descricao and len(descricao) > 10 and descricao == descricao_existente:
+                return True
+        
+        return False
+    
+    def _classificar_duplicatas(self, df: pd.DataFrame, campos: pd.DataFrame,
+                                indice: Dict[tuple, List[tuple]], coluna_data: str) -> Dict[str, Any]:
+        """Separa o DataFrame em registros novos e duplicados a partir do índice de candidatos."""
+        eh_duplicata = np.fromiter(
+            (
+                self._eh_duplicata(fornecedor, descricao, indice.get((empresa, valor, data), []))
+                for empresa, fornecedor, valor, data, descricao
+                in campos[['empresa', 'fornecedor', 'valor', 'data', 'descricao']].itertuples(index=False, name=None)
+            ),
+            dtype=bool,
+            count=len(campos)
+        )
+        
+        registros_duplicados = []
+        for posicao in np.flatnonzero(eh_duplicata):
+            row = df.iloc[posicao]
+            chave = campos.iloc[posicao]
+            registros_duplicados.append({
+                'empresa': row.get('empresa', ''),
+                'fornecedor': row.get('fornecedor', ''),
+                'valor': float(chave['valor']),
+                coluna_data: chave['data'],
+                'descricao': row.get('descricao', ''),
+                'motivo': 'Registro similar já existe no banco'
+            })
+            print(f"📋 Duplicata encontrada: {chave['empresa']} - {chave['fornecedor']} - R${chave['valor']}")
+        
+        duplicatas = int(eh_duplicata.sum())
+        novos = len(df) - duplicatas
+        
+        if duplicatas > 0:
+            print(f"⚠️ {duplicatas} duplicatas encontradas e serão ignoradas")
+        if novos > 0:
+            print(f"✅ {novos} registros novos serão inseridos")
+        
+        return {
+            "duplicatas": duplicatas,
+            "novos": novos,
+            "df_novos": df[~eh_duplicata] if novos else pd.DataFrame(),
+            "registros_duplicados": registros_duplicados
+        }
+    
     def _calcular_similaridade_texto(self, texto1: str, texto2: str) -> float:
         """
         Calcula similaridade entre dois textos usando algoritmo simples.
@@ -1002,78 +1688,67 @@ class SupabaseClient(CompartilhamentoMixin):
         admin_user_id = "bde0a328-7d9f-4c91-a005-a1ee285c16fb"
         return self.user_id == admin_user_id
     
-    def buscar_todas_contas_a_pagar(self, empresa: str = None, data_inicio: str = None, data_fim: str = None) -> pd.DataFrame:
+    def buscar_todas_contas_a_pagar(self, empresa: str = None, data_inicio: str = None, data_fim: str = None,
+                                     page_size: int = 1000, particoes: int = 1) -> pd.DataFrame:
         """Busca contas a pagar de TODOS os usuários (somente para admin)."""
         if not self.is_admin():
-            return self.buscar_contas_a_pagar(empresa, data_inicio, data_fim)
+            return self.buscar_contas_a_pagar(empresa, data_inicio, data_fim, page_size, particoes)
         
         try:
             # Admin pode ver dados de todos os usuários
-            query = self.supabase.table("contas_a_pagar").select("*").order("data_vencimento", desc=False).order("id", desc=False).limit(10000)
+            filtros = {"empresa": empresa} if empresa else {}
             
-            # Filtros opcionais
-            if empresa:
-                query = query.eq("empresa", empresa)
-            if data_inicio:
-                query = query.gte("data_vencimento", data_inicio)
-            if data_fim:
-                query = query.lte("data_vencimento", data_fim)
-            
-            response = query.execute()
-            
-            if response.data:
-                return pd.DataFrame(response.data)
-            else:
-                return pd.DataFrame()
+            return self._buscar_paginado("contas_a_pagar", "data_vencimento", filtros,
+                                         data_inicio, data_fim, page_size, particoes)
                 
         except Exception as e:
             print(f"Erro ao buscar todas as contas a pagar: {e}")
             return pd.DataFrame()
     
-    def buscar_todas_contas_pagas(self, data_inicio: str = None, data_fim: str = None) -> pd.DataFrame:
+    def buscar_todas_contas_pagas(self, data_inicio: str = None, data_fim: str = None,
+                                  page_size: int = 1000, particoes: int = 1) -> pd.DataFrame:
         """Busca contas pagas de TODOS os usuários (somente para admin)."""
         if not self.is_admin():
-            return self.buscar_contas_pagas(data_inicio, data_fim)
+            return self.buscar_contas_pagas(data_inicio, data_fim, page_size, particoes)
         
         try:
             # Admin pode ver dados de todos os usuários
-            query = self.supabase.table("contas_pagas").select("*").limit(10000)
-            
-            # Filtros opcionais
-            if data_inicio:
-                query = query.gte("data_pagamento", data_inicio)
-            if data_fim:
-                query = query.lte("data_pagamento", data_fim)
-            
-            response = query.execute()
-            
-            if response.data:
-                return pd.DataFrame(response.data)
-            else:
-                return pd.DataFrame()
+            return self._buscar_paginado("contas_pagas", "data_pagamento", {},
+                                         data_inicio, data_fim, page_size, particoes)
                 
         except Exception as e:
             print(f"Erro ao buscar todas as contas pagas: {e}")
             return pd.DataFrame()
     
     def listar_todas_empresas(self) -> List[str]:
-        """Lista todas as empresas cadastradas no sistema (somente para admin)."""
+        """
+        Lista todas as empresas cadastradas no sistema (somente para admin).
+        
+        Considera apenas contas a pagar: nas contas pagas a empresa não é usada
+        (os pagamentos são filtrados por conta corrente). Inclusões de outros
+        usuários aparecem após a expiração do cache.
+        """
         if not self.is_admin():
             return []
         
         try:
-            # Buscar empresas únicas de contas a pagar
-            response_a_pagar = self.supabase.table("contas_a_pagar").select("empresa").execute()
-            empresas_a_pagar = set()
-            if response_a_pagar.data:
-                empresas_a_pagar = {item['empresa'] for item in response_a_pagar.data if item.get('empresa')}
-            
-            return sorted(list(empresas_a_pagar))
+            return self._listar_empresas_distintas(None, self._listar_todas_empresas_local,
+                                                   incluir_pagas=False)
                 
         except Exception as e:
             print(f"Erro ao listar empresas: {e}")
             return []
     
+    def _listar_todas_empresas_local(self) -> List[str]:
+        """Lista as empresas de todos os usuários lendo a coluna empresa das contas a pagar."""
+        # Buscar empresas únicas de contas a pagar
+        response_a_pagar = self.supabase.table("contas_a_pagar").select("empresa").execute()
+        empresas_a_pagar = set()
+        if response_a_pagar.data:
+            empresas_a_pagar = {item['empresa'] for item in response_a_pagar.data if item.get('empresa')}
+        
+        return sorted(list(empresas_a_pagar))
+    
     def listar_todos_usuarios(self) -> pd.DataFrame:
         """Lista todos os usuários do sistema (somente para admin)."""
         if not self.is_admin():
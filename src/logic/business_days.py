@@ -0,0 +1,238 @@
+"""
+Dias úteis bancários do calendário financeiro.
+
+Calendário de feriados nacionais (incluindo os móveis: Carnaval, Sexta-feira
+Santa e Corpus Christi), estaduais e municipais, e ajuste de datas para o
+próximo dia útil com `numpy.busday_offset`. Feriados e calendários numpy são
+montados uma vez por ano e reaproveitados.
+"""
+
+import os
+import threading
+import unicodedata
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Segunda a sexta
+MASCARA_SEMANA = '1111100'
+
+# Função que recebe o ano e devolve {data: nome do feriado}
+ProvedorFeriados = Callable[[int], Dict[date, str]]
+
+FERIADOS_NACIONAIS_FIXOS: List[Tuple[int, int, str]] = [
+    (1, 1, 'Confraternização Universal'),
+    (4, 21, 'Tiradentes'),
+    (5, 1, 'Dia do Trabalho'),
+    (9, 7, 'Independência do Brasil'),
+    (10, 12, 'Nossa Senhora Aparecida'),
+    (11, 2, 'Finados'),
+    (11, 15, 'Proclamação da República'),
+    (12, 25, 'Natal'),
+]
+
+FERIADOS_ESTADUAIS: Dict[str, List[Tuple[int, int, str]]] = {
+    'AM': [(9, 5, 'Elevação do Amazonas à Categoria de Província')],
+    'BA': [(7, 2, 'Independência da Bahia')],
+    'CE': [(3, 25, 'Data Magna do Ceará')],
+    'DF': [(11, 30, 'Dia do Evangélico')],
+    'PA': [(8, 15, 'Adesão do Pará à Independência')],
+    'PE': [(3, 6, 'Revolução Pernambucana')],
+    'PR': [(12, 19, 'Emancipação Política do Paraná')],
+    'RJ': [(4, 23, 'Dia de São Jorge')],
+    'RS': [(9, 20, 'Revolução Farroupilha')],
+    'SP': [(7, 9, 'Revolução Constitucionalista')],
+}
+
+# Chave: (UF, município sem acentos em maiúsculas)
+FERIADOS_MUNICIPAIS: Dict[Tuple[str, str], List[Tuple[int, int, str]]] = {
+    ('MG', 'BELO HORIZONTE'): [(8, 15, 'Assunção de Nossa Senhora'), (12, 8, 'Imaculada Conceição')],
+    ('PR', 'CURITIBA'): [(9, 8, 'Nossa Senhora da Luz dos Pinhais')],
+    ('RJ', 'RIO DE JANEIRO'): [(1, 20, 'Dia de São Sebastião')],
+    ('RS', 'PORTO ALEGRE'): [(2, 2, 'Nossa Senhora dos Navegantes')],
+    ('SP', 'SAO PAULO'): [(1, 25, 'Aniversário de São Paulo')],
+}
+
+
+def calcular_pascoa(ano: int) -> date:
+    """
+    Data do domingo de Páscoa no calendário gregoriano (algoritmo de Meeus/Jones/Butcher).
+    """
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+def feriados_nacionais(ano: int) -> Dict[date, str]:
+    """
+    Feriados nacionais com agências bancárias fechadas no ano informado.
+
+    Inclui os feriados móveis calculados a partir da Páscoa (segunda e terça de
+    Carnaval, Sexta-feira Santa e Corpus Christi) e o Dia Nacional de Zumbi e
+    da Consciência Negra, feriado nacional a partir de 2024.
+    """
+    feriados = {date(ano, mes, dia): nome for mes, dia, nome in FERIADOS_NACIONAIS_FIXOS}
+    if ano >= 2024:
+        feriados[date(ano, 11, 20)] = 'Dia Nacional de Zumbi e da Consciência Negra'
+
+    pascoa = calcular_pascoa(ano)
+    feriados[pascoa - timedelta(days=48)] = 'Carnaval (segunda-feira)'
+    feriados[pascoa - timedelta(days=47)] = 'Carnaval (terça-feira)'
+    feriados[pascoa - timedelta(days=2)] = 'Sexta-feira Santa'
+    feriados[pascoa + timedelta(days=60)] = 'Corpus Christi'
+    return feriados
+
+
+def _normalizar_nome(nome: str) -> str:
+    """Nome em maiúsculas e sem acentos, para comparar municípios."""
+    sem_acentos = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acentos.upper().split())
+
+
+def _provedor_tabela(datas: List[Tuple[int, int, str]]) -> ProvedorFeriados:
+    """Provedor de feriados de data fixa a partir de uma tabela (mês, dia, nome)."""
+    def provedor(ano: int) -> Dict[date, str]:
+        return {date(ano, mes, dia): nome for mes, dia, nome in datas}
+    return provedor
+
+
+class CalendarioFeriados:
+    """
+    Calendário de dias úteis bancários: segunda a sexta, exceto feriados.
+
+    Os feriados vêm de provedores (funções ano -> {data: nome}); os nacionais
+    estão sempre incluídos, os estaduais e municipais dependem de `uf` e
+    `municipio`, e outros podem ser registrados com `registrar_provedor` ou
+    passados como datas avulsas em `datas_extras`.
+    """
+
+    def __init__(self, uf: Optional[str] = None, municipio: Optional[str] = None,
+                 provedores: Optional[Iterable[ProvedorFeriados]] = None,
+                 datas_extras: Optional[Iterable] = None):
+        """
+        Inicializa o calendário.
+
+        Args:
+            uf: Sigla do estado para incluir os feriados estaduais (ex.: 'RS')
+            municipio: Nome do município para incluir os feriados municipais
+            provedores: Provedores adicionais de feriados
+            datas_extras: Datas avulsas sem expediente bancário
+        """
+        self.uf = uf.strip().upper() if uf else None
+        self.municipio = _normalizar_nome(municipio) if municipio else None
+
+        self._provedores: List[ProvedorFeriados] = [feriados_nacionais]
+        if self.uf in FERIADOS_ESTADUAIS:
+            self._provedores.append(_provedor_tabela(FERIADOS_ESTADUAIS[self.uf]))
+        if (self.uf, self.municipio) in FERIADOS_MUNICIPAIS:
+            self._provedores.append(_provedor_tabela(FERIADOS_MUNICIPAIS[(self.uf, self.municipio)]))
+        self._provedores.extend(provedores or [])
+
+        self._datas_extras: Dict[date, str] = {
+            pd.Timestamp(data).date(): 'Sem expediente bancário' for data in (datas_extras or [])
+        }
+        self._feriados_por_ano: Dict[int, Dict[date, str]] = {}
+        self._calendarios: Dict[Tuple[int, int], np.busdaycalendar] = {}
+        self._lock = threading.Lock()
+
+    def registrar_provedor(self, provedor: ProvedorFeriados):
+        """Adiciona um provedor de feriados e descarta os calendários já montados."""
+        with self._lock:
+            self._provedores.append(provedor)
+            self._feriados_por_ano.clear()
+            self._calendarios.clear()
+
+    def feriados(self, ano: int) -> Dict[date, str]:
+        """Feriados do ano (data -> nome), calculados uma vez por ano."""
+        with self._lock:
+            feriados = self._feriados_por_ano.get(ano)
+            if feriados is None:
+                feriados = {}
+                for provedor in self._provedores:
+                    feriados.update(provedor(ano))
+                feriados.update({d: nome for d, nome in self._datas_extras.items() if d.year == ano})
+                self._feriados_por_ano[ano] = feriados
+            return feriados
+
+    def calendario_numpy(self, ano_inicio: int, ano_fim: int) -> np.busdaycalendar:
+        """`numpy.busdaycalendar` com a semana útil e os feriados dos anos informados."""
+        chave = (ano_inicio, ano_fim)
+        calendario = self._calendarios.get(chave)
+        if calendario is None:
+            feriados = [d for ano in range(ano_inicio, ano_fim + 1) for d in self.feriados(ano)]
+            calendario = np.busdaycalendar(weekmask=MASCARA_SEMANA,
+                                           holidays=np.array(feriados, dtype='datetime64[D]'))
+            with self._lock:
+                self._calendarios[chave] = calendario
+        return calendario
+
+    def ajustar(self, datas: pd.Series) -> pd.Series:
+        """
+        Move cada data que cai em fim de semana ou feriado para o próximo dia útil.
+
+        Datas em dia útil são mantidas (com o horário, se houver); NaT continua NaT.
+
+        Args:
+            datas: Série datetime64
+
+        Returns:
+            pd.Series: Datas ajustadas, com o mesmo índice
+        """
+        dias = datas.to_numpy(dtype='datetime64[D]')
+        validas = ~np.isnat(dias)
+        if not validas.any():
+            return datas.copy()
+
+        anos = dias[validas].astype('datetime64[Y]').astype(int) + 1970
+        # O ano seguinte entra no calendário para datas do fim de dezembro
+        calendario = self.calendario_numpy(int(anos.min()), int(anos.max()) + 1)
+
+        deslocamento = np.zeros(len(dias), dtype='timedelta64[D]')
+        deslocamento[validas] = np.busday_offset(dias[validas], 0, roll='forward',
+                                                 busdaycal=calendario) - dias[validas]
+        return datas + pd.to_timedelta(deslocamento, unit='D')
+
+    def ajustar_data(self, data):
+        """Versão de `ajustar` para uma única data (datetime, Timestamp ou date)."""
+        dia = np.datetime64(pd.Timestamp(data).date(), 'D')
+        ano = pd.Timestamp(data).year
+        ajustado = np.busday_offset(dia, 0, roll='forward', busdaycal=self.calendario_numpy(ano, ano + 1))
+        return data + timedelta(days=int((ajustado - dia).astype(int)))
+
+    def eh_dia_util(self, data) -> bool:
+        """Indica se a data é dia útil bancário."""
+        ano = pd.Timestamp(data).year
+        return bool(np.is_busday(np.datetime64(pd.Timestamp(data).date(), 'D'),
+                                 busdaycal=self.calendario_numpy(ano, ano)))
+
+
+_calendario_padrao: Optional[CalendarioFeriados] = None
+
+
+def obter_calendario_padrao() -> CalendarioFeriados:
+    """
+    Calendário usado pelo sistema, configurado por `CALENDARIO_UF` e `CALENDARIO_MUNICIPIO`.
+    """
+    global _calendario_padrao
+    if _calendario_padrao is None:
+        _calendario_padrao = CalendarioFeriados(
+            uf=os.getenv('CALENDARIO_UF'),
+            municipio=os.getenv('CALENDARIO_MUNICIPIO')
+        )
+    return _calendario_padrao
+
+
+def definir_calendario_padrao(calendario: CalendarioFeriados):
+    """Substitui o calendário usado pelo sistema (ex.: com feriados de outra cidade)."""
+    global _calendario_padrao
+    _calendario_padrao = calendario
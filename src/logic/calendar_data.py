@@ -0,0 +1,329 @@
+"""
+Motor vetorizado dos dados do calendário financeiro.
+
+Converte as datas uma única vez, aplica a regra de dia útil por coluna e
+monta um índice diário (data ajustada -> linhas, soma e quantidade), do qual
+saem a grade do mês, a semana e os detalhes do dia. As listas de contas de
+cada dia só são montadas quando o dia é aberto.
+"""
+
+import calendar
+import hashlib
+from collections.abc import Mapping, MutableMapping
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .business_days import CalendarioFeriados, obter_calendario_padrao
+
+
+def converter_datas(valores: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de datas para datetime (NaT quando inválida), sem hora.
+
+    Valores que não seguem o formato predominante da coluna são convertidos
+    individualmente, como no cálculo linha a linha.
+    """
+    datas = pd.to_datetime(valores, errors='coerce')
+    falhas = datas.isna() & valores.notna()
+    if falhas.any():
+        datas = datas.copy()
+        datas[falhas] = pd.to_datetime(valores[falhas], errors='coerce', format='mixed')
+    if getattr(datas.dt, 'tz', None) is not None:
+        datas = datas.dt.tz_localize(None)
+    return datas.dt.normalize()
+
+
+def ajustar_datas_para_dia_util(datas: pd.Series, calendario: Optional[CalendarioFeriados] = None) -> pd.Series:
+    """
+    Versão vetorizada de `ajustar_para_dia_util`: fins de semana e feriados vão para o próximo dia útil.
+    """
+    return (calendario or obter_calendario_padrao()).ajustar(datas)
+
+
+def calcular_datas(df: pd.DataFrame, coluna_data: str,
+                   calendario: Optional[CalendarioFeriados] = None) -> pd.DataFrame:
+    """
+    Data original e data ajustada para dia útil de cada linha (NaT quando inválida).
+
+    O resultado tem uma linha por linha de `df`, na mesma ordem.
+    """
+    if df.empty or coluna_data not in df.columns:
+        return pd.DataFrame({'data_original': pd.Series(dtype='datetime64[ns]'),
+                             'data_ajustada': pd.Series(dtype='datetime64[ns]')})
+
+    data_original = converter_datas(df[coluna_data]).reset_index(drop=True)
+    return pd.DataFrame({
+        'data_original': data_original,
+        'data_ajustada': ajustar_datas_para_dia_util(data_original, calendario)
+    })
+
+
+def preparar_lancamentos(df: pd.DataFrame, datas: pd.DataFrame, posicoes: np.ndarray) -> pd.DataFrame:
+    """
+    Colunas exibidas pelo calendário para as linhas nas posições (iloc) informadas.
+
+    Args:
+        df: DataFrame de origem
+        datas: Resultado de `calcular_datas` para `df`
+        posicoes: Posições das linhas desejadas
+    """
+    def coluna(nome: str, padrao='N/A') -> np.ndarray:
+        if nome in df.columns:
+            return df[nome].to_numpy()[posicoes]
+        return np.full(len(posicoes), padrao, dtype=object)
+
+    return pd.DataFrame({
+        'posicao': posicoes,
+        'empresa': coluna('empresa', None),
+        'fornecedor': coluna('fornecedor'),
+        'conta_corrente': coluna('conta_corrente'),
+        'categoria': coluna('categoria'),
+        'valor': pd.to_numeric(pd.Series(coluna('valor', np.nan)), errors='coerce').to_numpy(dtype=float),
+        'descricao': coluna('descricao', None),
+        'data_original': datas['data_original'].to_numpy()[posicoes],
+        'data_ajustada': datas['data_ajustada'].to_numpy()[posicoes]
+    })
+
+
+def montar_registros(lancamentos: pd.DataFrame, colunas: List[str]) -> List[Dict]:
+    """
+    Registros (dicionários) com as colunas informadas, a data original no
+    formato brasileiro e se o lançamento foi transferido para outro dia.
+    """
+    if lancamentos.empty:
+        return []
+
+    registros = pd.DataFrame({nome: lancamentos[nome].to_numpy() for nome in colunas})
+    registros['data_original'] = lancamentos['data_original'].dt.strftime('%d/%m/%Y').to_numpy()
+    registros['transferida'] = (lancamentos['data_original'] != lancamentos['data_ajustada']).to_numpy()
+    return registros.to_dict('records')
+
+
+def montar_contas_do_dia(lancamentos: pd.DataFrame) -> List[Dict]:
+    """Lista de contas de um dia no formato exibido pelo calendário."""
+    return montar_registros(lancamentos, ['empresa', 'fornecedor', 'valor', 'descricao'])
+
+
+class DadosDia(Mapping):
+    """
+    Totais de um dia do calendário, acessíveis como o dicionário de antes.
+
+    'a_pagar', 'pagas', 'qtd_a_pagar' e 'qtd_pagas' já vêm calculados;
+    'contas_a_pagar' e 'contas_pagas' são montadas na primeira leitura.
+    """
+
+    CHAVES = ('a_pagar', 'pagas', 'qtd_a_pagar', 'qtd_pagas', 'contas_a_pagar', 'contas_pagas')
+
+    def __init__(self, totais: Dict[str, float], lancamentos: Dict[str, Callable[[], pd.DataFrame]]):
+        """
+        Args:
+            totais: Valores de 'a_pagar', 'pagas', 'qtd_a_pagar' e 'qtd_pagas'
+            lancamentos: Funções que retornam os lançamentos do dia para
+                'contas_a_pagar' e 'contas_pagas'
+        """
+        self._valores = dict(totais)
+        self._lancamentos = lancamentos
+
+    def __getitem__(self, chave: str):
+        if chave not in self._valores:
+            if chave not in self._lancamentos:
+                raise KeyError(chave)
+            self._valores[chave] = montar_contas_do_dia(self._lancamentos[chave]())
+        return self._valores[chave]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.CHAVES)
+
+    def __len__(self) -> int:
+        return len(self.CHAVES)
+
+    def __repr__(self) -> str:
+        return (f"DadosDia(a_pagar={self._valores['a_pagar']}, pagas={self._valores['pagas']}, "
+                f"qtd_a_pagar={self._valores['qtd_a_pagar']}, qtd_pagas={self._valores['qtd_pagas']})")
+
+
+def preparar_dados_calendario(df_a_pagar: Optional[pd.DataFrame],
+                              df_pagas: Optional[pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Converte as colunas de data para datetime e descarta as linhas sem data válida.
+    """
+    df_a_pagar = pd.DataFrame() if df_a_pagar is None else df_a_pagar
+    df_pagas = pd.DataFrame() if df_pagas is None else df_pagas
+
+    if not df_a_pagar.empty:
+        df_a_pagar = df_a_pagar.copy()
+        df_a_pagar['data_vencimento'] = pd.to_datetime(df_a_pagar['data_vencimento'], errors='coerce')
+        df_a_pagar = df_a_pagar.dropna(subset=['data_vencimento'])
+
+    if not df_pagas.empty:
+        df_pagas = df_pagas.copy()
+        df_pagas['data_pagamento'] = pd.to_datetime(df_pagas['data_pagamento'], errors='coerce')
+        df_pagas = df_pagas.dropna(subset=['data_pagamento'])
+
+    return df_a_pagar, df_pagas
+
+
+# (chave, coluna de data, nome do total, nome da quantidade)
+TABELAS_CALENDARIO = (
+    ('contas_a_pagar', 'data_vencimento', 'a_pagar', 'qtd_a_pagar'),
+    ('contas_pagas', 'data_pagamento', 'pagas', 'qtd_pagas'),
+)
+
+
+def versao_dados(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame) -> str:
+    """
+    Versão dos dados do calendário: colunas, quantidade de linhas, datas e valores.
+
+    Só inclusões, exclusões ou mudanças de data/valor alteram a versão; textos
+    (descrição, fornecedor) ficam de fora para o cálculo ser barato a cada rerun.
+    """
+    digest = hashlib.sha1()
+    for (_, coluna_data, _, _), df in zip(TABELAS_CALENDARIO, (df_a_pagar, df_pagas)):
+        digest.update(repr((tuple(df.columns), len(df))).encode('utf-8'))
+        colunas = [c for c in (coluna_data, 'valor') if c in df.columns]
+        if colunas and len(df):
+            digest.update(pd.util.hash_pandas_object(df[colunas], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class _IndiceTabela:
+    """Linhas de uma tabela ordenadas por data ajustada, com início, quantidade e soma de cada dia."""
+
+    def __init__(self, df: pd.DataFrame, coluna_data: str, calendario: CalendarioFeriados):
+        self.df = df
+        self.datas = calcular_datas(df, coluna_data, calendario)
+
+        ajustadas = self.datas['data_ajustada'].to_numpy()
+        validas = np.flatnonzero(~np.isnat(ajustadas))
+        # Ordenação estável: dentro de um dia, as linhas mantêm a ordem da tabela
+        self.posicoes = validas[np.argsort(ajustadas[validas], kind='stable')]
+        self.dias, self.inicios, self.quantidades = np.unique(
+            ajustadas[self.posicoes], return_index=True, return_counts=True
+        )
+
+        if 'valor' in df.columns and len(self.posicoes):
+            valores = pd.to_numeric(df['valor'], errors='coerce').to_numpy(dtype=float)[self.posicoes]
+            self.somas = np.add.reduceat(np.nan_to_num(valores), self.inicios)
+        else:
+            self.somas = np.zeros(len(self.dias))
+
+    def localizar(self, data) -> Optional[int]:
+        """Índice do dia em `dias`, ou None se não houver lançamentos na data."""
+        dia = pd.Timestamp(data).normalize().to_datetime64().astype(self.dias.dtype)
+        i = int(np.searchsorted(self.dias, dia))
+        if i < len(self.dias) and self.dias[i] == dia:
+            return i
+        return None
+
+
+class IndiceDiario:
+    """
+    Índice diário dos lançamentos: data ajustada -> posições das linhas, com
+    soma e quantidade por dia.
+
+    Montado uma vez por versão dos dados (ver `obter_indice_diario`); a grade
+    do mês, a semana e os detalhes do dia viram consultas por data, sem
+    percorrer as tabelas novamente.
+    """
+
+    def __init__(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                 versao: Optional[str] = None, calendario: Optional[CalendarioFeriados] = None):
+        """
+        Args:
+            df_a_pagar: DataFrame com contas a pagar
+            df_pagas: DataFrame com contas pagas
+            versao: Versão dos dados (calculada com `versao_dados` se None)
+            calendario: Calendário de dias úteis (padrão do sistema se None)
+        """
+        self.versao = versao or versao_dados(df_a_pagar, df_pagas)
+        self.calendario = calendario or obter_calendario_padrao()
+        self._dados_mes: Dict[Tuple[int, int], Dict[int, DadosDia]] = {}
+        self._tabelas = {
+            chave: _IndiceTabela(df, coluna_data, self.calendario)
+            for (chave, coluna_data, _, _), df in zip(TABELAS_CALENDARIO, (df_a_pagar, df_pagas))
+        }
+
+    def totais_do_dia(self, chave: str, data) -> Tuple[float, int]:
+        """Soma e quantidade dos lançamentos ('contas_a_pagar' ou 'contas_pagas') na data."""
+        tabela = self._tabelas[chave]
+        i = tabela.localizar(data)
+        if i is None:
+            return 0.0, 0
+        return float(tabela.somas[i]), int(tabela.quantidades[i])
+
+    def lancamentos_do_dia(self, chave: str, data) -> pd.DataFrame:
+        """Lançamentos ('contas_a_pagar' ou 'contas_pagas') cuja data ajustada é a data informada."""
+        tabela = self._tabelas[chave]
+        i = tabela.localizar(data)
+        if i is None:
+            posicoes = np.array([], dtype=int)
+        else:
+            posicoes = tabela.posicoes[tabela.inicios[i]:tabela.inicios[i] + tabela.quantidades[i]]
+        return preparar_lancamentos(tabela.df, tabela.datas, posicoes)
+
+    def dados_dias(self, dias: List[int], mes: int, ano: int) -> Dict[int, DadosDia]:
+        """
+        Totais por dia (data ajustada para dia útil) para os dias informados de um mês.
+
+        Returns:
+            Dicionário dia -> DadosDia, com todos os dias informados (zerados se vazios)
+        """
+        dados = {}
+        for dia in dias:
+            data = pd.Timestamp(ano, mes, dia)
+            totais = {}
+            for chave, _, nome_total, nome_qtd in TABELAS_CALENDARIO:
+                totais[nome_total], totais[nome_qtd] = self.totais_do_dia(chave, data)
+            dados[dia] = DadosDia(totais, {
+                chave: partial(self.lancamentos_do_dia, chave, data)
+                for chave, _, _, _ in TABELAS_CALENDARIO
+            })
+        return dados
+
+    def dados_mes(self, mes: int, ano: int) -> Dict[int, DadosDia]:
+        """Totais de todos os dias do mês (calculados uma vez por mês)."""
+        dados = self._dados_mes.get((mes, ano))
+        if dados is None:
+            _, dias_no_mes = calendar.monthrange(ano, mes)
+            dados = self.dados_dias(list(range(1, dias_no_mes + 1)), mes, ano)
+            self._dados_mes[(mes, ano)] = dados
+        return dados
+
+
+CHAVE_SESSAO_INDICE = 'indice_diario_calendario'
+
+
+def obter_indice_diario(estado: MutableMapping, df_a_pagar: pd.DataFrame,
+                        df_pagas: pd.DataFrame) -> IndiceDiario:
+    """
+    Índice diário guardado em `estado` (ex.: st.session_state), remontado
+    apenas quando a versão dos dados ou o calendário de feriados mudam.
+    """
+    versao = versao_dados(df_a_pagar, df_pagas)
+    indice = estado.get(CHAVE_SESSAO_INDICE)
+    if indice is None or indice.versao != versao or indice.calendario is not obter_calendario_padrao():
+        indice = IndiceDiario(df_a_pagar, df_pagas, versao)
+        estado[CHAVE_SESSAO_INDICE] = indice
+    return indice
+
+
+def calcular_dados_dias(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                        dias: List[int], mes: int, ano: int) -> Dict[int, DadosDia]:
+    """
+    Totais por dia (data ajustada para dia útil) para os dias informados de um mês.
+
+    Returns:
+        Dicionário dia -> DadosDia, com todos os dias informados (zerados se vazios)
+    """
+    return IndiceDiario(df_a_pagar, df_pagas).dados_dias(dias, mes, ano)
+
+
+def calcular_dados_mes_completo(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                                mes: int, ano: int) -> Dict[int, DadosDia]:
+    """
+    Calcula os dados financeiros para todos os dias do mês.
+    """
+    return IndiceDiario(df_a_pagar, df_pagas).dados_mes(mes, ano)
@@ -6,14 +6,16 @@ Funções auxiliares para visualização de dias e resumos.
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from src.utils import formatar_moeda_brasileira
+from .business_days import obter_calendario_padrao
+from .calendar_data import montar_registros, obter_indice_diario
 
 
 def ajustar_para_dia_util(data_original):
     """
-    Ajusta datas de fim de semana para a próxima segunda-feira.
-    Sábado (5) e Domingo (6) -> Segunda-feira
+    Ajusta datas de fim de semana ou feriado para o próximo dia útil bancário.
+    Sábado, domingo e feriados (calendário em src/logic/business_days.py) -> próximo dia útil
     
     Args:
         data_original: Data original a ser ajustada
@@ -21,17 +23,7 @@ def ajustar_para_dia_util(data_original):
     Returns:
         datetime: Data ajustada para dia útil
     """
-    dia_semana = data_original.weekday()  # 0=segunda, 6=domingo
-    
-    if dia_semana == 5:  # Sábado
-        # Mover para segunda (2 dias à frente)
-        return data_original + timedelta(days=2)
-    elif dia_semana == 6:  # Domingo
-        # Mover para segunda (1 dia à frente)
-        return data_original + timedelta(days=1)
-    else:
-        # Dia útil, manter como está
-        return data_original
+    return obter_calendario_padrao().ajustar_data(data_original)
 
 def mostrar_dia_semana(dia, dados_dia, mes, ano):
     """
@@ -429,7 +421,7 @@ def mostrar_resumo_mes(dados_mes):
         </div>
         """, unsafe_allow_html=True)
 
-def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas):
+def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas, indice=None):
     """
     Mostra os detalhes de um dia específico com tabela de fornecedores.
     
@@ -437,6 +429,7 @@ def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas):
         dia_info: Informações do dia selecionado
         df_a_pagar: DataFrame com contas a pagar
         df_pagas: DataFrame com contas pagas
+        indice: Índice diário dos lançamentos (obtido da sessão se None)
     """
     dia = dia_info['dia']
     mes = dia_info['mes']
@@ -448,46 +441,17 @@ def mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas):
     # Criar data para filtrar
     data_filtro = datetime(ano, mes, dia).date()
     
-    # Buscar dados do dia específico
-    contas_a_pagar_dia = []
-    contas_pagas_dia = []
-    
-    # Processar contas a pagar
-    if not df_a_pagar.empty:
-        for _, row in df_a_pagar.iterrows():
-            data_vencimento = pd.to_datetime(row['data_vencimento'], errors='coerce')
-            if pd.notna(data_vencimento):
-                # Aplicar regra de fim de semana
-                data_ajustada = ajustar_para_dia_util(data_vencimento)
-                if data_ajustada.date() == data_filtro:
-                    conta_info = {
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': row['valor'],
-                        'descricao': row['descricao'],
-                        'categoria': row.get('categoria', 'N/A'),
-                        'data_original': data_vencimento.strftime('%d/%m/%Y'),
-                        'transferida': data_vencimento.date() != data_filtro
-                    }
-                    contas_a_pagar_dia.append(conta_info)
-    
-    # Processar contas pagas
-    if not df_pagas.empty:
-        for _, row in df_pagas.iterrows():
-            data_pagamento = pd.to_datetime(row['data_pagamento'], errors='coerce')
-            if pd.notna(data_pagamento):
-                # Aplicar regra de fim de semana
-                data_ajustada = ajustar_para_dia_util(data_pagamento)
-                if data_ajustada.date() == data_filtro:
-                    conta_info = {
-                        'conta_corrente': row.get('conta_corrente', 'N/A'),
-                        'valor': row['valor'],
-                        'descricao': row['descricao'],
-                        'categoria': row.get('categoria', 'N/A'),
-                        'data_original': data_pagamento.strftime('%d/%m/%Y'),
-                        'transferida': data_pagamento.date() != data_filtro
-                    }
-                    contas_pagas_dia.append(conta_info)
+    # Buscar dados do dia específico no índice diário
+    if indice is None:
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    contas_a_pagar_dia = montar_registros(
+        indice.lancamentos_do_dia('contas_a_pagar', data_filtro),
+        ['empresa', 'fornecedor', 'valor', 'descricao', 'categoria']
+    )
+    contas_pagas_dia = montar_registros(
+        indice.lancamentos_do_dia('contas_pagas', data_filtro),
+        ['conta_corrente', 'valor', 'descricao', 'categoria']
+    )
     
     # Mostrar as tabelas
     col1, col2 = st.columns(2)
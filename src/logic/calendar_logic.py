@@ -10,16 +10,17 @@ import calendar
 from datetime import datetime
 from src.utils import obter_mes_nome_brasileiro
 from .ui_helpers import aplicar_css_calendario
+from .calendar_data import calcular_dados_mes_completo, obter_indice_diario, preparar_dados_calendario
 from .calendar_helpers import (
     mostrar_dia_semana,
     mostrar_dia_mensal,
     mostrar_resumo_semana,
     mostrar_resumo_mes,
-    mostrar_detalhes_dia,
-    ajustar_para_dia_util
+    mostrar_detalhes_dia
 )
 
-def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame, mes: int = None, ano: int = None):
+def criar_calendario_financeiro(df_a_pagar: pd.DataFrame = None, df_pagas: pd.DataFrame = None,
+                                mes: int = None, ano: int = None, provedor=None):
     """
     Cria um calendário visual com informações financeiras com opção de visualização mensal ou semanal.
     
@@ -28,6 +29,8 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
         df_pagas: DataFrame com contas pagas
         mes: Mês para exibir (padrão: mês atual)
         ano: Ano para exibir (padrão: ano atual)
+        provedor: ProvedorCalendario; se informado, os DataFrames são buscados
+            por mês no banco em vez de recebidos prontos
     """
     # Usar mês e ano atuais se não especificados
     hoje = datetime.now()
@@ -36,17 +39,6 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
     if not ano:
         ano = hoje.year
     
-    # Preparar dados
-    if not df_a_pagar.empty:
-        df_a_pagar = df_a_pagar.copy()
-        df_a_pagar['data_vencimento'] = pd.to_datetime(df_a_pagar['data_vencimento'], errors='coerce')
-        df_a_pagar = df_a_pagar.dropna(subset=['data_vencimento'])
-    
-    if not df_pagas.empty:
-        df_pagas = df_pagas.copy()
-        df_pagas['data_pagamento'] = pd.to_datetime(df_pagas['data_pagamento'], errors='coerce')
-        df_pagas = df_pagas.dropna(subset=['data_pagamento'])
-    
     nome_mes = obter_mes_nome_brasileiro(mes)
     
     # Criar título e seletores
@@ -80,6 +72,16 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
         ano = novo_ano
         nome_mes = obter_mes_nome_brasileiro(mes)
     
+    if provedor is not None:
+        # Apenas os lançamentos que podem cair no mês selecionado, com o índice
+        # diário do mês (pré-calculado em segundo plano se o mês for vizinho do anterior)
+        df_a_pagar, df_pagas, indice = provedor.obter_mes(mes, ano)
+        provedor.pre_carregar_vizinhos(mes, ano)
+    else:
+        df_a_pagar, df_pagas = preparar_dados_calendario(df_a_pagar, df_pagas)
+        # Índice diário dos lançamentos, remontado só quando os dados mudam
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    
     # Mostrar calendário baseado no modo selecionado
     if modo_visualizacao == "📅 Semanal":
         # Calcular semanas do mês
@@ -106,17 +108,22 @@ def criar_calendario_financeiro(df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame
         
         # Mostrar calendário semanal
         mostrar_calendario_semanal(
-            semana_selecionada, df_a_pagar, df_pagas, mes, ano
+            semana_selecionada, df_a_pagar, df_pagas, mes, ano, indice
         )
         
     else:  # Modo Mensal
         st.markdown("---")
         st.markdown("### 🗓️ Visualização Mensal")
-        mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano)
+        mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano, indice)
     
     # Mostrar detalhes do dia selecionado
     if 'dia_selecionado' in st.session_state:
-        mostrar_detalhes_dia(st.session_state['dia_selecionado'], df_a_pagar, df_pagas)
+        dia_info = st.session_state['dia_selecionado']
+        if provedor is not None and (dia_info['mes'], dia_info['ano']) != (mes, ano):
+            # Dia de outro mês: os dados carregados são apenas do mês selecionado
+            mostrar_detalhes_dia(dia_info, *provedor.obter_mes(dia_info['mes'], dia_info['ano']))
+        else:
+            mostrar_detalhes_dia(dia_info, df_a_pagar, df_pagas, indice)
 
 def calcular_semanas_do_mes(ano, mes):
     """
@@ -149,7 +156,7 @@ def calcular_semanas_do_mes(ano, mes):
     
     return semanas
 
-def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
+def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano, indice=None):
     """
     Mostra o calendário da semana selecionada com informações financeiras detalhadas.
     """
@@ -160,7 +167,7 @@ def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
     st.markdown(f"### 📅 Semana {semana_info['numero']} - {semana_info['inicio'].strftime('%d/%m')} a {semana_info['fim'].strftime('%d/%m')}")
     
     # Calcular dados da semana
-    dados_semana = calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano)
+    dados_semana = calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano, indice)
     
     # Mostrar legenda
     st.markdown("#### 📋 Legenda:")
@@ -174,7 +181,7 @@ def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
     with col4:
         st.markdown("📅 **Hoje** - Dia atual (destaque azul)")
     
-    st.info("💡 **Regra de Negócio**: Valores de sábados e domingos são automaticamente transferidos para a próxima segunda-feira.")
+    st.info("💡 **Regra de Negócio**: Valores de sábados, domingos e feriados são automaticamente transferidos para o próximo dia útil.")
     
     # Criar grid da semana
     dias_semana = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
@@ -241,7 +248,7 @@ def mostrar_calendario_semanal(semana_info, df_a_pagar, df_pagas, mes, ano):
     # Resumo da semana
     mostrar_resumo_semana(dados_semana, semana_info)
 
-def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
+def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano, indice=None):
     """
     Mostra o calendário mensal completo com informações financeiras compactas.
     """
@@ -264,7 +271,9 @@ def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
     """, unsafe_allow_html=True)
     
     # Calcular dados do mês inteiro
-    dados_mes = calcular_dados_mes_completo(df_a_pagar, df_pagas, mes, ano)
+    if indice is None:
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    dados_mes = indice.dados_mes(mes, ano)
     
     # Configurar calendário para começar no domingo
     calendar.setfirstweekday(calendar.SUNDAY)
@@ -282,7 +291,7 @@ def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
     with col4:
         st.markdown("📅 **Hoje** - Dia atual (destaque azul)")
     
-    st.info("💡 **Regra de Negócio**: Valores de sábados e domingos são automaticamente transferidos para a próxima segunda-feira.")
+    st.info("💡 **Regra de Negócio**: Valores de sábados, domingos e feriados são automaticamente transferidos para o próximo dia útil.")
     
     # Cabeçalho dos dias da semana
     dias_semana = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
@@ -343,142 +352,12 @@ def mostrar_calendario_mensal(df_a_pagar, df_pagas, mes, ano):
     st.markdown("### 📊 Resumo do Mês")
     mostrar_resumo_mes(dados_mes)
 
-def calcular_dados_mes_completo(df_a_pagar, df_pagas, mes, ano):
-    """
-    Calcula os dados financeiros para todos os dias do mês.
-    """
-    # Obter número de dias no mês
-    _, dias_no_mes = calendar.monthrange(ano, mes)
-    
-    dados_mes = {}
-    
-    # Inicializar todos os dias do mês
-    for dia in range(1, dias_no_mes + 1):
-        dados_mes[dia] = {
-            'a_pagar': 0,
-            'pagas': 0,
-            'qtd_a_pagar': 0,
-            'qtd_pagas': 0,
-            'contas_a_pagar': [],
-            'contas_pagas': []
-        }
-    
-    # Processar contas a pagar
-    if not df_a_pagar.empty:
-        for _, row in df_a_pagar.iterrows():
-            data_original = pd.to_datetime(row['data_vencimento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está no mês/ano atual
-                if data_ajustada.month == mes and data_ajustada.year == ano:
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_mes[dia]['a_pagar'] += valor
-                    dados_mes[dia]['qtd_a_pagar'] += 1
-                    dados_mes[dia]['contas_a_pagar'].append({
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-
-    # Processar contas pagas
-    if not df_pagas.empty:
-        for _, row in df_pagas.iterrows():
-            data_original = pd.to_datetime(row['data_pagamento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está no mês/ano atual
-                if data_ajustada.month == mes and data_ajustada.year == ano:
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_mes[dia]['pagas'] += valor
-                    dados_mes[dia]['qtd_pagas'] += 1
-                    dados_mes[dia]['contas_pagas'].append({
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-    
-    return dados_mes
-
-def calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano):
+def calcular_dados_semana(semana_info, df_a_pagar, df_pagas, mes, ano, indice=None):
     """
     Calcula os dados financeiros para cada dia da semana.
     """
-    dados_semana = {}
-    
-    for dia in semana_info['dias']:
-        dados_semana[dia] = {
-            'a_pagar': 0,
-            'pagas': 0,
-            'qtd_a_pagar': 0,
-            'qtd_pagas': 0,
-            'contas_a_pagar': [],
-            'contas_pagas': []
-        }
-    
-    # Processar contas a pagar
-    if not df_a_pagar.empty:
-        for _, row in df_a_pagar.iterrows():
-            data_original = pd.to_datetime(row['data_vencimento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está na semana atual
-                if (data_ajustada.month == mes and 
-                    data_ajustada.year == ano and 
-                    data_ajustada.day in semana_info['dias']):
-                    
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_semana[dia]['a_pagar'] += valor
-                    dados_semana[dia]['qtd_a_pagar'] += 1
-                    dados_semana[dia]['contas_a_pagar'].append({
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-    
-    # Processar contas pagas
-    if not df_pagas.empty:
-        for _, row in df_pagas.iterrows():
-            data_original = pd.to_datetime(row['data_pagamento'], errors='coerce')
-            if pd.notna(data_original):
-                data_ajustada = ajustar_para_dia_util(data_original)
-                
-                # Verificar se a data ajustada está na semana atual
-                if (data_ajustada.month == mes and 
-                    data_ajustada.year == ano and 
-                    data_ajustada.day in semana_info['dias']):
-                    
-                    dia = data_ajustada.day
-                    valor = float(row['valor'])
-                    
-                    dados_semana[dia]['pagas'] += valor
-                    dados_semana[dia]['qtd_pagas'] += 1
-                    dados_semana[dia]['contas_pagas'].append({
-                        'empresa': row['empresa'],
-                        'fornecedor': row.get('fornecedor', 'N/A'),
-                        'valor': valor,
-                        'descricao': row['descricao'],
-                        'data_original': data_original.strftime('%d/%m/%Y'),
-                        'transferida': data_original.date() != data_ajustada.date()
-                    })
-    
-    return dados_semana
+    if indice is None:
+        indice = obter_indice_diario(st.session_state, df_a_pagar, df_pagas)
+    return indice.dados_dias(semana_info['dias'], mes, ano)
 
 # Continuarei no próximo arquivo devido ao limite de caracteres...
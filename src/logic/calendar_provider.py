@@ -0,0 +1,177 @@
+"""
+Provedor de dados do calendário financeiro.
+
+Busca no banco apenas os lançamentos que podem cair no mês exibido (o mês e
+os dias sem expediente imediatamente anteriores, que são transferidos para o
+dia 1º ou seguintes) e, em segundo plano, busca os meses vizinhos e calcula
+seus índices diários, para que a troca de mês não espere banco nem cálculo.
+"""
+
+import calendar
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, MutableMapping, Optional, Tuple
+
+import pandas as pd
+
+from .business_days import CalendarioFeriados, obter_calendario_padrao
+from .calendar_data import IndiceDiario, preparar_dados_calendario, versao_dados
+
+# Compartilhado entre sessões: poucos pré-carregamentos por vez
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='calendario')
+
+
+def intervalo_do_mes(mes: int, ano: int, calendario: Optional[CalendarioFeriados] = None) -> Tuple[date, date]:
+    """
+    Intervalo de datas originais cujos lançamentos podem cair no mês após o ajuste para dia útil.
+
+    Como o ajuste só move datas para frente, o intervalo termina no último dia
+    do mês e começa logo após o último dia útil do mês anterior (ex.: sábado e
+    domingo antes de uma segunda-feira dia 1º, ou o feriado que os precede).
+    """
+    calendario = calendario or obter_calendario_padrao()
+    inicio = date(ano, mes, 1)
+    while not calendario.eh_dia_util(inicio - timedelta(days=1)):
+        inicio -= timedelta(days=1)
+    _, dias_no_mes = calendar.monthrange(ano, mes)
+    return inicio, date(ano, mes, dias_no_mes)
+
+
+def meses_vizinhos(mes: int, ano: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """(mês, ano) anterior e seguinte."""
+    anterior = (12, ano - 1) if mes == 1 else (mes - 1, ano)
+    seguinte = (1, ano + 1) if mes == 12 else (mes + 1, ano)
+    return anterior, seguinte
+
+
+class ProvedorCalendario:
+    """
+    Lançamentos do calendário por mês, buscados no banco com filtro de datas.
+
+    As buscas passam pelo cache de consultas do `SupabaseClient`, que já
+    descarta resultados após escritas do usuário. Os índices diários dos
+    últimos meses usados ficam num LRU limitado a `max_meses` e só são
+    reaproveitados se a versão dos dados buscados for a mesma. Depois de cada
+    mês exibido, o anterior e o seguinte são buscados e indexados numa thread
+    de trabalho; pedir um mês ainda em pré-carregamento aguarda o término em
+    vez de repetir a busca.
+    """
+
+    def __init__(self, supabase_client: Any, todas_empresas: bool = False,
+                 calendario: Optional[CalendarioFeriados] = None, max_meses: int = 6):
+        """
+        Inicializa o provedor.
+
+        Args:
+            supabase_client: Cliente do banco (SupabaseClient)
+            todas_empresas: Se True, busca os dados de todos os usuários (admin)
+            calendario: Calendário de dias úteis (padrão do sistema se None)
+            max_meses: Quantidade máxima de meses com índice em memória (LRU)
+        """
+        self.supabase_client = supabase_client
+        self.user_id = getattr(supabase_client, 'user_id', None)
+        self.todas_empresas = todas_empresas
+        self.calendario = calendario
+        self.max_meses = max_meses
+        self._meses: "OrderedDict[Tuple[int, int], Tuple[pd.DataFrame, pd.DataFrame, IndiceDiario]]" = OrderedDict()
+        self._pendentes: Dict[Tuple[int, int], Future] = {}
+        self._lock = threading.Lock()
+
+    def obter_mes(self, mes: int, ano: int) -> Tuple[pd.DataFrame, pd.DataFrame, IndiceDiario]:
+        """
+        Dados preparados do mês e seu índice diário, com os totais do mês já calculados.
+
+        Returns:
+            Tupla (df_a_pagar, df_pagas, indice)
+        """
+        df_a_pagar, df_pagas = preparar_dados_calendario(*self.buscar_mes(mes, ano))
+        return self._indexar_mes(mes, ano, df_a_pagar, df_pagas)
+
+    def buscar_mes(self, mes: int, ano: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Contas a pagar e contas pagas que podem aparecer no mês.
+
+        Returns:
+            Tupla (df_a_pagar, df_pagas)
+        """
+        with self._lock:
+            pendente = self._pendentes.pop((mes, ano), None)
+        if pendente is not None:
+            try:
+                pendente.result()
+            except Exception as e:
+                print(f"⚠️ Pré-carregamento de {mes:02d}/{ano} falhou, buscando novamente: {e}")
+        return self._buscar(mes, ano)
+
+    def pre_carregar_vizinhos(self, mes: int, ano: int):
+        """Busca em segundo plano o mês anterior e o seguinte."""
+        vizinhos = meses_vizinhos(mes, ano)
+        with self._lock:
+            # Pré-carregamentos de meses que deixaram de ser vizinhos não são mais aguardados
+            for chave in [c for c in self._pendentes if c not in vizinhos]:
+                self._pendentes.pop(chave).cancel()
+            for vizinho in vizinhos:
+                if vizinho not in self._pendentes:
+                    self._pendentes[vizinho] = _executor.submit(self._pre_calcular, *vizinho)
+
+    def _pre_calcular(self, mes: int, ano: int):
+        """Busca e indexa um mês (executado na thread de trabalho)."""
+        df_a_pagar, df_pagas = preparar_dados_calendario(*self._buscar(mes, ano))
+        self._indexar_mes(mes, ano, df_a_pagar, df_pagas)
+
+    def _indexar_mes(self, mes: int, ano: int, df_a_pagar: pd.DataFrame,
+                     df_pagas: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, IndiceDiario]:
+        """Índice do mês vindo do LRU se os dados não mudaram, ou recalculado e guardado."""
+        versao = versao_dados(df_a_pagar, df_pagas)
+        calendario = self.calendario or obter_calendario_padrao()
+
+        with self._lock:
+            item = self._meses.get((mes, ano))
+            if item is not None and item[2].versao == versao and item[2].calendario is calendario:
+                self._meses.move_to_end((mes, ano))
+                return item
+
+        indice = IndiceDiario(df_a_pagar, df_pagas, versao, calendario)
+        indice.dados_mes(mes, ano)
+        item = (df_a_pagar, df_pagas, indice)
+
+        with self._lock:
+            self._meses[(mes, ano)] = item
+            self._meses.move_to_end((mes, ano))
+            while len(self._meses) > self.max_meses:
+                self._meses.popitem(last=False)
+        return item
+
+    def _buscar(self, mes: int, ano: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        inicio, fim = intervalo_do_mes(mes, ano, self.calendario)
+        data_inicio, data_fim = inicio.strftime('%Y-%m-%d'), fim.strftime('%Y-%m-%d')
+
+        if self.todas_empresas:
+            return (
+                self.supabase_client.buscar_todas_contas_a_pagar(data_inicio=data_inicio, data_fim=data_fim),
+                self.supabase_client.buscar_todas_contas_pagas(data_inicio=data_inicio, data_fim=data_fim)
+            )
+        return (
+            self.supabase_client.buscar_contas_a_pagar(data_inicio=data_inicio, data_fim=data_fim),
+            self.supabase_client.buscar_contas_pagas(data_inicio=data_inicio, data_fim=data_fim)
+        )
+
+
+CHAVE_SESSAO_PROVEDOR = 'provedor_calendario'
+
+
+def obter_provedor_calendario(estado: MutableMapping, supabase_client: Any,
+                              todas_empresas: bool = False) -> ProvedorCalendario:
+    """
+    Provedor guardado em `estado` (ex.: st.session_state), recriado se o
+    cliente, o usuário ou o escopo (todas as empresas) mudarem.
+    """
+    provedor = estado.get(CHAVE_SESSAO_PROVEDOR)
+    if (provedor is None or provedor.supabase_client is not supabase_client
+            or provedor.user_id != getattr(supabase_client, 'user_id', None)
+            or provedor.todas_empresas != todas_empresas):
+        provedor = ProvedorCalendario(supabase_client, todas_empresas)
+        estado[CHAVE_SESSAO_PROVEDOR] = provedor
+    return provedor
@@ -10,6 +10,7 @@ from src.database.supabase_client import SupabaseClient
 from src.utils import formatar_moeda_brasileira, formatar_data_brasileira
 from src.contas_pagas_interface import mostrar_interface_validacao_contas_pagas
 from .calendar_logic import criar_calendario_financeiro
+from .calendar_provider import obter_provedor_calendario
 
 def mostrar_resumo_dashboard(supabase_client: SupabaseClient):
     """
@@ -78,7 +79,7 @@ def mostrar_resumo_dashboard(supabase_client: SupabaseClient):
 
 def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
     """
-    Mostra dados carregados do banco de dados em diferentes abas.
+    Mostra dados carregados do banco de dados em diferentes visões (só a selecionada é executada).
     
     Args:
         supabase_client: Cliente do Supabase
@@ -86,24 +87,26 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
         report_gen: Gerador de relatórios
     """
     
-    # Tabs para diferentes visões
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    # Visões: só a selecionada é executada a cada rerun, então o calendário
+    # busca apenas o mês exibido e as demais buscam os dados completos sob demanda
+    visao = st.radio("Visão", [
         "🗓️ Calendário", 
         "📊 Dados Atuais", 
         "🏢 Por Empresa", 
         "📋 Exportar", 
         "🔍 Validação Contas Pagas"
-    ])
+    ], horizontal=True, label_visibility="collapsed", key="visao_dados_banco")
     
-    # Buscar dados uma vez para usar em todas as abas
-    df_a_pagar = supabase_client.buscar_contas_a_pagar()
-    df_pagas = supabase_client.buscar_contas_pagas()
+    # Com todas as contas do usuário, a conciliação gravada é reaproveitada
+    usar_conciliacao_gravada = True
     
-    with tab1:
-        criar_calendario_financeiro(df_a_pagar, df_pagas)
+    if visao == "🗓️ Calendário":
+        criar_calendario_financeiro(provedor=obter_provedor_calendario(st.session_state, supabase_client))
     
-    with tab2:
+    elif visao == "📊 Dados Atuais":
         st.header("📊 Dados do Banco")
+        df_a_pagar = supabase_client.buscar_contas_a_pagar()
+        df_pagas = supabase_client.buscar_contas_pagas()
         
         col1, col2 = st.columns(2)
         
@@ -143,7 +146,7 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
             else:
                 st.info("Nenhuma conta paga encontrada.")
     
-    with tab3:
+    elif visao == "🏢 Por Empresa":
         st.header("🏢 Análise por Empresa")
         
         empresas = supabase_client.listar_empresas()
@@ -160,10 +163,14 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
                 # Filtrar pagas por conta_corrente se necessário (já que empresa não existe mais)
                 if not df_pagas.empty and 'conta_corrente' in df_pagas.columns:
                     df_pagas = df_pagas[df_pagas['conta_corrente'].str.contains(empresa_selecionada, na=False, case=False)]
+                usar_conciliacao_gravada = False
             
             if not df_a_pagar.empty or not df_pagas.empty:
                 # Usar analyzer para gerar correspondências
-                correspondencias = analyzer.encontrar_correspondencias(df_a_pagar, df_pagas)
+                if usar_conciliacao_gravada:
+                    correspondencias = supabase_client.conciliar_incremental(analyzer)
+                else:
+                    correspondencias = analyzer.encontrar_correspondencias(df_a_pagar, df_pagas)
                 resumo_empresa = analyzer.gerar_relatorio_por_empresa(correspondencias)
                 
                 if not resumo_empresa.empty:
@@ -179,15 +186,20 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
         else:
             st.info("Nenhuma empresa encontrada. Faça upload de arquivos primeiro.")
     
-    with tab4:
+    elif visao == "📋 Exportar":
         st.header("📋 Exportar Relatórios")
         
         if st.button("📄 Gerar Relatório Excel Completo", type="primary"):
             with st.spinner("Gerando relatório..."):
                 try:                    
+                    df_a_pagar = supabase_client.buscar_contas_a_pagar()
+                    df_pagas = supabase_client.buscar_contas_pagas()
                     if not df_a_pagar.empty or not df_pagas.empty:
                         # Gerar análise
-                        correspondencias = analyzer.encontrar_correspondencias(df_a_pagar, df_pagas)
+                        if usar_conciliacao_gravada:
+                            correspondencias = supabase_client.conciliar_incremental(analyzer)
+                        else:
+                            correspondencias = analyzer.encontrar_correspondencias(df_a_pagar, df_pagas)
                         resumo = analyzer.calcular_resumo_financeiro(correspondencias)
                         resumo_empresa = analyzer.gerar_relatorio_por_empresa(correspondencias)
                         
@@ -215,6 +227,6 @@ def mostrar_dados_banco(supabase_client: SupabaseClient, analyzer, report_gen):
                 except Exception as e:
                     st.error(f"Erro ao gerar relatório: {str(e)}")
     
-    with tab5:
+    elif visao == "🔍 Validação Contas Pagas":
         # Interface de validação de contas pagas
         mostrar_interface_validacao_contas_pagas(supabase_client)
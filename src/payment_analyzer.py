@@ -2,13 +2,84 @@
 Módulo para análise e comparação de pagamentos.
 """
 
+import os
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 import logging
 
+from correspondencias import Correspondencias
+from processamento_paralelo import agrupar_particoes, desserializar_colunas, executar_particoes, serializar_colunas
+
 logger = logging.getLogger(__name__)
 
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    # Fallback: algoritmo húngaro próprio (suficiente para componentes pequenos)
+    linear_sum_assignment = None
+
+
+def _resolver_atribuicao(custos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resolve o problema de atribuição de custo mínimo em uma matriz retangular.
+    
+    Returns:
+        Índices de linhas e colunas atribuídas (min(n, m) pares)
+    """
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(custos)
+    
+    transposta = custos.shape[0] > custos.shape[1]
+    if transposta:
+        custos = custos.T
+    n, m = custos.shape
+    
+    # Algoritmo húngaro com potenciais (O(n²·m)); índice 0 é sentinela
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    linha_da_coluna = np.zeros(m + 1, dtype=int)
+    caminho = np.zeros(m + 1, dtype=int)
+    
+    for i in range(1, n + 1):
+        linha_da_coluna[0] = i
+        coluna = 0
+        minimos = np.full(m + 1, np.inf)
+        usadas = np.zeros(m + 1, dtype=bool)
+        
+        while linha_da_coluna[coluna] != 0:
+            usadas[coluna] = True
+            linha = linha_da_coluna[coluna]
+            livres = ~usadas
+            livres[0] = False
+            
+            reduzidos = custos[linha - 1] - u[linha] - v[1:]
+            melhora = livres[1:] & (reduzidos < minimos[1:])
+            minimos[1:][melhora] = reduzidos[melhora]
+            caminho[1:][melhora] = coluna
+            
+            candidatos = np.where(livres, minimos, np.inf)
+            proxima = int(np.argmin(candidatos))
+            delta = candidatos[proxima]
+            
+            u[linha_da_coluna[usadas]] += delta
+            v[usadas] -= delta
+            minimos[livres] -= delta
+            coluna = proxima
+        
+        while coluna != 0:
+            anterior = caminho[coluna]
+            linha_da_coluna[coluna] = linha_da_coluna[anterior]
+            coluna = anterior
+    
+    colunas = np.flatnonzero(linha_da_coluna[1:])
+    linhas = linha_da_coluna[1:][colunas] - 1
+    if transposta:
+        linhas, colunas = colunas, linhas
+    ordem = np.argsort(linhas)
+    return linhas[ordem], colunas[ordem]
+
 
 class PaymentAnalyzer:
     """Classe para análise e comparação de contas a pagar vs contas pagas."""
@@ -16,6 +87,10 @@ class PaymentAnalyzer:
     def __init__(self):
         self.tolerancia_valor = 0.01  # Tolerância para diferenças de valor (R$ 0,01)
         self.tolerancia_dias = 7      # Tolerância em dias para considerar o mesmo pagamento
+        self.modo_aproximacao = 'guloso'  # 'guloso' (ordem das linhas) ou 'otimo' (atribuição global)
+        self.max_componente_otimo = 200   # Componentes maiores que isso usam o modo guloso
+        self.max_workers = None           # Processos no modo paralelo (padrão: núcleos da máquina)
+        self.min_linhas_paralelo = 20000  # Abaixo disso o modo paralelo roda em série
     
     def criar_chave_comparacao(self, df: pd.DataFrame, tipo: str) -> pd.DataFrame:
         """
@@ -100,25 +175,27 @@ class PaymentAnalyzer:
             # Retornar DataFrame original se falhar
             return df
     
-    def encontrar_correspondencias(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame) -> Dict:
+    def encontrar_correspondencias(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                                   modo: Optional[str] = None, paralelo: bool = False) -> Correspondencias:
         """
         Encontra correspondências entre contas a pagar e contas pagas.
         
         Args:
             df_a_pagar: DataFrame com contas a pagar
             df_pagas: DataFrame with contas pagas
+            modo: Estratégia das correspondências aproximadas: 'guloso' (cada conta,
+                  na ordem, fica com o melhor pagamento livre) ou 'otimo' (atribuição
+                  global, independente da ordem). Padrão: self.modo_aproximacao
+            paralelo: Distribui as empresas entre processos (útil na visão admin
+                      com muitas empresas); o resultado é o mesmo da execução serial
             
         Returns:
-            Dicionário com correspondências encontradas
+            Correspondencias (acessível como dicionário com as chaves 'exatas',
+            'aproximadas', 'nao_encontradas' e 'pagamentos_extras')
         """
         # Verificar se os DataFrames estão vazios
         if df_a_pagar.empty and df_pagas.empty:
-            return {
-                'exatas': [],
-                'aproximadas': [],
-                'nao_encontradas': [],
-                'pagas_nao_encontradas': []
-            }
+            return Correspondencias(pd.DataFrame(), pd.DataFrame())
         
         # Preparar dados para comparação
         try:
@@ -129,22 +206,12 @@ class PaymentAnalyzer:
             if 'chave_comparacao' not in df_a_pagar_processado.columns:
                 print(f"⚠️ Chave de comparação não foi criada para contas a pagar. Usando comparação simples.")
                 # Retornar resultado vazio mas válido
-                return {
-                    'exatas': [],
-                    'aproximadas': [],
-                    'nao_encontradas': [],
-                    'pagas_nao_encontradas': []
-                }
+                return Correspondencias(pd.DataFrame(), pd.DataFrame())
             
             if 'chave_comparacao' not in df_pagas_processado.columns:
                 print(f"⚠️ Chave de comparação não foi criada para contas pagas. Usando comparação simples.")
                 # Se não há contas pagas, todas as contas a pagar são não encontradas
-                return {
-                    'exatas': [],
-                    'aproximadas': [],
-                    'nao_encontradas': df_a_pagar_processado.to_dict('records'),
-                    'pagas_nao_encontradas': []
-                }
+                return Correspondencias(df_a_pagar_processado, pd.DataFrame())
                 
             df_a_pagar = df_a_pagar_processado
             df_pagas = df_pagas_processado
@@ -152,78 +219,588 @@ class PaymentAnalyzer:
         except Exception as e:
             print(f"❌ Erro ao criar chaves de comparação: {e}")
             # Retornar dados básicos sem comparação
-            return {
-                'exatas': [],
-                'aproximadas': [],
-                'nao_encontradas': df_a_pagar.to_dict('records') if not df_a_pagar.empty else [],
-                'pagas_nao_encontradas': df_pagas.to_dict('records') if not df_pagas.empty else []
-            }
+            return Correspondencias(df_a_pagar, df_pagas)
+        
+        df_a_pagar = self._converter_datas(df_a_pagar, 'data_vencimento')
+        df_pagas = self._converter_datas(df_pagas, 'data_pagamento')
+        
+        if paralelo:
+            casamento = self._casar_posicoes_paralelo(df_a_pagar, df_pagas, modo)
+        else:
+            casamento = self._casar_posicoes(df_a_pagar, df_pagas, modo)
+        pos_a_pagar_exatas, pos_pagas_exatas, pos_a_pagar_aprox, pos_pagas_aprox = casamento
+        
+        # Contas sem par viram 'nao_encontradas' e pagamentos sem par, 'pagamentos_extras'
+        return Correspondencias(
+            df_a_pagar, df_pagas,
+            pares={
+                'exatas': (pos_a_pagar_exatas, pos_pagas_exatas),
+                'aproximadas': (pos_a_pagar_aprox, pos_pagas_aprox)
+            },
+            motivos={'aproximadas': 'empresa_valor_similar'}
+        )
+    
+    def conciliar_incremental(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                              pares_salvos: pd.DataFrame,
+                              modo: Optional[str] = None) -> Tuple[Correspondencias, pd.DataFrame, List]:
+        """
+        Concilia partindo dos pares já gravados, casando só o que ainda está livre.
+        
+        Pares salvos cujas duas pontas ainda existem são mantidos como estão; os que
+        perderam uma das pontas (registro excluído) são descartados e a ponta que
+        sobrou volta para o conjunto livre. O casamento roda apenas entre contas e
+        pagamentos livres, então o custo acompanha o que mudou, não o tamanho do
+        histórico.
+        
+        Args:
+            df_a_pagar: Todas as contas a pagar (com coluna 'id')
+            df_pagas: Todas as contas pagas (com coluna 'id')
+            pares_salvos: Pares gravados (conta_a_pagar_id, conta_paga_id, tipo, id)
+            modo: Estratégia das correspondências aproximadas (ver encontrar_correspondencias)
+            
+        Returns:
+            Tupla (correspondências completas, novos pares a gravar, ids dos pares órfãos)
+        """
+        colunas_pares = ['conta_a_pagar_id', 'conta_paga_id', 'tipo', 'diferenca_dias', 'diferenca_valor']
+        
+        if 'id' not in df_a_pagar.columns or 'id' not in df_pagas.columns or df_a_pagar.empty or df_pagas.empty:
+            # Sem ids não há como referenciar os pares: apenas recalcula
+            return self.encontrar_correspondencias(df_a_pagar, df_pagas, modo=modo), pd.DataFrame(columns=colunas_pares), []
+        
+        df_a_pagar = self._converter_datas(self.criar_chave_comparacao(df_a_pagar, 'a_pagar'), 'data_vencimento').reset_index(drop=True)
+        df_pagas = self._converter_datas(self.criar_chave_comparacao(df_pagas, 'pagas'), 'data_pagamento').reset_index(drop=True)
+        
+        # Pares salvos ainda válidos (as duas pontas existem e cada ponta aparece uma única vez)
+        if pares_salvos is None or pares_salvos.empty:
+            pares_salvos = pd.DataFrame(columns=['id', 'conta_a_pagar_id', 'conta_paga_id', 'tipo'])
+        pares_salvos = pares_salvos.reset_index(drop=True)
+        pos_a_pagar_salvas = pd.Index(df_a_pagar['id']).get_indexer(pares_salvos['conta_a_pagar_id'])
+        pos_pagas_salvas = pd.Index(df_pagas['id']).get_indexer(pares_salvos['conta_paga_id'])
+        validos = (
+            (pos_a_pagar_salvas >= 0) & (pos_pagas_salvas >= 0) &
+            ~pd.Series(pos_a_pagar_salvas).duplicated().to_numpy() &
+            ~pd.Series(pos_pagas_salvas).duplicated().to_numpy()
+        )
+        ids_orfaos = pares_salvos.loc[~validos, 'id'].dropna().tolist() if 'id' in pares_salvos.columns else []
+        
+        a_pagar_livre = np.ones(len(df_a_pagar), dtype=bool)
+        a_pagar_livre[pos_a_pagar_salvas[validos]] = False
+        pagas_livre = np.ones(len(df_pagas), dtype=bool)
+        pagas_livre[pos_pagas_salvas[validos]] = False
+        
+        # Casamento apenas entre as pontas livres, convertido de volta para posições globais
+        livres_a_pagar = np.flatnonzero(a_pagar_livre)
+        livres_pagas = np.flatnonzero(pagas_livre)
+        vazio = np.array([], dtype=int)
+        novas = (vazio, vazio, vazio, vazio)
+        if livres_a_pagar.size and livres_pagas.size:
+            locais = self._casar_posicoes(df_a_pagar.iloc[livres_a_pagar], df_pagas.iloc[livres_pagas], modo)
+            novas = (
+                livres_a_pagar[locais[0]], livres_pagas[locais[1]],
+                livres_a_pagar[locais[2]], livres_pagas[locais[3]]
+            )
+        
+        tipos_salvos = pares_salvos['tipo'].to_numpy()
+        pares = {}
+        for chave, tipo, novas_a_pagar, novas_pagas in [
+            ('exatas', 'exata', novas[0], novas[1]),
+            ('aproximadas', 'aproximada', novas[2], novas[3])
+        ]:
+            do_tipo = validos & (tipos_salvos == tipo)
+            pos_a_pagar = np.concatenate([pos_a_pagar_salvas[do_tipo], novas_a_pagar]).astype(int)
+            pos_pagas = np.concatenate([pos_pagas_salvas[do_tipo], novas_pagas]).astype(int)
+            ordem = np.argsort(pos_a_pagar, kind='stable')
+            pares[chave] = (pos_a_pagar[ordem], pos_pagas[ordem])
+        
+        correspondencias = Correspondencias(
+            df_a_pagar, df_pagas, pares=pares, motivos={'aproximadas': 'empresa_valor_similar'}
+        )
+        
+        # Novos pares no formato da tabela correspondencias
+        novos_pares = []
+        for chave, tipo, novas_a_pagar in [('exatas', 'exata', novas[0]), ('aproximadas', 'aproximada', novas[2])]:
+            tabela = correspondencias.pares(chave, colunas_a_pagar=['id'], colunas_pagas=['id'])
+            tabela = tabela[np.isin(correspondencias.posicoes(chave)[0], novas_a_pagar)]
+            novos_pares.append(pd.DataFrame({
+                'conta_a_pagar_id': tabela['id_a_pagar'],
+                'conta_paga_id': tabela['id_pago'],
+                'tipo': tipo,
+                'diferenca_dias': tabela['diferenca_dias'],
+                'diferenca_valor': tabela['diferenca_valor']
+            }, columns=colunas_pares))
+        
+        return correspondencias, pd.concat(novos_pares, ignore_index=True), ids_orfaos
+    
+    def conciliar_em_janelas(self, paginas_a_pagar: Iterable[pd.DataFrame], paginas_pagas: Iterable[pd.DataFrame],
+                             folga_dias: Optional[int] = None,
+                             modo: Optional[str] = None) -> Iterator[Tuple[str, Correspondencias]]:
+        """
+        Concilia históricos grandes mês a mês, lendo as páginas sob demanda.
+        
+        As contas a pagar são agrupadas pelo mês de vencimento. Cada mês é casado
+        com os pagamentos ainda livres de `folga_dias` antes do início até
+        `folga_dias` depois do fim do mês; os pagamentos que sobram seguem para o
+        mês seguinte e são dados como extras quando ficam para trás da janela. A
+        memória fica limitada a um mês de contas e aos pagamentos da janela, em
+        vez do histórico inteiro.
+        
+        Diferente de `encontrar_correspondencias`, uma correspondência exata só é
+        encontrada se o pagamento estiver dentro da janela do mês da conta. Por
+        isso nenhuma tela usa este modo: quem chama precisa optar por ele.
+        
+        Args:
+            paginas_a_pagar: DataFrames de contas a pagar ordenados por data_vencimento
+                (ex.: SupabaseClient.iterar_contas_a_pagar)
+            paginas_pagas: DataFrames de contas pagas ordenados por data_pagamento
+                (ex.: SupabaseClient.iterar_contas_pagas)
+            folga_dias: Dias de pagamentos considerados antes e depois de cada mês;
+                padrão: self.tolerancia_dias
+            modo: Estratégia das correspondências aproximadas (ver encontrar_correspondencias)
+            
+        Yields:
+            Tuplas (período, correspondências). O período é 'AAAA-MM', 'sem_vencimento'
+            para contas sem data ou 'pagamentos_restantes' para os pagamentos que
+            sobraram no fim. Cada conta e cada pagamento aparece em uma única janela:
+            a das contas do mês, com os pagamentos casados nela ou vencidos (extras).
+        """
+        if folga_dias is None:
+            folga_dias = self.tolerancia_dias or 0
+        folga = pd.Timedelta(days=folga_dias)
+        
+        fluxo_pagas = iter(paginas_pagas)
+        esgotado = False
+        ultima_data = None
+        pendentes = pd.DataFrame()  # Pagamentos lidos e ainda sem par
+        
+        def ler_pagas_ate(limite) -> None:
+            """Lê páginas de contas pagas até passar do limite (ou até o fim, se None)."""
+            nonlocal esgotado, ultima_data, pendentes
+            while not esgotado and (limite is None or ultima_data is None or ultima_data <= limite):
+                pagina = next(fluxo_pagas, None)
+                if pagina is None:
+                    esgotado = True
+                    break
+                if pagina.empty:
+                    continue
+                pagina = self._converter_datas(self.criar_chave_comparacao(pagina, 'pagas'), 'data_pagamento')
+                datas = pagina['data_pagamento'].dropna()
+                if not datas.empty:
+                    ultima_data = datas.max()
+                pendentes = pagina if pendentes.empty else pd.concat([pendentes, pagina], ignore_index=True)
+        
+        def casar_janela(df_a_pagar: pd.DataFrame, elegiveis: np.ndarray,
+                         vencidas: np.ndarray) -> Correspondencias:
+            """Casa as contas com os pagamentos elegíveis e fecha a janela."""
+            nonlocal pendentes
+            df_pagas = pendentes
+            vazio = np.array([], dtype=int)
+            casamento = (vazio, vazio, vazio, vazio)
+            if not df_a_pagar.empty and elegiveis.size:
+                locais = self._casar_posicoes(df_a_pagar, df_pagas.iloc[elegiveis], modo)
+                casamento = (locais[0], elegiveis[locais[1]], locais[2], elegiveis[locais[3]])
+            
+            # Pagamentos encerrados nesta janela: os vencidos e os casados
+            usados = np.union1d(casamento[1], casamento[3])
+            encerrados = np.concatenate([vencidas, usados]).astype(int)
+            
+            livres = np.ones(len(df_pagas), dtype=bool)
+            livres[encerrados] = False
+            pendentes = df_pagas.iloc[np.flatnonzero(livres)].reset_index(drop=True)
+            
+            # Posições dos pagamentos casados dentro dos encerrados (vencidos primeiro)
+            return Correspondencias(
+                df_a_pagar, df_pagas.iloc[encerrados],
+                pares={
+                    'exatas': (casamento[0], len(vencidas) + np.searchsorted(usados, casamento[1])),
+                    'aproximadas': (casamento[2], len(vencidas) + np.searchsorted(usados, casamento[3]))
+                },
+                motivos={'aproximadas': 'empresa_valor_similar'}
+            )
         
-        correspondencias = {
-            'exatas': [],
-            'aproximadas': [],
-            'nao_encontradas': [],
-            'pagamentos_extras': []
+        for periodo, df_a_pagar in self._janelas_mensais(paginas_a_pagar):
+            if periodo is None:
+                # Contas sem vencimento: casam com todos os pagamentos restantes
+                ler_pagas_ate(None)
+                todas = np.arange(len(pendentes))
+                yield 'sem_vencimento', casar_janela(df_a_pagar, todas, np.array([], dtype=int))
+                continue
+            
+            inicio = periodo.start_time.normalize() - folga
+            fim = periodo.end_time.normalize() + folga
+            ler_pagas_ate(fim)
+            
+            datas = pendentes['data_pagamento'] if not pendentes.empty else pd.Series(dtype='datetime64[ns]')
+            vencidas = np.flatnonzero((datas < inicio).to_numpy())
+            elegiveis = np.flatnonzero((datas.isna() | ((datas >= inicio) & (datas <= fim))).to_numpy())
+            yield str(periodo), casar_janela(df_a_pagar, elegiveis, vencidas)
+        
+        ler_pagas_ate(None)
+        if not pendentes.empty:
+            yield 'pagamentos_restantes', Correspondencias(pd.DataFrame(), pendentes)
+    
+    def _janelas_mensais(self, paginas: Iterable[pd.DataFrame]) -> Iterator[Tuple[Optional[pd.Period], pd.DataFrame]]:
+        """
+        Agrupa páginas de contas a pagar (ordenadas por vencimento) por mês de vencimento.
+        
+        Cada mês é emitido assim que aparece uma conta do mês seguinte; as contas
+        sem vencimento são emitidas por último, com período None.
+        """
+        acumulado, sem_vencimento = [], []
+        periodo_atual = None
+        
+        for pagina in paginas:
+            if pagina.empty:
+                continue
+            pagina = self._converter_datas(pagina, 'data_vencimento')
+            sem_data = pagina['data_vencimento'].isna()
+            if sem_data.any():
+                sem_vencimento.append(pagina[sem_data])
+                pagina = pagina[~sem_data]
+            
+            for periodo, parte in pagina.groupby(pagina['data_vencimento'].dt.to_period('M'), sort=True):
+                if periodo_atual is not None and periodo != periodo_atual:
+                    yield periodo_atual, self._preparar_janela(acumulado)
+                    acumulado = []
+                periodo_atual = periodo
+                acumulado.append(parte)
+        
+        if acumulado:
+            yield periodo_atual, self._preparar_janela(acumulado)
+        if sem_vencimento:
+            yield None, self._preparar_janela(sem_vencimento)
+    
+    def _preparar_janela(self, partes: List[pd.DataFrame]) -> pd.DataFrame:
+        """Junta as partes de uma janela de contas a pagar e cria as chaves de comparação."""
+        df = pd.concat(partes, ignore_index=True)
+        return self._converter_datas(self.criar_chave_comparacao(df, 'a_pagar'), 'data_vencimento')
+    
+    def _casar_posicoes(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                        modo: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Executa as duas etapas do casamento sobre DataFrames já preparados.
+        
+        Returns:
+            Posições (iloc) das exatas (contas a pagar, pagas) e das aproximadas
+            (contas a pagar, pagas), cada par ordenado pela conta a pagar
+        """
+        # Etapa 1: correspondências exatas por hash join na chave de comparação
+        pos_a_pagar_exatas, pos_pagas_exatas = self._casar_exatas(df_a_pagar, df_pagas)
+        
+        # Etapa 2: apenas as sobras seguem para a busca aproximada
+        a_pagar_disponivel = np.ones(len(df_a_pagar), dtype=bool)
+        a_pagar_disponivel[pos_a_pagar_exatas] = False
+        pagas_disponivel = np.ones(len(df_pagas), dtype=bool)
+        pagas_disponivel[pos_pagas_exatas] = False
+        
+        arestas = self._arestas_aproximadas(
+            df_a_pagar, df_pagas, np.flatnonzero(a_pagar_disponivel), pagas_disponivel
+        )
+        if (modo or self.modo_aproximacao) == 'otimo':
+            pos_a_pagar_aprox, pos_pagas_aprox = self._casar_aproximadas_otimo(arestas)
+        else:
+            pos_a_pagar_aprox, pos_pagas_aprox = self._casar_aproximadas(arestas)
+        
+        return pos_a_pagar_exatas, pos_pagas_exatas, pos_a_pagar_aprox, pos_pagas_aprox
+    
+    def _casar_posicoes_paralelo(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                                 modo: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Mesmo resultado de `_casar_posicoes`, com as empresas distribuídas entre processos.
+        
+        As duas etapas só casam linhas da mesma empresa_norm, então particionar por
+        empresa não altera o resultado. Cada processo recebe apenas as colunas usadas
+        no casamento, em arrays, e devolve posições globais.
+        """
+        total_linhas = len(df_a_pagar) + len(df_pagas)
+        grupos = agrupar_particoes(
+            df_a_pagar['empresa_norm'], df_pagas['empresa_norm'],
+            (self.max_workers or os.cpu_count() or 1) * 2
+        )
+        if total_linhas < self.min_linhas_paralelo or len(grupos) <= 1:
+            return self._casar_posicoes(df_a_pagar, df_pagas, modo)
+        
+        configuracao = {
+            'tolerancia_valor': self.tolerancia_valor,
+            'tolerancia_dias': self.tolerancia_dias,
+            'modo_aproximacao': modo or self.modo_aproximacao,
+            'max_componente_otimo': self.max_componente_otimo
         }
+        colunas = ['empresa_norm', 'chave_comparacao', 'valor']
         
-        df_pagas_restantes = df_pagas.copy()
+        tarefas = []
+        for grupo in grupos:
+            mascara_a_pagar = df_a_pagar['empresa_norm'].isin(grupo).to_numpy()
+            mascara_pagas = df_pagas['empresa_norm'].isin(grupo).to_numpy()
+            
+            payload_a_pagar = serializar_colunas(df_a_pagar.loc[mascara_a_pagar], colunas + ['data_vencimento'])
+            payload_a_pagar['_posicao'] = np.flatnonzero(mascara_a_pagar)
+            payload_pagas = serializar_colunas(df_pagas.loc[mascara_pagas], colunas + ['data_pagamento'])
+            payload_pagas['_posicao'] = np.flatnonzero(mascara_pagas)
+            
+            tarefas.append((configuracao, payload_a_pagar, payload_pagas))
+        
+        resultados = executar_particoes(_casar_particao, tarefas, self.max_workers)
+        
+        # Junção determinística: concatena e reordena pela conta a pagar
+        pos_a_pagar_exatas, pos_pagas_exatas, pos_a_pagar_aprox, pos_pagas_aprox = (
+            np.concatenate([resultado[i] for resultado in resultados]) for i in range(4)
+        )
+        ordem_exatas = np.argsort(pos_a_pagar_exatas, kind='stable')
+        ordem_aprox = np.argsort(pos_a_pagar_aprox, kind='stable')
+        return (
+            pos_a_pagar_exatas[ordem_exatas], pos_pagas_exatas[ordem_exatas],
+            pos_a_pagar_aprox[ordem_aprox], pos_pagas_aprox[ordem_aprox]
+        )
+    
+    def _converter_datas(self, df: pd.DataFrame, coluna: str) -> pd.DataFrame:
+        """Garante a coluna de data como datetime (NaT quando ausente ou inválida)."""
+        df = df.copy()
+        if coluna in df.columns:
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+        else:
+            df[coluna] = pd.NaT
+        return df
+    
+    def _casar_exatas(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Casa contas a pagar e pagas com a mesma chave de comparação, um para um.
+        
+        Cada lado recebe a ordem de ocorrência da linha dentro da sua chave, e o
+        join é feito em (chave, ordem): a n-ésima conta com uma chave fica com o
+        n-ésimo pagamento da mesma chave, como no casamento sequencial original.
+        
+        Returns:
+            Posições (iloc) das contas a pagar e das contas pagas casadas
+        """
+        if df_a_pagar.empty or df_pagas.empty:
+            return np.array([], dtype=int), np.array([], dtype=int)
+        
+        esquerda = pd.DataFrame({
+            'chave': df_a_pagar['chave_comparacao'].to_numpy(),
+            'ordem': df_a_pagar.groupby('chave_comparacao', sort=False).cumcount().to_numpy(),
+            'pos_a_pagar': np.arange(len(df_a_pagar))
+        })
+        direita = pd.DataFrame({
+            'chave': df_pagas['chave_comparacao'].to_numpy(),
+            'ordem': df_pagas.groupby('chave_comparacao', sort=False).cumcount().to_numpy(),
+            'pos_paga': np.arange(len(df_pagas))
+        })
+        
+        pares = esquerda.merge(direita, on=['chave', 'ordem'], how='inner').sort_values('pos_a_pagar')
+        return pares['pos_a_pagar'].to_numpy(), pares['pos_paga'].to_numpy()
+    
+    def _indexar_pagas_por_empresa(self, df_pagas: pd.DataFrame,
+                                   pagas_disponivel: np.ndarray) -> Dict[str, Tuple[np.ndarray, ...]]:
+        """
+        Indexa os pagamentos disponíveis por empresa, ordenados por (valor, data de pagamento).
+        
+        Pagamentos de mesmo valor (ex.: contas recorrentes) formam um trecho
+        contínuo ordenado por data, com os sem data no fim, para que a janela de
+        datas de cada conta seja localizada por busca binária dentro do trecho.
+        
+        Returns:
+            Dicionário empresa_norm -> (valores, datas, posições iloc, valores
+            distintos, início de cada trecho de mesmo valor mais o fim do último)
+        """
+        disponiveis = np.flatnonzero(pagas_disponivel)
+        if disponiveis.size == 0:
+            return {}
+        
+        pagas = pd.DataFrame({
+            'empresa_norm': df_pagas['empresa_norm'].to_numpy()[disponiveis],
+            'valor': df_pagas['valor'].to_numpy(dtype=float)[disponiveis],
+            'data': df_pagas['data_pagamento'].to_numpy(dtype='datetime64[ns]')[disponiveis],
+            'pos': disponiveis
+        }).sort_values(['empresa_norm', 'valor', 'data', 'pos'], kind='mergesort', na_position='last')
         
-        # Buscar correspondências exatas
-        for idx_pagar, conta_pagar in df_a_pagar.iterrows():
-            correspondencia_exata = df_pagas_restantes[
-                df_pagas_restantes['chave_comparacao'] == conta_pagar['chave_comparacao']
-            ]
+        indice = {}
+        for empresa, grupo in pagas.groupby('empresa_norm', sort=False):
+            valores = grupo['valor'].to_numpy()
+            valores_distintos, inicios = np.unique(valores, return_index=True)
+            indice[empresa] = (
+                valores, grupo['data'].to_numpy(dtype='datetime64[ns]'), grupo['pos'].to_numpy(),
+                valores_distintos, np.append(inicios, valores.size)
+            )
+        return indice
+    
+    def _arestas_aproximadas(self, df_a_pagar: pd.DataFrame, df_pagas: pd.DataFrame,
+                             pos_a_pagar: np.ndarray, pagas_disponivel: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Lista os pares candidatos (conta, pagamento) para correspondência aproximada.
+        
+        Os candidatos de cada conta vêm de buscas binárias no índice por empresa:
+        os trechos de valor dentro de valor ± tolerancia_valor e, quando a conta
+        tem vencimento, só a janela de ± tolerancia_dias dentro de cada trecho.
+        Sem vencimento, a distância em dias é considerada zero.
+        
+        Returns:
+            Arrays paralelos 'a_pagar', 'paga' (posições iloc), 'distancia_dias' e
+            'diferenca_valor' (absoluta), agrupados por conta na ordem de entrada
+        """
+        arestas = {
+            'a_pagar': np.array([], dtype=int),
+            'paga': np.array([], dtype=int),
+            'distancia_dias': np.array([], dtype=float),
+            'diferenca_valor': np.array([], dtype=float)
+        }
+        
+        indice = self._indexar_pagas_por_empresa(df_pagas, pagas_disponivel)
+        if not indice:
+            return arestas
+        
+        empresas_a_pagar = df_a_pagar['empresa_norm'].to_numpy()
+        valores_a_pagar = df_a_pagar['valor'].to_numpy(dtype=float)
+        datas_a_pagar = df_a_pagar['data_vencimento'].to_numpy(dtype='datetime64[ns]')
+        
+        tolerancia_dias = np.timedelta64(self.tolerancia_dias, 'D') if self.tolerancia_dias is not None else None
+        # Folga para erros de arredondamento de ponto flutuante na busca binária
+        folga = 1e-9
+        
+        lista_a_pagar, lista_pagas, lista_distancias, lista_diferencas = [], [], [], []
+        
+        for pos in pos_a_pagar:
+            entrada = indice.get(empresas_a_pagar[pos])
+            if entrada is None:
+                continue
+            valores, datas, posicoes, valores_distintos, limites = entrada
             
-            if not correspondencia_exata.empty:
-                # Pegar a primeira correspondência
-                conta_paga = correspondencia_exata.iloc[0]
-                
-                correspondencias['exatas'].append({
-                    'conta_a_pagar': conta_pagar.to_dict(),
-                    'conta_paga': conta_paga.to_dict(),
-                    'diferenca_dias': (conta_paga['data_pagamento'] - conta_pagar['data_vencimento']).days,
-                    'diferenca_valor': conta_paga['valor'] - conta_pagar['valor']
-                })
-                
-                # Remover da lista de contas pagas restantes
-                df_pagas_restantes = df_pagas_restantes.drop(conta_paga.name)
+            valor = valores_a_pagar[pos]
+            trecho_inicio = np.searchsorted(valores_distintos, valor - self.tolerancia_valor - folga, side='left')
+            trecho_fim = np.searchsorted(valores_distintos, valor + self.tolerancia_valor + folga, side='right')
+            if trecho_inicio == trecho_fim:
                 continue
             
-            # Buscar correspondências aproximadas (mesma empresa e valor similar)
-            correspondencia_aproximada = df_pagas_restantes[
-                (df_pagas_restantes['empresa_norm'] == conta_pagar['empresa_norm']) &
-                (abs(df_pagas_restantes['valor'] - conta_pagar['valor']) <= self.tolerancia_valor)
-            ]
-            
-            if not correspondencia_aproximada.empty:
-                # Pegar a correspondência mais próxima em data
-                if 'data_vencimento' in conta_pagar and pd.notna(conta_pagar['data_vencimento']):
-                    correspondencia_aproximada['diff_dias'] = abs(
-                        (correspondencia_aproximada['data_pagamento'] - conta_pagar['data_vencimento']).dt.days
-                    )
-                    conta_paga = correspondencia_aproximada.loc[correspondencia_aproximada['diff_dias'].idxmin()]
-                else:
-                    conta_paga = correspondencia_aproximada.iloc[0]
-                
-                correspondencias['aproximadas'].append({
-                    'conta_a_pagar': conta_pagar.to_dict(),
-                    'conta_paga': conta_paga.to_dict(),
-                    'diferenca_dias': (conta_paga['data_pagamento'] - conta_pagar['data_vencimento']).days if pd.notna(conta_pagar['data_vencimento']) else None,
-                    'diferenca_valor': conta_paga['valor'] - conta_pagar['valor'],
-                    'motivo_aproximacao': 'empresa_valor_similar'
-                })
-                
-                # Remover da lista de contas pagas restantes
-                df_pagas_restantes = df_pagas_restantes.drop(conta_paga.name)
+            data = datas_a_pagar[pos]
+            if np.isnat(data) or tolerancia_dias is None:
+                fatias = [np.arange(limites[trecho_inicio], limites[trecho_fim])]
+            else:
+                # Dentro de cada trecho de mesmo valor, só a janela de datas (sem data fica no fim)
+                fatias = []
+                for trecho in range(trecho_inicio, trecho_fim):
+                    inicio, fim = limites[trecho], limites[trecho + 1]
+                    janela = datas[inicio:fim]
+                    primeiro = np.searchsorted(janela, data - tolerancia_dias, side='left')
+                    ultimo = np.searchsorted(janela, data + tolerancia_dias, side='right')
+                    if primeiro < ultimo:
+                        fatias.append(np.arange(inicio + primeiro, inicio + ultimo))
+                if not fatias:
+                    continue
+            
+            indices = np.concatenate(fatias) if len(fatias) > 1 else fatias[0]
+            diferencas = np.abs(valores[indices] - valor)
+            dentro = diferencas <= self.tolerancia_valor
+            indices, diferencas = indices[dentro], diferencas[dentro]
+            candidatos = posicoes[indices]
+            
+            if np.isnat(data):
+                distancias = np.zeros(candidatos.size)
+            else:
+                com_data = ~np.isnat(datas[indices])
+                candidatos, diferencas = candidatos[com_data], diferencas[com_data]
+                distancias = np.abs(datas[indices[com_data]] - data) / np.timedelta64(1, 'D')
+            
+            if candidatos.size == 0:
                 continue
             
-            # Não encontrou correspondência
-            correspondencias['nao_encontradas'].append(conta_pagar.to_dict())
+            lista_a_pagar.append(np.full(candidatos.size, pos, dtype=int))
+            lista_pagas.append(candidatos)
+            lista_distancias.append(distancias)
+            lista_diferencas.append(diferencas)
         
-        # Pagamentos extras (não encontrados nas contas a pagar)
-        correspondencias['pagamentos_extras'] = df_pagas_restantes.to_dict('records')
+        if lista_a_pagar:
+            arestas = {
+                'a_pagar': np.concatenate(lista_a_pagar),
+                'paga': np.concatenate(lista_pagas),
+                'distancia_dias': np.concatenate(lista_distancias),
+                'diferenca_valor': np.concatenate(lista_diferencas)
+            }
+        return arestas
+    
+    def _casar_aproximadas(self, arestas: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Casamento guloso: cada conta, na ordem de entrada, fica com o pagamento livre
+        de data mais próxima (empate: o que aparece primeiro).
+        
+        Returns:
+            Posições (iloc) das contas a pagar e das contas pagas casadas
+        """
+        ordem = np.lexsort((arestas['paga'], arestas['distancia_dias'], arestas['a_pagar']))
         
-        return correspondencias
+        casadas_a_pagar, casadas_pagas = [], []
+        pagas_usadas = set()
+        ultima_conta = None
+        
+        for conta, paga in zip(arestas['a_pagar'][ordem].tolist(), arestas['paga'][ordem].tolist()):
+            if conta == ultima_conta or paga in pagas_usadas:
+                continue
+            ultima_conta = conta
+            pagas_usadas.add(paga)
+            casadas_a_pagar.append(conta)
+            casadas_pagas.append(paga)
+        
+        return np.array(casadas_a_pagar, dtype=int), np.array(casadas_pagas, dtype=int)
+    
+    def _casar_aproximadas_otimo(self, arestas: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Casamento ótimo: maximiza o número de pares e, entre as soluções, minimiza o
+        custo total (distância em dias + diferença de valor normalizada).
+        
+        O grafo conta-pagamento é separado em componentes conexos e a atribuição é
+        resolvida dentro de cada um. Componentes com mais de max_componente_otimo
+        nós caem no casamento guloso para manter o custo limitado.
+        
+        Returns:
+            Posições (iloc) das contas a pagar e das contas pagas casadas
+        """
+        if arestas['a_pagar'].size == 0:
+            return np.array([], dtype=int), np.array([], dtype=int)
+        
+        custos = arestas['distancia_dias'] + arestas['diferenca_valor'] / max(self.tolerancia_valor, 1e-9)
+        componentes = self._componentes_conexos(arestas['a_pagar'], arestas['paga'])
+        
+        casadas_a_pagar, casadas_pagas = [], []
+        
+        for indices in pd.Series(np.arange(componentes.size)).groupby(componentes, sort=False).indices.values():
+            contas, linhas = np.unique(arestas['a_pagar'][indices], return_inverse=True)
+            pagas, colunas = np.unique(arestas['paga'][indices], return_inverse=True)
+            
+            if contas.size + pagas.size > self.max_componente_otimo:
+                subconjunto = {chave: valores[indices] for chave, valores in arestas.items()}
+                pos_a_pagar, pos_pagas = self._casar_aproximadas(subconjunto)
+                casadas_a_pagar.extend(pos_a_pagar.tolist())
+                casadas_pagas.extend(pos_pagas.tolist())
+                continue
+            
+            # Pares inexistentes recebem custo proibitivo: primeiro maximiza o número de pares
+            proibido = custos[indices].sum() + 1.0
+            matriz = np.full((contas.size, pagas.size), proibido)
+            matriz[linhas, colunas] = custos[indices]
+            
+            resultado_linhas, resultado_colunas = _resolver_atribuicao(matriz)
+            validos = matriz[resultado_linhas, resultado_colunas] < proibido
+            casadas_a_pagar.extend(contas[resultado_linhas[validos]].tolist())
+            casadas_pagas.extend(pagas[resultado_colunas[validos]].tolist())
+        
+        ordem = np.argsort(casadas_a_pagar, kind='stable')
+        return np.array(casadas_a_pagar, dtype=int)[ordem], np.array(casadas_pagas, dtype=int)[ordem]
+    
+    def _componentes_conexos(self, contas: np.ndarray, pagas: np.ndarray) -> np.ndarray:
+        """Rotula cada aresta conta-pagamento com o componente conexo a que pertence."""
+        pai = {}
+        
+        def raiz(no):
+            while pai.setdefault(no, no) != no:
+                pai[no] = pai[pai[no]]
+                no = pai[no]
+            return no
+        
+        for conta, paga in zip(contas.tolist(), pagas.tolist()):
+            raiz_conta, raiz_paga = raiz(('a', conta)), raiz(('p', paga))
+            if raiz_conta != raiz_paga:
+                pai[raiz_paga] = raiz_conta
+        
+        rotulos = {}
+        return np.array([rotulos.setdefault(raiz(('a', conta)), len(rotulos)) for conta in contas.tolist()], dtype=int)
     
     def calcular_resumo_financeiro(self, correspondencias: Dict) -> Dict:
         """
@@ -235,6 +812,33 @@ class PaymentAnalyzer:
         Returns:
             Dicionário com resumo financeiro
         """
+        if not isinstance(correspondencias, Correspondencias):
+            return self._calcular_resumo_financeiro_dicts(correspondencias)
+        
+        valores_pares = [
+            correspondencias.pares(chave, colunas_a_pagar=['valor'], colunas_pagas=['valor'])
+            for chave in Correspondencias.TIPOS_PARES
+        ]
+        
+        resumo = {
+            'total_a_pagar': float(sum(pd.to_numeric(pares['valor_a_pagar']).sum() for pares in valores_pares)),
+            'total_pago': float(sum(pd.to_numeric(pares['valor_pago']).sum() for pares in valores_pares)),
+            'total_pendente': float(pd.to_numeric(correspondencias.contas('nao_encontradas', ['valor'])['valor']).sum()),
+            'total_extra': float(pd.to_numeric(correspondencias.contas('pagamentos_extras', ['valor'])['valor']).sum()),
+            'quantidade_exatas': correspondencias.quantidade('exatas'),
+            'quantidade_aproximadas': correspondencias.quantidade('aproximadas'),
+            'quantidade_pendentes': correspondencias.quantidade('nao_encontradas'),
+            'quantidade_extras': correspondencias.quantidade('pagamentos_extras')
+        }
+        
+        # Calcular diferenças
+        resumo['diferenca_valor'] = resumo['total_pago'] - resumo['total_a_pagar']
+        resumo['percentual_pago'] = (resumo['total_pago'] / (resumo['total_a_pagar'] + resumo['total_pendente']) * 100) if (resumo['total_a_pagar'] + resumo['total_pendente']) > 0 else 0
+        
+        return resumo
+    
+    def _calcular_resumo_financeiro_dicts(self, correspondencias: Dict) -> Dict:
+        """Versão de calcular_resumo_financeiro para o formato de listas de dicts."""
         resumo = {
             'total_a_pagar': 0,
             'total_pago': 0,
@@ -280,6 +884,58 @@ class PaymentAnalyzer:
         Returns:
             DataFrame com resumo por empresa
         """
+        if not isinstance(correspondencias, Correspondencias):
+            return self._gerar_relatorio_por_empresa_dicts(correspondencias)
+        
+        # Uma linha por conta a pagar (pareada ou pendente), somadas por empresa
+        partes = []
+        for chave in Correspondencias.TIPOS_PARES:
+            pares = correspondencias.pares(chave, colunas_a_pagar=['empresa', 'valor'], colunas_pagas=['valor'])
+            partes.append(pd.DataFrame({
+                'empresa': pares['empresa_a_pagar'],
+                'valor_a_pagar': pd.to_numeric(pares['valor_a_pagar']),
+                'valor_pago': pd.to_numeric(pares['valor_pago']),
+                'quantidade_a_pagar': 1,
+                'quantidade_pago': 1,
+                'valor_pendente': 0.0,
+                'quantidade_pendente': 0
+            }))
+        
+        pendentes = correspondencias.contas('nao_encontradas', ['empresa', 'valor'])
+        valores_pendentes = pd.to_numeric(pendentes['valor'])
+        partes.append(pd.DataFrame({
+            'empresa': pendentes['empresa'],
+            'valor_a_pagar': valores_pendentes,
+            'valor_pago': 0.0,
+            'quantidade_a_pagar': 1,
+            'quantidade_pago': 0,
+            'valor_pendente': valores_pendentes,
+            'quantidade_pendente': 1
+        }))
+        
+        partes = [parte for parte in partes if not parte.empty]
+        if not partes:
+            return pd.DataFrame()
+        
+        linhas = pd.concat(partes, ignore_index=True)
+        df_resumo = linhas.groupby('empresa', sort=False, dropna=False).sum().reset_index()
+        return self._finalizar_relatorio_por_empresa(df_resumo)
+    
+    def _finalizar_relatorio_por_empresa(self, df_resumo: pd.DataFrame) -> pd.DataFrame:
+        """Acrescenta percentuais e diferenças ao resumo por empresa e ordena."""
+        if not df_resumo.empty:
+            # Calcular percentuais e diferenças
+            df_resumo['diferenca_valor'] = df_resumo['valor_pago'] - (df_resumo['valor_a_pagar'] - df_resumo['valor_pendente'])
+            df_resumo['percentual_pago'] = (df_resumo['valor_pago'] / df_resumo['valor_a_pagar'] * 100).round(2)
+            df_resumo['percentual_pendente'] = (df_resumo['valor_pendente'] / df_resumo['valor_a_pagar'] * 100).round(2)
+            
+            # Ordenar por valor a pagar (decrescente)
+            df_resumo = df_resumo.sort_values('valor_a_pagar', ascending=False)
+        
+        return df_resumo
+    
+    def _gerar_relatorio_por_empresa_dicts(self, correspondencias: Dict) -> pd.DataFrame:
+        """Versão de gerar_relatorio_por_empresa para o formato de listas de dicts."""
         dados_empresa = {}
         
         # Processar correspondências exatas e aproximadas
@@ -326,16 +982,7 @@ class PaymentAnalyzer:
         # Converter para DataFrame
         df_resumo = pd.DataFrame(list(dados_empresa.values()))
         
-        if not df_resumo.empty:
-            # Calcular percentuais e diferenças
-            df_resumo['diferenca_valor'] = df_resumo['valor_pago'] - (df_resumo['valor_a_pagar'] - df_resumo['valor_pendente'])
-            df_resumo['percentual_pago'] = (df_resumo['valor_pago'] / df_resumo['valor_a_pagar'] * 100).round(2)
-            df_resumo['percentual_pendente'] = (df_resumo['valor_pendente'] / df_resumo['valor_a_pagar'] * 100).round(2)
-            
-            # Ordenar por valor a pagar (decrescente)
-            df_resumo = df_resumo.sort_values('valor_a_pagar', ascending=False)
-        
-        return df_resumo
+        return self._finalizar_relatorio_por_empresa(df_resumo)
     
     def identificar_atrasos(self, correspondencias: Dict, data_referencia: datetime = None) -> List[Dict]:
         """
@@ -351,6 +998,89 @@ class PaymentAnalyzer:
         if data_referencia is None:
             data_referencia = datetime.now()
         
+        if not isinstance(correspondencias, Correspondencias):
+            return self._identificar_atrasos_dicts(correspondencias, data_referencia)
+        
+        tabela = self.tabela_atrasos(correspondencias, data_referencia)
+        atrasos = []
+        
+        # Cada tipo mantém só a sua coluna de dias, como no formato original
+        for tipo, coluna_dias, coluna_descartada in [
+            ('pagamento_atrasado', 'dias_atraso', 'dias_vencido'),
+            ('conta_vencida_nao_paga', 'dias_vencido', 'dias_atraso')
+        ]:
+            parte = tabela[tabela['tipo'] == tipo].drop(columns=coluna_descartada)
+            if parte.empty:
+                continue
+            parte[coluna_dias] = parte[coluna_dias].astype(int)
+            if tipo == 'conta_vencida_nao_paga':
+                parte['data_pagamento'] = None
+            atrasos.extend(parte.to_dict('records'))
+        
+        return atrasos
+    
+    def tabela_atrasos(self, correspondencias: Correspondencias, data_referencia: datetime = None) -> pd.DataFrame:
+        """
+        Pagamentos em atraso e contas vencidas não pagas em uma única tabela.
+        
+        Args:
+            correspondencias: Resultado do método encontrar_correspondencias
+            data_referencia: Data de referência para calcular atrasos (padrão: hoje)
+            
+        Returns:
+            DataFrame com uma linha por atraso; 'dias_atraso' preenchido nos pagamentos
+            atrasados e 'dias_vencido' nas contas vencidas não pagas
+        """
+        if data_referencia is None:
+            data_referencia = datetime.now()
+        
+        colunas = ['empresa', 'descricao', 'valor', 'data_vencimento']
+        partes = []
+        
+        # Pagamentos feitos depois do vencimento
+        for tipo in Correspondencias.TIPOS_PARES:
+            pares = correspondencias.pares(tipo, colunas_a_pagar=colunas, colunas_pagas=['data_pagamento'])
+            vencimentos = pd.to_datetime(pares['data_vencimento_a_pagar'], errors='coerce')
+            mascara = vencimentos.notna() & (pares['diferenca_dias'] > 0)
+            partes.append(pd.DataFrame({
+                'tipo': 'pagamento_atrasado',
+                'empresa': pares.loc[mascara, 'empresa_a_pagar'],
+                'descricao': pares.loc[mascara, 'descricao_a_pagar'],
+                'valor': pares.loc[mascara, 'valor_a_pagar'],
+                'data_vencimento': vencimentos[mascara],
+                'data_pagamento': pd.to_datetime(pares.loc[mascara, 'data_pagamento_pago'], errors='coerce'),
+                'dias_atraso': pares.loc[mascara, 'diferenca_dias'],
+                'dias_vencido': np.nan,
+                'correspondencia_tipo': tipo
+            }))
+        
+        # Contas vencidas não pagas em relação à data de referência
+        pendentes = correspondencias.contas('nao_encontradas', colunas)
+        vencimentos = pd.to_datetime(pendentes['data_vencimento'], errors='coerce')
+        dias_vencido = (pd.Timestamp(data_referencia) - vencimentos).dt.days
+        mascara = vencimentos.notna() & (dias_vencido > 0)
+        partes.append(pd.DataFrame({
+            'tipo': 'conta_vencida_nao_paga',
+            'empresa': pendentes.loc[mascara, 'empresa'],
+            'descricao': pendentes.loc[mascara, 'descricao'],
+            'valor': pendentes.loc[mascara, 'valor'],
+            'data_vencimento': vencimentos[mascara],
+            'data_pagamento': pd.NaT,
+            'dias_atraso': np.nan,
+            'dias_vencido': dias_vencido[mascara],
+            'correspondencia_tipo': 'nao_encontrada'
+        }))
+        
+        partes = [parte for parte in partes if not parte.empty]
+        if not partes:
+            return pd.DataFrame(columns=[
+                'tipo', 'empresa', 'descricao', 'valor', 'data_vencimento', 'data_pagamento',
+                'dias_atraso', 'dias_vencido', 'correspondencia_tipo'
+            ])
+        return pd.concat(partes, ignore_index=True)
+    
+    def _identificar_atrasos_dicts(self, correspondencias: Dict, data_referencia: datetime) -> List[Dict]:
+        """Versão de identificar_atrasos para o formato de listas de dicts."""
         atrasos = []
         
         # Verificar correspondências exatas e aproximadas com atraso
@@ -392,3 +1122,27 @@ class PaymentAnalyzer:
                     })
         
         return atrasos
+
+
+def _casar_particao(configuracao: Dict, payload_a_pagar: Dict[str, np.ndarray],
+                    payload_pagas: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Executa o casamento de uma partição em um processo separado.
+    
+    Returns:
+        Posições globais das exatas e aproximadas, no formato de `_casar_posicoes`
+    """
+    analyzer = PaymentAnalyzer()
+    for atributo, valor in configuracao.items():
+        setattr(analyzer, atributo, valor)
+    
+    df_a_pagar = desserializar_colunas(payload_a_pagar)
+    df_pagas = desserializar_colunas(payload_pagas)
+    posicoes_a_pagar = df_a_pagar['_posicao'].to_numpy()
+    posicoes_pagas = df_pagas['_posicao'].to_numpy()
+    
+    pos_a_pagar_exatas, pos_pagas_exatas, pos_a_pagar_aprox, pos_pagas_aprox = analyzer._casar_posicoes(df_a_pagar, df_pagas)
+    return (
+        posicoes_a_pagar[pos_a_pagar_exatas], posicoes_pagas[pos_pagas_exatas],
+        posicoes_a_pagar[pos_a_pagar_aprox], posicoes_pagas[pos_pagas_aprox]
+    )
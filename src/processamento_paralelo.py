@@ -0,0 +1,90 @@
+"""
+Execução de reconciliações em paralelo, particionando os dados em vários processos.
+"""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def serializar_colunas(df: pd.DataFrame, colunas: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Converte um DataFrame em um payload colunar compacto (um array por coluna).
+
+    Args:
+        df: DataFrame de origem
+        colunas: Colunas a enviar; se None, todas
+
+    Returns:
+        Dicionário nome da coluna -> array numpy
+    """
+    colunas = list(df.columns) if colunas is None else [c for c in colunas if c in df.columns]
+    return {coluna: df[coluna].to_numpy() for coluna in colunas}
+
+
+def desserializar_colunas(payload: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Reconstrói o DataFrame a partir de um payload colunar."""
+    return pd.DataFrame(payload)
+
+
+def agrupar_particoes(chaves_a_pagar: pd.Series, chaves_pagas: pd.Series,
+                      num_grupos: int) -> List[List[Any]]:
+    """
+    Distribui as chaves de partição em grupos de carga parecida.
+
+    As chaves são ordenadas por volume (linhas dos dois lados) e cada uma vai
+    para o grupo mais leve no momento. A distribuição é determinística para a
+    mesma entrada.
+
+    Returns:
+        Lista de grupos, cada um com as chaves que serão processadas juntas
+    """
+    tamanhos = chaves_a_pagar.value_counts().add(chaves_pagas.value_counts(), fill_value=0)
+    if tamanhos.empty:
+        return []
+
+    ordem = sorted(tamanhos.items(), key=lambda item: (-item[1], str(item[0])))
+    num_grupos = max(1, min(num_grupos, len(ordem)))
+    grupos: List[List[Any]] = [[] for _ in range(num_grupos)]
+    cargas = [0.0] * num_grupos
+
+    for chave, tamanho in ordem:
+        destino = cargas.index(min(cargas))
+        grupos[destino].append(chave)
+        cargas[destino] += tamanho
+
+    return [grupo for grupo in grupos if grupo]
+
+
+def executar_particoes(funcao: Callable, tarefas: List[tuple], max_workers: Optional[int] = None) -> List[Any]:
+    """
+    Executa `funcao(*tarefa)` para cada tarefa em um pool de processos.
+
+    Os resultados voltam na mesma ordem das tarefas, o que torna a junção
+    determinística. Se o pool não puder ser usado (ambiente sem fork, payload
+    não serializável, processo filho interrompido), as tarefas rodam em série.
+
+    Args:
+        funcao: Função de nível de módulo (precisa ser serializável)
+        tarefas: Lista de tuplas de argumentos
+        max_workers: Número de processos; padrão: os.cpu_count()
+
+    Returns:
+        Lista de resultados, um por tarefa
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if len(tarefas) <= 1 or max_workers <= 1:
+        return [funcao(*tarefa) for tarefa in tarefas]
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tarefas))) as executor:
+            return list(executor.map(funcao, *zip(*tarefas)))
+    except (BrokenProcessPool, OSError, pickle.PicklingError) as e:
+        print(f"⚠️ Processamento paralelo indisponível ({e}). Executando em série.")
+        return [funcao(*tarefa) for tarefa in tarefas]
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
 from utils import formatar_moeda_brasileira, formatar_data_brasileira
+from correspondencias import Correspondencias
 import os
 import logging
 
@@ -53,23 +54,23 @@ class ReportGenerator:
                     resumo_empresa.to_excel(writer, sheet_name='Resumo_por_Empresa', index=False)
                 
                 # Aba 3: Correspondências Exatas
-                if correspondencias['exatas']:
-                    df_exatas = self._processar_correspondencias_para_excel(correspondencias['exatas'], 'exata')
+                df_exatas = self._processar_correspondencias_para_excel(correspondencias, 'exatas', 'exata')
+                if not df_exatas.empty:
                     df_exatas.to_excel(writer, sheet_name='Correspondencias_Exatas', index=False)
                 
                 # Aba 4: Correspondências Aproximadas
-                if correspondencias['aproximadas']:
-                    df_aproximadas = self._processar_correspondencias_para_excel(correspondencias['aproximadas'], 'aproximada')
+                df_aproximadas = self._processar_correspondencias_para_excel(correspondencias, 'aproximadas', 'aproximada')
+                if not df_aproximadas.empty:
                     df_aproximadas.to_excel(writer, sheet_name='Correspondencias_Aproximadas', index=False)
                 
                 # Aba 5: Contas Pendentes
-                if correspondencias['nao_encontradas']:
-                    df_pendentes = pd.DataFrame(correspondencias['nao_encontradas'])
+                df_pendentes = self._contas_para_excel(correspondencias, 'nao_encontradas')
+                if not df_pendentes.empty:
                     df_pendentes.to_excel(writer, sheet_name='Contas_Pendentes', index=False)
                 
                 # Aba 6: Pagamentos Extras
-                if correspondencias['pagamentos_extras']:
-                    df_extras = pd.DataFrame(correspondencias['pagamentos_extras'])
+                df_extras = self._contas_para_excel(correspondencias, 'pagamentos_extras')
+                if not df_extras.empty:
                     df_extras.to_excel(writer, sheet_name='Pagamentos_Extras', index=False)
                 
                 # Aplicar formatação
@@ -82,20 +83,49 @@ class ReportGenerator:
             logger.error(f"Erro ao gerar relatório Excel: {str(e)}")
             return None
     
-    def _processar_correspondencias_para_excel(self, correspondencias: List[Dict], tipo: str) -> pd.DataFrame:
+    def _processar_correspondencias_para_excel(self, correspondencias: Dict, chave: str, tipo: str) -> pd.DataFrame:
         """
         Processa correspondências para formato Excel.
         
         Args:
-            correspondencias: Lista de correspondências
+            correspondencias: Resultado de encontrar_correspondencias (Correspondencias ou dicionário)
+            chave: 'exatas' ou 'aproximadas'
             tipo: Tipo da correspondência
             
         Returns:
             DataFrame formatado
         """
+        if isinstance(correspondencias, Correspondencias):
+            # Formato colunar: monta a aba direto das colunas, sem dicts por linha
+            pares = correspondencias.pares(
+                chave,
+                colunas_a_pagar=['empresa', 'descricao', 'categoria', 'valor', 'data_vencimento', 'arquivo_origem'],
+                colunas_pagas=['valor', 'data_pagamento', 'arquivo_origem']
+            )
+            if pares.empty:
+                return pd.DataFrame()
+            
+            df = pd.DataFrame({
+                'tipo_correspondencia': tipo,
+                'empresa': pares['empresa_a_pagar'],
+                'descricao': pares['descricao_a_pagar'],
+                'categoria': pares['categoria_a_pagar'],
+                'valor_a_pagar': pares['valor_a_pagar'],
+                'valor_pago': pares['valor_pago'],
+                'diferenca_valor': pares['diferenca_valor'],
+                'data_vencimento': pares['data_vencimento_a_pagar'],
+                'data_pagamento': pares['data_pagamento_pago'],
+                'diferenca_dias': pares['diferenca_dias'],
+                'arquivo_origem_a_pagar': pares['arquivo_origem_a_pagar'],
+                'arquivo_origem_pago': pares['arquivo_origem_pago']
+            })
+            if tipo == 'aproximada' and 'motivo_aproximacao' in pares.columns:
+                df['motivo_aproximacao'] = pares['motivo_aproximacao']
+            return df
+        
         dados = []
         
-        for corresp in correspondencias:
+        for corresp in correspondencias.get(chave, []):
             linha = {
                 'tipo_correspondencia': tipo,
                 'empresa': corresp['conta_a_pagar']['empresa'],
@@ -118,6 +148,12 @@ class ReportGenerator:
         
         return pd.DataFrame(dados)
     
+    def _contas_para_excel(self, correspondencias: Dict, chave: str) -> pd.DataFrame:
+        """Contas sem correspondência ('nao_encontradas' ou 'pagamentos_extras') em DataFrame."""
+        if isinstance(correspondencias, Correspondencias):
+            return correspondencias.contas(chave)
+        return pd.DataFrame(correspondencias.get(chave, []))
+    
     def _aplicar_formatacao_excel(self, writer):
         """
         Aplica formatação básica ao arquivo Excel.